@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
@@ -6,6 +7,8 @@ from pydantic import BaseModel
 
 from app.db.session import get_db
 from app.services.bank_statement_service import BankStatementService
+from app.services.baidu_limiter import limiter_stats
+from app.services.baidu_hedge import hedge_stats
 from app.schemas.bank_statement import (
     BankStatement, 
     BankStatementCreate, 
@@ -23,7 +26,10 @@ bank_statement_service = BankStatementService()
 @router.post("/upload/", response_model=BankStatement)
 async def upload_bank_statement(
     file: UploadFile = File(...),
-    bank_type: str = Form(..., description="银行类型：beijing_bank, ceb_v1, ceb_v2"),
+    bank_type: Optional[str] = Form(
+        None,
+        description="银行类型：beijing_bank, ceb_v1, ceb_v2, ccb_v1, ccb_v2, ccb_v3, boc_v1, boc_v2, boc_v3；留空或auto时自动识别"
+    ),
     db: Session = Depends(get_db)
 ):
     """上传银行流水"""
@@ -31,8 +37,9 @@ async def upload_bank_statement(
         # 读取文件内容
         file_content = await file.read()
         
-        # 创建银行流水记录
-        result = bank_statement_service.create_bank_statement(
+        # 创建银行流水记录：OCR识别和解析是同步阻塞的，放到线程池中执行，不阻塞事件循环
+        result = await run_in_threadpool(
+            bank_statement_service.create_bank_statement,
             db=db,
             file_data=file_content,
             file_name=file.filename,
@@ -78,6 +85,17 @@ async def list_bank_statements(
             detail=f"获取银行流水列表失败: {str(e)}"
         )
 
+@router.get("/baidu-stats/")
+async def get_baidu_stats():
+    """获取百度接口限流与对冲统计（各接口QPS、并发上限、限流次数、对冲率、节省耗时）"""
+    return {
+        "status": "success",
+        "data": {
+            "rate_limit": limiter_stats(),
+            "hedging": hedge_stats()
+        }
+    }
+
 @router.get("/{statement_id}", response_model=BankStatement)
 async def get_bank_statement(
     statement_id: int,
@@ -5,10 +5,12 @@ import os
 import traceback
 
 from app.services.ocr_service import OCRService
+from app.services.ocr_pool import OCRPoolBusyError, OCRTimeoutError
 from app.db.session import get_db
 from app.models.invoice import Invoice
 from app.models.invoice_item import InvoiceItem
 from app.utils.storage import MinioStorage
+from app.utils.upload import UploadTooLargeError, read_upload
 from app.schemas.invoice import Invoice as InvoiceSchema, InvoiceBase
 
 router = APIRouter()
@@ -22,35 +24,21 @@ async def upload_invoice(
 ):
     """上传并识别发票"""
     try:
-        # 检查文件大小
-        file_size = 0
-        contents = bytearray()
-        
-        # 分块读取文件
-        chunk_size = 1024 * 1024  # 1MB chunks
-        while True:
-            chunk = await file.read(chunk_size)
-            if not chunk:
-                break
-            file_size += len(chunk)
-            contents.extend(chunk)
-            
-            # 检查文件大小是��超过限制 (10MB)
-            if file_size > 10 * 1024 * 1024:
-                raise HTTPException(
-                    status_code=413,
-                    detail="文件大小超过限制(最大10MB)"
-                )
+        # 读取文件到单个缓冲区（最大10MB），OCR与MinIO上传共用该缓冲区
+        try:
+            contents = await read_upload(file, 10 * 1024 * 1024)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
         
         # 调用OCR服务处理发票
-        result = await ocr_service.process_invoice(bytes(contents))
+        result = await ocr_service.process_invoice(contents)
         
         if result["status"] == "error":
             raise HTTPException(status_code=400, detail=result["message"])
             
         # 保存文件到MinIO
         file_path = f"invoices/{file.filename}"
-        await storage.upload_file(file_path, bytes(contents))
+        await storage.upload_file(file_path, contents)
         
         # 获取文件URL
         file_url = await storage.get_file_url(file_path)
@@ -107,6 +95,10 @@ async def upload_invoice(
         
     except HTTPException as e:
         raise e
+    except OCRPoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except OCRTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         print(f"发票处理错误: {str(e)}")
         print(traceback.format_exc())
@@ -167,6 +159,16 @@ async def list_invoices(db: Session = Depends(get_db)):
             detail=f"获取发票列表失败: {str(e)}"
         )
 
+@router.get("/ocr-stats/")
+async def get_ocr_stats():
+    """获取OCR运行统计（方向判断慢路径比例等）"""
+    return {
+        "status": "success",
+        "data": {
+            "orientation": ocr_service.pool.orientation_stats.snapshot()
+        }
+    }
+
 @router.get("/{invoice_id}")
 async def get_invoice(invoice_id: int, db: Session = Depends(get_db)):
     """获取单个发票详情"""
@@ -1,11 +1,18 @@
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.endpoints import invoice, bank_statement
 from app.db.base_class import Base
 from app.db.session import engine
+from app.services.ocr_pool import shutdown_ocr_pool
+from app.services.http_client import close_http_session
+from app.services.parsers import BankParserFactory
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 
+logger = logging.getLogger(__name__)
+
 # 创建数据库表
 Base.metadata.create_all(bind=engine)
 
@@ -40,6 +47,19 @@ app.include_router(
     tags=["银行流水管理"]
 )
 
+@app.on_event("startup")
+def startup_event():
+    # 预先创建全部银行流水解析器
+    warmed = BankParserFactory.warm_up()
+    logger.info("已初始化银行流水解析器: %s", ", ".join(warmed))
+
+@app.on_event("shutdown")
+def shutdown_event():
+    # 关闭OCR工作进程
+    shutdown_ocr_pool()
+    # 关闭百度接口连接池
+    close_http_session()
+
 @app.get("/")
 async def root():
     return {
@@ -0,0 +1,42 @@
+import os
+import json
+import hashlib
+from typing import Any, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def fixture_key(payload: str) -> str:
+    """录制/回放用的键：请求中图片（base64）或文本的SHA-256"""
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def fixture_path(root: str, endpoint: str, key: str) -> str:
+    return os.path.join(root, endpoint, f"{key}.json")
+
+
+def load_fixture(root: str, endpoint: str, payload: str) -> Optional[Any]:
+    """读取录制的响应，找不到对应键时使用该接口的 default.json"""
+    for path in (fixture_path(root, endpoint, fixture_key(payload)), os.path.join(root, endpoint, "default.json")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def record_fixture(endpoint: str, payload: Optional[str], result: Any):
+    """设置 BAIDU_RECORD_DIR 时，把百度接口的成功响应保存为回放数据"""
+    root = os.getenv("BAIDU_RECORD_DIR")
+    if not root or not payload or "error_code" in result:
+        return
+    path = fixture_path(root, endpoint, fixture_key(payload))
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"录制百度接口响应失败: {str(e)}")
@@ -0,0 +1,168 @@
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def hedging_enabled() -> bool:
+    return os.getenv("BAIDU_HEDGE", "false").lower() == "true"
+
+
+class RequestHedger:
+    """百度接口对冲请求
+
+    请求超过该接口近期耗时的p95仍未返回时，再发送一个相同请求，取先返回的结果。
+    对冲请求数不超过总请求数的 BAIDU_HEDGE_BUDGET（默认5%），并且需要限流器有空闲令牌，
+    避免放大QPS超限。
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        executor: ThreadPoolExecutor,
+        budget: Optional[float] = None,
+        percentile: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        window: int = 200
+    ):
+        self.endpoint = endpoint
+        self.executor = executor
+        self.budget = budget if budget is not None else float(os.getenv("BAIDU_HEDGE_BUDGET", "0.05"))
+        self.percentile = percentile or float(os.getenv("BAIDU_HEDGE_PERCENTILE", "0.95"))
+        self.min_samples = min_samples or int(os.getenv("BAIDU_HEDGE_MIN_SAMPLES", "20"))
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.saved_seconds = 0.0
+
+    def hedge_delay(self) -> Optional[float]:
+        """触发对冲的等待时间（近期耗时的分位数），样本不足时返回None"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            values = sorted(self._latencies)
+        return values[min(len(values) - 1, int(len(values) * self.percentile))]
+
+    def _record(self, elapsed: float):
+        with self._lock:
+            self._latencies.append(elapsed)
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            if self.hedged + 1 > self.budget * self.requests:
+                return False
+            self.hedged += 1
+            return True
+
+    def call(
+        self,
+        fn: Callable[[], Any],
+        try_acquire: Callable[[], bool] = lambda: True,
+        rejected: Callable[[Any], bool] = lambda result: False
+    ) -> Any:
+        """执行请求，必要时发送对冲请求
+
+        Args:
+            fn: 发送一次请求的函数
+            try_acquire: 非阻塞地获取一次限流配额，获取失败时不对冲
+            rejected: 判断结果是否为失败响应，先返回的失败结果不会抢先于另一个请求
+        """
+        with self._lock:
+            self.requests += 1
+        delay = self.hedge_delay()
+        start = time.monotonic()
+        if delay is None:
+            result = fn()
+            self._record(time.monotonic() - start)
+            return result
+
+        primary = self.executor.submit(fn)
+        done, _ = wait([primary], timeout=delay)
+        # 先检查对冲预算，预算不足时不消耗限流令牌；没有令牌时退回预算
+        hedge_allowed = not done and self._take_budget()
+        if hedge_allowed and not try_acquire():
+            self._refund_budget()
+            hedge_allowed = False
+        if not hedge_allowed:
+            result = primary.result()
+            self._record(time.monotonic() - start)
+            return result
+
+        hedge = self.executor.submit(fn)
+        # 分位数只统计原请求自身的耗时：记录胜出者的耗时会让分位数向对冲后的耗时收缩，
+        # 对冲等待时间越来越短，对冲比例只受预算限制
+        hedge_win = []
+        primary.add_done_callback(lambda _: self._on_primary_done(start, hedge_win))
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner: Future = done.pop()
+            if pending and (winner.exception() is not None or rejected(winner.result())):
+                continue
+            if winner is hedge:
+                with self._lock:
+                    self.hedge_wins += 1
+                    hedge_win.append(time.monotonic() - start)
+            return winner.result()
+
+    def _on_primary_done(self, start: float, hedge_win: list):
+        """原请求完成时记录其耗时；对冲请求胜出时统计节省的时间"""
+        elapsed = time.monotonic() - start
+        with self._lock:
+            self._latencies.append(elapsed)
+            if hedge_win:
+                self.saved_seconds += max(0.0, elapsed - hedge_win[0])
+
+    def _refund_budget(self):
+        """没有获取到限流令牌、未发出对冲请求时退回预算"""
+        with self._lock:
+            self.hedged -= 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_rate": self.hedged / self.requests if self.requests else 0.0,
+                "hedge_wins": self.hedge_wins,
+                "saved_ms": round(self.saved_seconds * 1000, 1)
+            }
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_hedgers: Dict[str, RequestHedger] = {}
+_hedgers_lock = threading.Lock()
+
+
+def get_hedger(endpoint: str) -> RequestHedger:
+    """获取接口对应的进程内共享对冲器
+
+    对冲使用独立线程池，调用方可能本身就运行在百度接口线程池中，共用会互相等待。
+    """
+    global _executor
+    hedger = _hedgers.get(endpoint)
+    if hedger is None:
+        with _hedgers_lock:
+            hedger = _hedgers.get(endpoint)
+            if hedger is None:
+                if _executor is None:
+                    _executor = ThreadPoolExecutor(
+                        max_workers=int(os.getenv("BAIDU_HEDGE_WORKERS", "16")),
+                        thread_name_prefix="baidu-hedge"
+                    )
+                hedger = RequestHedger(endpoint, _executor)
+                _hedgers[endpoint] = hedger
+    return hedger
+
+
+def hedge_stats() -> Dict[str, Dict[str, float]]:
+    """各接口对冲统计"""
+    return {endpoint: hedger.stats() for endpoint, hedger in list(_hedgers.items())}
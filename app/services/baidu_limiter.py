@@ -0,0 +1,151 @@
+import os
+import time
+import random
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 百度接口QPS超限的错误码（Open api qps request limit reached），可重试；
+# 日配额/总量超限（17、19）重试无意义，直接返回错误
+QPS_LIMIT_ERROR_CODES = {18}
+
+
+class TokenBucket:
+    """令牌桶限速器：平均速率不超过rate，允许capacity大小的突发"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """取一个令牌，不足时排队等待而不是失败"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def try_acquire(self) -> bool:
+        """有空闲令牌时取一个，否则立即返回False"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class AdaptiveConcurrency:
+    """自适应并发上限（AIMD）
+
+    请求成功时缓慢增加并发上限（每完成limit次成功加1），
+    遇到QPS超限时减半，使并发度跟随实际可用配额变化。
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(max_limit, min_limit)
+        self.min_limit = min_limit
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, throttled: bool):
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.min_limit, self.limit / 2)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / max(self.limit, 1))
+            self._cond.notify_all()
+
+
+class EndpointLimiter:
+    """单个百度接口的客户端限流：令牌桶控制速率，AIMD控制并发"""
+
+    def __init__(self, endpoint: str, qps: float, max_concurrency: int):
+        self.endpoint = endpoint
+        self.bucket = TokenBucket(qps)
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.requests = 0
+        self.throttled = 0
+
+    @contextmanager
+    def slot(self):
+        """获取一次调用的配额，调用方通过 yield 出的对象上报是否被限流"""
+        self.concurrency.acquire()
+        self.bucket.acquire()
+        outcome = {"throttled": False}
+        try:
+            yield outcome
+        finally:
+            self.requests += 1
+            if outcome["throttled"]:
+                self.throttled += 1
+            self.concurrency.release(outcome["throttled"])
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "qps": self.bucket.rate,
+            "concurrency_limit": int(self.concurrency.limit),
+            "in_flight": self.concurrency.in_flight,
+            "requests": self.requests,
+            "throttled": self.throttled
+        }
+
+
+def retry_delay(attempt: int) -> float:
+    """QPS超限后的重试等待时间：指数退避 + 全抖动"""
+    base = float(os.getenv("BAIDU_RETRY_BACKOFF", "0.5"))
+    return random.uniform(0, base * (2 ** attempt))
+
+
+def max_retries() -> int:
+    return int(os.getenv("BAIDU_MAX_RETRIES", "3"))
+
+
+_limiters: Dict[str, EndpointLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(endpoint: str) -> EndpointLimiter:
+    """获取接口对应的进程内共享限流器
+
+    QPS按接口配置，如 BAIDU_QPS_TABLE=2、BAIDU_QPS_GENERAL_BASIC=10，
+    未单独配置时使用 BAIDU_QPS（默认2，与免费额度一致）。
+    """
+    limiter = _limiters.get(endpoint)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(endpoint)
+            if limiter is None:
+                qps = float(os.getenv(f"BAIDU_QPS_{endpoint.upper()}", os.getenv("BAIDU_QPS", "2")))
+                max_concurrency = int(os.getenv("BAIDU_CONCURRENCY", "8"))
+                limiter = EndpointLimiter(endpoint, qps, max_concurrency)
+                _limiters[endpoint] = limiter
+    return limiter
+
+
+def limiter_stats() -> Dict[str, Dict[str, float]]:
+    """各接口限流器的运行统计"""
+    return {endpoint: limiter.stats() for endpoint, limiter in list(_limiters.items())}
@@ -1,162 +1,162 @@
 import os
-from typing import Dict, Any, List
-import json
-import requests
+import logging
+from typing import Dict, Any, Callable, List, Optional
+import time
 import base64
-from datetime import datetime, timedelta
+from urllib.parse import urlencode
 from dotenv import load_dotenv
 
+from .ocr_cache import get_ocr_cache
+from .http_client import baidu_api_base, default_timeout, get_http_session
+from .baidu_fixtures import record_fixture
+from .baidu_token import TOKEN_INVALID_ERROR_CODES, get_token_manager
+from .baidu_limiter import QPS_LIMIT_ERROR_CODES, get_limiter, max_retries, retry_delay
+from .baidu_hedge import get_hedger, hedging_enabled
+from .ocr_backend import OCRBackend
+from .image_preprocess import get_profile, normalize_bytes
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class BaiduService:
     def __init__(self):
         self.api_key = os.getenv("BAIDU_API_KEY")
         self.secret_key = os.getenv("BAIDU_SECRET_KEY")
-        self.access_token = None
-        self.token_expire_time = None
+        # token由进程内共享的管理器维护，各客户端不再各自请求
+        self.token_manager = get_token_manager(self.api_key, self.secret_key)
+        # 所有百度接口共用同一个连接池，避免每次请求重新建立TLS连接
+        self.session = get_http_session()
+        self.timeout = default_timeout()
+        
+    def _post(self, url: str, **kwargs):
+        """通过共享会话发送POST请求，默认带连接/读取超时"""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(url, **kwargs)
+        
+    def _call_api(self, endpoint: str, url: str, payload: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """经过客户端限流调用百度接口，返回解析后的JSON
+        
+        调用前按接口排队获取配额；QPS超限时抖动退避后重试；
+        token无效或过期（错误码110/111）时作废本地token，重新获取后再试一次；
+        其他错误码原样返回由调用方处理。
+        开启 BAIDU_HEDGE 时，耗时超过该接口p95仍未返回的请求会再发送一次，取先返回的结果。
+        payload 为请求中的图片（base64）或文本，用于录制回放数据。
+        """
+        result = self._send_limited(endpoint, url, **kwargs)
+        params = kwargs.get("params") or {}
+        if result.get("error_code") in TOKEN_INVALID_ERROR_CODES and params.get("access_token"):
+            self.token_manager.invalidate(params["access_token"])
+            kwargs["params"] = {**params, "access_token": self.get_access_token()}
+            result = self._send_limited(endpoint, url, **kwargs)
+        record_fixture(endpoint, payload, result)
+        return result
+    
+    def _send_limited(self, endpoint: str, url: str, **kwargs) -> Dict[str, Any]:
+        """按接口限流发送请求，QPS超限时退避重试"""
+        limiter = get_limiter(endpoint)
+        hedger = get_hedger(endpoint) if hedging_enabled() else None
+        send = lambda: self._post(url, **kwargs).json()
+        retries = max_retries()
+        for attempt in range(retries + 1):
+            with limiter.slot() as outcome:
+                if hedger:
+                    result = hedger.call(send, limiter.bucket.try_acquire, lambda r: "error_code" in r)
+                else:
+                    result = send()
+                outcome["throttled"] = result.get("error_code") in QPS_LIMIT_ERROR_CODES
+            if not outcome["throttled"] or attempt == retries:
+                return result
+            delay = retry_delay(attempt)
+            logger.warning("百度接口QPS超限(%s)，%.2f秒后重试", endpoint, delay)
+            time.sleep(delay)
         
     def get_access_token(self) -> str:
         """获取百度API access token"""
-        if self.access_token and self.token_expire_time and datetime.now() < self.token_expire_time:
-            return self.access_token
-            
-        url = "https://aip.baidubce.com/oauth/2.0/token"
+        return self.token_manager.get_token()
+
+class BaiduOCRService(BaiduService, OCRBackend):
+    """百度OCR后端"""
+    
+    name = "baidu"
+    
+    def __init__(self):
+        super().__init__()
+        self.cache = get_ocr_cache()
+        self.preprocess_profile = get_profile("bank_statement")
+        
+    def encode_image(self, image_data: bytes) -> str:
+        """上传前统一缩放、灰度化和纠偏，压缩到字节上限以内，并做base64编码"""
+        image_data = normalize_bytes(image_data, self.preprocess_profile)
+        return base64.b64encode(image_data).decode("ascii")
+        
+    def _recognize(
+        self,
+        endpoint: str,
+        image_data: bytes,
+        encode: Optional[Callable[[], str]] = None
+    ) -> Dict[str, Any]:
+        """调用百度OCR图片识别接口
+
+        结果按图片内容缓存，同一图片重复上传时不再调用接口。
+        
+        Args:
+            endpoint: 接口名称，如 table、general_basic
+            image_data: 图片二进制数据
+            encode: 返回已编码图片的函数，由 OCRBundle 提供以免重复编码
+        """
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(image_data, f"baidu:{endpoint}:{tuple(self.preprocess_profile)}")
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug("百度OCR缓存命中: %s", endpoint)
+                return cached
+        
+        url = f"{baidu_api_base()}/rest/2.0/ocr/v1/{endpoint}"
+        
         params = {
-            "grant_type": "client_credentials",
-            "client_id": self.api_key,
-            "client_secret": self.secret_key
+            "access_token": self.get_access_token()
         }
         
-        response = requests.post(url, params=params)
-        result = response.json()
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded"
+        }
         
-        if "access_token" in result:
-            self.access_token = result["access_token"]
-            # token有效期30天，这里设置29天后过期
-            self.token_expire_time = datetime.now() + timedelta(days=29)
-            return self.access_token
-        else:
-            raise Exception("获取百度API access token失败")
-
-class BaiduOCRService(BaiduService):
-    def __init__(self):
-        super().__init__()
+        image = encode() if encode else self.encode_image(image_data)
+        # 请求体只编码一次，限流重试时直接复用
+        data = urlencode({"image": image})
+        
+        result = self._call_api(endpoint, url, image, params=params, headers=headers, data=data)
+        
+        # 检查错误响应
+        if "error_code" in result:
+            raise Exception(f"百度OCR API错误: {result.get('error_msg', '未知错误')}")
         
-    def recognize_table(self, image_data: bytes) -> Dict[str, Any]:
+        if cache_key:
+            self.cache.set(cache_key, result)
+        return result
+        
+    def recognize_table(self, image_data: bytes, encode: Optional[Callable[[], str]] = None) -> Dict[str, Any]:
         """表格文字识别"""
         try:
-            url = "https://aip.baidubce.com/rest/2.0/ocr/v1/table"
-            
-            params = {
-                "access_token": self.get_access_token()
-            }
-            
-            headers = {
-                "Content-Type": "application/x-www-form-urlencoded"
-            }
-            
-            data = {
-                "image": base64.b64encode(image_data).decode()
-            }
-            
-            response = requests.post(url, params=params, headers=headers, data=data)
-            result = response.json()
-            
-            # 检查错误响应
-            if "error_code" in result:
-                raise Exception(f"百度OCR API错误: {result.get('error_msg', '未知错误')}")
-                
-            return result
+            return self._recognize("table", image_data, encode)
         except Exception as e:
             raise Exception(f"表格识别失败: {str(e)}")
         
-    def recognize_handwriting(self, image_data: bytes) -> Dict[str, Any]:
+    def recognize_handwriting(self, image_data: bytes, encode: Optional[Callable[[], str]] = None) -> Dict[str, Any]:
         """手写文字识别"""
         try:
-            url = "https://aip.baidubce.com/rest/2.0/ocr/v1/handwriting"
-            
-            params = {
-                "access_token": self.get_access_token()
-            }
-            
-            headers = {
-                "Content-Type": "application/x-www-form-urlencoded"
-            }
-            
-            data = {
-                "image": base64.b64encode(image_data).decode()
-            }
-            
-            response = requests.post(url, params=params, headers=headers, data=data)
-            result = response.json()
-            
-            # 检查错误响应
-            if "error_code" in result:
-                raise Exception(f"百度OCR API错误: {result.get('error_msg', '未知错误')}")
-                
-            return result
+            return self._recognize("handwriting", image_data, encode)
         except Exception as e:
             raise Exception(f"手写识别失败: {str(e)}")
         
-    def recognize_general(self, image_data: bytes) -> Dict[str, Any]:
+    def recognize_general(self, image_data: bytes, encode: Optional[Callable[[], str]] = None) -> Dict[str, Any]:
         """通用文字识别"""
         try:
-            url = "https://aip.baidubce.com/rest/2.0/ocr/v1/general_basic"
-            
-            params = {
-                "access_token": self.get_access_token()
-            }
-            
-            headers = {
-                "Content-Type": "application/x-www-form-urlencoded"
-            }
-            
-            data = {
-                "image": base64.b64encode(image_data).decode()
-            }
-            
-            response = requests.post(url, params=params, headers=headers, data=data)
-            result = response.json()
-            
-            # 检查错误响应
-            if "error_code" in result:
-                raise Exception(f"百度OCR API错误: {result.get('error_msg', '未知错误')}")
-                
-            return result
+            return self._recognize("general_basic", image_data, encode)
         except Exception as e:
             raise Exception(f"通用文字识别失败: {str(e)}")
-            
-    def recognize_table_and_text(self, image_data: bytes) -> Dict[str, Any]:
-        """同时进行表格识别和通用文字识别
-        
-        Args:
-            image_data: 图片二进制数据
-            
-        Returns:
-            Dict: 合并后的识别结果
-        """
-        try:
-            # 1. 调用表格识别
-            table_result = self.recognize_table(image_data)
-            print("表格识别结果:", json.dumps(table_result, ensure_ascii=False, indent=2))
-            
-            # 2. 调用通用文字识别
-            text_result = self.recognize_general(image_data)
-            print("通用文字识别结果:", json.dumps(text_result, ensure_ascii=False, indent=2))
-            
-            # 3. 合并结果
-            if isinstance(table_result, dict) and isinstance(text_result, dict):
-                # 确保words_result存在
-                if "words_result" not in table_result:
-                    table_result["words_result"] = []
-                    
-                # 将通用文字识别的结果添加到words_result中
-                if "words_result" in text_result and isinstance(text_result["words_result"], list):
-                    table_result["words_result"].extend(text_result["words_result"])
-                    
-            return table_result
-        except Exception as e:
-            raise Exception(f"表格和文字识别失败: {str(e)}")
 
 class BaiduNLPService(BaiduService):
     def __init__(self):
@@ -165,7 +165,7 @@ class BaiduNLPService(BaiduService):
     def entity_recognize(self, text: str) -> List[Dict[str, Any]]:
         """实体识别"""
         try:
-            url = "https://aip.baidubce.com/rpc/2.0/nlp/v1/lexer"
+            url = f"{baidu_api_base()}/rpc/2.0/nlp/v1/lexer"
             
             params = {
                 "access_token": self.get_access_token()
@@ -179,8 +179,7 @@ class BaiduNLPService(BaiduService):
                 "Content-Type": "application/json"
             }
             
-            response = requests.post(url, params=params, headers=headers, json=payload)
-            result = response.json()
+            result = self._call_api("lexer", url, text, params=params, headers=headers, json=payload)
             
             # 检查错误响应
             if "error_code" in result:
@@ -197,7 +196,7 @@ class BaiduNLPService(BaiduService):
             if not text or not isinstance(text, str):
                 return ""
                 
-            url = "https://aip.baidubce.com/rpc/2.0/nlp/v1/ecnet"
+            url = f"{baidu_api_base()}/rpc/2.0/nlp/v1/ecnet"
             
             params = {
                 "access_token": self.get_access_token()
@@ -211,8 +210,7 @@ class BaiduNLPService(BaiduService):
                 "Content-Type": "application/json"
             }
             
-            response = requests.post(url, params=params, headers=headers, json=payload)
-            result = response.json()
+            result = self._call_api("ecnet", url, text, params=params, headers=headers, json=payload)
             
             # 检查错误响应
             if "error_code" in result:
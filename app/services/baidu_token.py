@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from .http_client import baidu_api_base, default_timeout, get_http_session
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# 距离过期不足该秒数时视为已过期，必须同步刷新
+EXPIRY_SKEW = 60
+
+# token无效或已过期的错误码（Access token invalid or no longer valid / expired），需作废后重新获取
+TOKEN_INVALID_ERROR_CODES = {110, 111}
+
+
+@contextmanager
+def _file_lock(path: str):
+    """跨进程文件锁，保证多个进程不会同时刷新token"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class BaiduTokenManager:
+    """百度API access token管理器
+
+    同一API Key在进程内只有一个实例，所有百度接口客户端共享。
+    token持久化到本地文件，重启或多进程部署时直接复用；
+    临近过期时在后台线程提前刷新，并发请求只会触发一次刷新。
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        secret_key: str,
+        token_file: Optional[str] = None,
+        refresh_margin: Optional[float] = None
+    ):
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.token_file = token_file or os.getenv("BAIDU_TOKEN_FILE", os.path.join(".cache", "baidu_token.json"))
+        # 距离过期不足该秒数时触发后台刷新，默认提前1天
+        self.refresh_margin = refresh_margin if refresh_margin is not None else \
+            float(os.getenv("BAIDU_TOKEN_REFRESH_MARGIN", str(24 * 3600)))
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._refreshing_lock = threading.Lock()
+
+    def get_token(self) -> str:
+        """获取有效的access token"""
+        if not self._is_fresh(EXPIRY_SKEW):
+            return self._refresh(EXPIRY_SKEW)
+        if not self._is_fresh(self.refresh_margin):
+            self._refresh_in_background()
+        return self._token
+
+    def _is_fresh(self, margin: float) -> bool:
+        return self._token is not None and time.time() < self._expires_at - margin
+
+    def _refresh(self, margin: float) -> str:
+        """刷新token（single-flight）
+
+        持有线程锁和文件锁后先重新检查：等待期间其他线程或进程可能已经完成刷新。
+        """
+        with self._lock:
+            if self._is_fresh(margin):
+                return self._token
+            with _file_lock(self.token_file + ".lock"):
+                self._load()
+                if self._is_fresh(margin):
+                    return self._token
+                self._token, self._expires_at = self._fetch()
+                self._save()
+            return self._token
+
+    def invalidate(self, token: str):
+        """作废被百度接口拒绝的token（被吊销、重置密钥等）
+
+        只有内存和本地文件中保存的仍是该token时才清除，
+        其他线程或进程已经换上的新token不受影响。下次 get_token 会重新获取。
+        """
+        with self._lock:
+            with _file_lock(self.token_file + ".lock"):
+                if self._token == token:
+                    self._token, self._expires_at = None, 0.0
+                try:
+                    with open(self.token_file, "r", encoding="utf-8") as f:
+                        saved = json.load(f).get("access_token")
+                except (OSError, ValueError, AttributeError):
+                    saved = None
+                if saved == token:
+                    try:
+                        os.remove(self.token_file)
+                    except OSError as e:
+                        logger.warning("删除失效的百度access token失败: %s", e)
+        logger.info("百度access token已失效，下次调用时重新获取")
+
+    def _refresh_in_background(self):
+        with self._refreshing_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self._refresh(self.refresh_margin)
+            except Exception as e:
+                logger.warning("后台刷新百度access token失败: %s", e)
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="baidu-token-refresh", daemon=True).start()
+
+    def _fetch(self) -> Tuple[str, float]:
+        params = {
+            "grant_type": "client_credentials",
+            "client_id": self.api_key,
+            "client_secret": self.secret_key
+        }
+        url = f"{baidu_api_base()}/oauth/2.0/token"
+        response = get_http_session().post(url, params=params, timeout=default_timeout())
+        result = response.json()
+
+        if "access_token" not in result:
+            raise Exception("获取百度API access token失败")
+        # token有效期默认30天
+        expires_in = float(result.get("expires_in", 30 * 24 * 3600))
+        logger.info("已刷新百度API access token")
+        return result["access_token"], time.time() + expires_in
+
+    def _load(self):
+        """从本地文件读取其他进程保存的token"""
+        try:
+            with open(self.token_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # 指向本地替身服务时得到的token不能用于正式接口，反之亦然
+        if data.get("client_id") != self.api_key or data.get("api_base") != baidu_api_base():
+            return
+        expires_at = float(data.get("expires_at", 0))
+        if data.get("access_token") and expires_at > self._expires_at:
+            self._token, self._expires_at = data["access_token"], expires_at
+
+    def _save(self):
+        data = {
+            "client_id": self.api_key,
+            "api_base": baidu_api_base(),
+            "access_token": self._token,
+            "expires_at": self._expires_at
+        }
+        tmp_path = f"{self.token_file}.{os.getpid()}.tmp"
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.token_file)
+        except OSError as e:
+            logger.warning("保存百度access token失败: %s", e)
+
+
+_managers: Dict[str, BaiduTokenManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_token_manager(api_key: str, secret_key: str) -> BaiduTokenManager:
+    """获取API Key对应的进程内共享token管理器"""
+    manager = _managers.get(api_key)
+    if manager is None:
+        with _managers_lock:
+            manager = _managers.get(api_key)
+            if manager is None:
+                manager = BaiduTokenManager(api_key, secret_key)
+                _managers[api_key] = manager
+    return manager
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from uuid import uuid4
 import os
@@ -12,9 +12,15 @@ from app.models.bank_statement import BankStatement
 from app.schemas.bank_statement import BankStatementCreate, BankStatementUpdate
 from .parsers import BankParserFactory
 from .parsers.base import BankStatementParser
+from .parsers.detector import detection_max_attempts, detection_min_confidence, get_layout_detector
+from .ocr_backend import get_ocr_backend
+from .ocr_bundle import OCRBundle
 
 load_dotenv()
 
+# 上传时不指定银行类型，按流水版式自动识别
+AUTO_BANK_TYPE = "auto"
+
 # 配置日志
 log_dir = "logs"
 if not os.path.exists(log_dir):
@@ -83,57 +89,147 @@ class BankStatementService:
     def __init__(self):
         self.storage = MinioStorage()
     
-    def process_bank_statement(self, image_data: bytes, bank_type: str = "beijing_bank") -> List[dict]:
-        """处理银行流水图片"""
+    def process_bank_statement(self, image_data: bytes, bank_type: Optional[str] = "beijing_bank") -> List[dict]:
+        """处理银行流水图片，bank_type 为空或 "auto" 时自动识别"""
+        return self.resolve_and_process(image_data, bank_type)[1]
+    
+    def resolve_and_process(self, image_data: bytes, bank_type: Optional[str] = None) -> Tuple[str, List[dict]]:
+        """处理银行流水图片，并返回实际使用的银行类型
+        
+        Args:
+            image_data: 图片二进制数据
+            bank_type: 银行类型，为空或 "auto" 时按表格版式自动识别
+            
+        Returns:
+            Tuple: (银行类型, 交易记录列表)
+        """
         try:
             logger.info("\n" + "="*50)
-            logger.info(f"[处理银行流水] 开始处理，bank_type: {bank_type}")
+            logger.info(f"[处理银行流水] 开始处理，bank_type: {bank_type or AUTO_BANK_TYPE}")
             logger.info("="*50)
             
-            # 获取对应的解析器
-            parser = BankParserFactory.get_parser(bank_type)
-            logger.info(f"[处理银行流水] 使用解析器: {parser.__class__.__name__}")
-            
-            # 1. OCR识别和初步解析
-            logger.info("\n" + "-"*30 + " OCR识别开始 " + "-"*30)
-            raw_data = parser.parse(image_data)
-            logger.info("-"*30 + " OCR识别完成 " + "-"*30 + "\n")
-            
-            # 2. 数据清洗
-            logger.info("\n" + "-"*30 + " 数据清洗开始 " + "-"*30)
-            transactions = parser.clean_data(raw_data)
-            logger.info(f"[数据清洗] 清洗结果示例（第一条记录）:")
-            if transactions:
-                logger.info(f"账号: {transactions[0].get('account_number')}")
-                logger.info(f"日期: {transactions[0].get('transaction_date')}")
-                logger.info(f"类型: {transactions[0].get('transaction_type')}")
-                logger.info(f"金额: {transactions[0].get('amount')}")
-                logger.info(f"余额: {transactions[0].get('balance')}")
-                logger.info(f"对手方: {transactions[0].get('counterparty')}")
-                logger.info(f"描述: {transactions[0].get('description')}")
-            logger.info("-"*30 + " 数据清洗完成 " + "-"*30 + "\n")
+            if not bank_type or bank_type == AUTO_BANK_TYPE:
+                bank_type, transactions = self._detect_and_process(image_data)
+            else:
+                # 获取对应的解析器
+                parser = BankParserFactory.get_parser(bank_type)
+                logger.info(f"[处理银行流水] 使用解析器: {parser.__class__.__name__}")
+                
+                # 按银行类型选择OCR后端（百度/本地Paddle）；同一图片只编码一次，各接口结果按需请求并缓存
+                backend = get_ocr_backend(bank_type)
+                logger.info(f"[处理银行流水] 使用OCR后端: {backend.name}")
+                transactions = self._run_parser(parser, OCRBundle(image_data, backend))
             
-            # 3. 数据验证
-            logger.info("\n" + "-"*30 + " 数据验证开始 " + "-"*30)
-            if not parser.validate_data(transactions):
-                raise Exception("数据验证失败")
-            logger.info("-"*30 + " 数据验证完成 " + "-"*30 + "\n")
-            
-            logger.info(f"[处理银行流水] 成功处理，解析到{len(transactions)}条记录")
+            logger.info(f"[处理银行流水] 成功处理，银行类型: {bank_type}，解析到{len(transactions)}条记录")
             logger.info("="*50 + "\n")
-            return transactions
+            return bank_type, transactions
             
         except Exception as e:
             logger.error(f"\n[错误] 处理银行流水图片失败: {str(e)}")
             logger.error("="*50 + "\n")
             raise Exception(f"处理银行流水图片失败: {str(e)}")
     
+    def _run_parser(self, parser: BankStatementParser, bundle: OCRBundle) -> List[dict]:
+        """OCR识别、数据清洗和数据验证，验证失败时抛出异常"""
+        # 1. OCR识别和初步解析
+        logger.info("\n" + "-"*30 + " OCR识别开始 " + "-"*30)
+        raw_data = parser.parse(bundle)
+        logger.info("-"*30 + " OCR识别完成 " + "-"*30 + "\n")
+        
+        # 2. 数据清洗
+        logger.info("\n" + "-"*30 + " 数据清洗开始 " + "-"*30)
+        transactions = parser.clean_data(raw_data)
+        logger.info(f"[数据清洗] 清洗结果示例（第一条记录）:")
+        if transactions:
+            logger.info(f"账号: {transactions[0].get('account_number')}")
+            logger.info(f"日期: {transactions[0].get('transaction_date')}")
+            logger.info(f"类型: {transactions[0].get('transaction_type')}")
+            logger.info(f"金额: {transactions[0].get('amount')}")
+            logger.info(f"余额: {transactions[0].get('balance')}")
+            logger.info(f"对手方: {transactions[0].get('counterparty')}")
+            logger.info(f"描述: {transactions[0].get('description')}")
+        logger.info("-"*30 + " 数据清洗完成 " + "-"*30 + "\n")
+        
+        # 3. 数据验证
+        logger.info("\n" + "-"*30 + " 数据验证开始 " + "-"*30)
+        if not parser.validate_data(transactions):
+            raise Exception("数据验证失败")
+        logger.info("-"*30 + " 数据验证完成 " + "-"*30 + "\n")
+        
+        return transactions
+    
+    def _detect_and_process(self, image_data: bytes) -> Tuple[str, List[dict]]:
+        """自动识别银行类型后解析
+        
+        先用表格识别结果给各版式打分（账号已有记录时直接使用记住的版式），
+        再按得分依次尝试候选解析器；各候选共用同一份OCR结果，识别错误时不需要重新上传。
+        """
+        detector = get_layout_detector()
+        # 版式识别使用 "auto" 对应的OCR后端，未单独配置时为默认后端
+        backend = get_ocr_backend(AUTO_BANK_TYPE)
+        bundles = {id(backend): OCRBundle(image_data, backend)}
+        table_result = bundles[id(backend)].table
+        
+        errors = {}
+        match = detector.detect(table_result)
+        logger.info(
+            f"[版式识别] 来源: {match.source}，账号: {match.account_number}，"
+            f"结果: {match.bank_type}，置信度: {match.confidence}，候选: {match.candidates[:3]}"
+        )
+        if match.source == "memory":
+            result = self._try_parsers(image_data, bundles, [match.bank_type], errors)
+            if result:
+                return result
+            # 记住的版式解析失败（如银行更换了流水模板），删除记录后重新按版式打分
+            detector.forget(match.account_number)
+            match = detector.detect(table_result, use_memory=False)
+            logger.info(f"[版式识别] 重新识别结果: {match.bank_type}，置信度: {match.confidence}，候选: {match.candidates[:3]}")
+        
+        min_confidence = detection_min_confidence()
+        attempts = [
+            bank_type for bank_type, score in match.candidates
+            if score >= min_confidence and bank_type not in errors
+        ][:detection_max_attempts()]
+        if not attempts and not errors:
+            raise Exception(f"无法自动识别银行流水版式（候选得分: {match.candidates[:3]}），请手动选择银行类型")
+        
+        result = self._try_parsers(image_data, bundles, attempts, errors)
+        if not result:
+            raise Exception(f"自动识别的版式均解析失败: {errors}，请手动选择银行类型")
+        bank_type, transactions = result
+        detector.remember(match.account_number, bank_type)
+        detector.remember(transactions[0].get("account_number"), bank_type)
+        return result
+    
+    def _try_parsers(
+        self,
+        image_data: bytes,
+        bundles: Dict[int, OCRBundle],
+        bank_types: List[str],
+        errors: Dict[str, str]
+    ) -> Optional[Tuple[str, List[dict]]]:
+        """依次尝试解析，返回第一个验证通过的 (银行类型, 交易记录)，失败原因记录到 errors"""
+        for bank_type in bank_types:
+            parser = BankParserFactory.get_parser(bank_type)
+            # 候选使用的OCR后端与识别时相同则复用已有的识别结果
+            backend = get_ocr_backend(bank_type)
+            bundle = bundles.get(id(backend))
+            if bundle is None:
+                bundle = bundles[id(backend)] = OCRBundle(image_data, backend)
+            logger.info(f"[版式识别] 尝试解析器: {parser.__class__.__name__}，OCR后端: {backend.name}")
+            try:
+                return bank_type, self._run_parser(parser, bundle)
+            except Exception as e:
+                logger.warning(f"[版式识别] {bank_type} 解析失败: {str(e)}")
+                errors[bank_type] = str(e)
+        return None
+    
     def create_bank_statement(
         self,
         db: Session,
         file_data: bytes,
         file_name: str,
-        bank_type: str = "beijing_bank"
+        bank_type: Optional[str] = "beijing_bank"
     ) -> List[BankStatement]:
         """创建银行流水记录"""
         try:
@@ -149,9 +245,9 @@ class BankStatementService:
             )
             logger.info(f"[创建银行流水记录] 文件上传成功: {file_path}")
             
-            # 2. 处理图片
-            transactions = self.process_bank_statement(file_data, bank_type)
-            logger.info(f"[创建银行流水记录] 图片处理完成，获取到{len(transactions)}条交易记录")
+            # 2. 处理图片（未指定银行类型时自动识别，记录中保存实际使用的类型）
+            bank_type, transactions = self.resolve_and_process(file_data, bank_type)
+            logger.info(f"[创建银行流水记录] 图片处理完成，银行类型: {bank_type}，获取到{len(transactions)}条交易记录")
             
             # 3. 保存到数据库
             logger.info("\n" + "-"*30 + " 保存到数据库开始 " + "-"*30)
@@ -0,0 +1,76 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def baidu_api_base() -> str:
+    """百度接口根地址，可通过 BAIDU_API_BASE 指向本地替身服务做压测"""
+    return os.getenv("BAIDU_API_BASE", "https://aip.baidubce.com").rstrip("/")
+
+
+def default_timeout() -> Tuple[float, float]:
+    """百度接口的 (连接超时, 读取超时)，单位秒"""
+    return (
+        float(os.getenv("BAIDU_CONNECT_TIMEOUT", "5")),
+        float(os.getenv("BAIDU_READ_TIMEOUT", "30"))
+    )
+
+
+def create_session(pool_size: Optional[int] = None) -> requests.Session:
+    """创建带连接池的HTTP会话
+
+    连接在请求之间保持（keep-alive），同一主机的后续请求复用已建立的TCP/TLS连接。
+    """
+    pool_size = pool_size or int(os.getenv("BAIDU_POOL_SIZE", "10"))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=False)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """获取进程内共享的HTTP会话，所有百度接口客户端复用同一连接池"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def close_http_session():
+    """关闭共享会话，释放连接池"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_baidu_executor() -> ThreadPoolExecutor:
+    """获取并发调用百度接口用的共享线程池，大小由 BAIDU_CONCURRENCY 配置"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("BAIDU_CONCURRENCY", "8")),
+                    thread_name_prefix="baidu"
+                )
+    return _executor
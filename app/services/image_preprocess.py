@@ -0,0 +1,208 @@
+import os
+import io
+import logging
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class PreprocessProfile(NamedTuple):
+    """OCR前图片归一化配置"""
+    max_side: int = 0            # 长边上限（像素），0表示不缩放
+    grayscale: bool = True       # 转为灰度
+    binarize: bool = False       # Otsu二值化
+    deskew: bool = True          # 纠正小角度倾斜
+    max_skew_angle: float = 5.0  # 倾斜角搜索范围（度）
+    jpeg_quality: int = 90       # 输出JPEG的初始质量
+    max_bytes: int = 0           # 编码后字节数上限（base64之前），0表示不限制
+
+
+# 各类单据的分辨率目标
+# 发票文字较大且版式固定，1600px足以保证字段识别；银行流水表格字小行密，保留更高分辨率
+# 银行流水上传百度接口，base64后不能超过4MB，编码后控制在2MB以内
+PREPROCESS_PROFILES: Dict[str, PreprocessProfile] = {
+    "invoice": PreprocessProfile(max_side=1600, grayscale=True, binarize=False, deskew=True),
+    "bank_statement": PreprocessProfile(
+        max_side=2400, grayscale=True, binarize=False, deskew=True,
+        jpeg_quality=85, max_bytes=2 * 1024 * 1024
+    ),
+}
+
+# 超出字节上限时依次尝试的JPEG质量，仍超出则缩小分辨率，长边不低于 MIN_BUDGET_SIDE
+BUDGET_JPEG_QUALITIES = (80, 70, 60, 50)
+MIN_BUDGET_SIDE = 1200
+
+
+def get_profile(doc_type: str) -> PreprocessProfile:
+    """获取单据类型的预处理配置
+
+    可通过环境变量覆盖，如 PREPROCESS_INVOICE_MAX_SIDE=1200、PREPROCESS_INVOICE_BINARIZE=true；
+    IMAGE_PREPROCESS=false 时关闭全部预处理。
+    """
+    profile = PREPROCESS_PROFILES.get(doc_type, PreprocessProfile())
+    if os.getenv("IMAGE_PREPROCESS", "true").lower() != "true":
+        # 关闭预处理时仍保留字节上限，超限的图片接口会直接拒绝
+        return PreprocessProfile(max_side=0, grayscale=False, binarize=False, deskew=False, max_bytes=profile.max_bytes)
+
+    prefix = f"PREPROCESS_{doc_type.upper()}_"
+    overrides = {}
+    for field in profile._fields:
+        value = os.getenv(prefix + field.upper())
+        if value is None:
+            continue
+        current = getattr(profile, field)
+        if isinstance(current, bool):
+            overrides[field] = value.lower() == "true"
+        else:
+            overrides[field] = type(current)(value)
+    return profile._replace(**overrides)
+
+
+def _to_gray(img: np.ndarray, bgr: bool = False) -> np.ndarray:
+    if img.ndim == 2:
+        return img
+    # ITU-R 601-2 亮度公式，与PIL的L模式一致；OpenCV解码的数组通道顺序为BGR
+    red, blue = (img[..., 2], img[..., 0]) if bgr else (img[..., 0], img[..., 2])
+    gray = red * 0.299 + img[..., 1] * 0.587 + blue * 0.114
+    return gray.astype(np.uint8)
+
+
+def _otsu_threshold(gray: np.ndarray) -> int:
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = hist.sum()
+    if total == 0:
+        return 128
+    levels = np.arange(256)
+    weight_bg = np.cumsum(hist)
+    weight_fg = total - weight_bg
+    mean_cum = np.cumsum(hist * levels)
+    mean_bg = mean_cum / np.maximum(weight_bg, 1)
+    mean_fg = (mean_cum[-1] - mean_cum) / np.maximum(weight_fg, 1)
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between))
+
+
+def _projection_score(ink: Image.Image, angle: float) -> float:
+    rotated = np.asarray(ink.rotate(angle, resample=Image.NEAREST, expand=False, fillcolor=0), dtype=np.float32)
+    # 文字行水平时，行投影峰谷分明，方差最大
+    return float(np.var(rotated.sum(axis=1)))
+
+
+def estimate_skew(gray: np.ndarray, max_angle: float = 5.0) -> float:
+    """基于水平投影方差估计倾斜角（度），先粗后细两轮搜索"""
+    small = Image.fromarray(gray)
+    scale = 800 / max(small.size)
+    if scale < 1:
+        small = small.resize((int(small.width * scale), int(small.height * scale)), Image.BILINEAR)
+    small_arr = np.asarray(small)
+    ink = Image.fromarray(((small_arr < _otsu_threshold(small_arr)) * 255).astype(np.uint8))
+
+    best_angle = 0.0
+    best_score = _projection_score(ink, 0.0)
+    for angle in np.arange(-max_angle, max_angle + 0.01, 1.0):
+        score = _projection_score(ink, float(angle))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    center = best_angle
+    for angle in np.arange(center - 0.8, center + 0.81, 0.2):
+        score = _projection_score(ink, float(angle))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+
+def normalize_array(img: np.ndarray, profile: PreprocessProfile, bgr: bool = False) -> Tuple[np.ndarray, float]:
+    """归一化图片数组：缩放、灰度/二值化、纠偏
+
+    Args:
+        img: 图片数组（HxW 或 HxWx3）
+        profile: 预处理配置
+        bgr: 三通道数组的通道顺序为BGR（cv2.imdecode 的输出），默认RGB
+
+    Returns:
+        (处理后的图片数组, 缩放比例)。缩放比例用于把识别坐标换算回原图。
+    """
+    scale = 1.0
+    height, width = img.shape[:2]
+    if profile.max_side and max(height, width) > profile.max_side:
+        scale = profile.max_side / max(height, width)
+        size = (max(int(width * scale), 1), max(int(height * scale), 1))
+        img = np.asarray(Image.fromarray(img).resize(size, Image.BILINEAR, reducing_gap=2.0))
+
+    if profile.grayscale or profile.binarize:
+        img = _to_gray(img, bgr)
+
+    if profile.deskew:
+        angle = estimate_skew(_to_gray(img, bgr), profile.max_skew_angle)
+        if abs(angle) >= 0.3:
+            logger.info(f"纠正倾斜角: {angle:.1f}°")
+            fill = 255 if img.ndim == 2 else (255, 255, 255)
+            img = np.asarray(Image.fromarray(img).rotate(angle, resample=Image.BILINEAR, fillcolor=fill))
+
+    if profile.binarize:
+        img = np.where(img < _otsu_threshold(img), 0, 255).astype(np.uint8)
+
+    return img, scale
+
+
+def _encode_jpeg(img: np.ndarray, quality: int) -> bytes:
+    output = io.BytesIO()
+    Image.fromarray(img).save(output, format="JPEG", quality=quality, optimize=True)
+    return output.getvalue()
+
+
+def encode_within_budget(img: np.ndarray, profile: PreprocessProfile) -> bytes:
+    """编码图片数组，使结果不超过 profile.max_bytes
+
+    先按配置质量编码；超出上限时逐步降低JPEG质量，仍超出则按0.8倍缩小分辨率后重试，
+    直到长边降到 MIN_BUDGET_SIDE。二值化图片优先使用PNG（文字边缘无损且体积小）。
+    不使用WebP：百度表格识别接口只支持 jpg/jpeg/png/bmp 格式。
+    """
+    if profile.binarize:
+        output = io.BytesIO()
+        Image.fromarray(img).save(output, format="PNG", optimize=True)
+        data = output.getvalue()
+        if not profile.max_bytes or len(data) <= profile.max_bytes:
+            return data
+
+    data = _encode_jpeg(img, profile.jpeg_quality)
+    if not profile.max_bytes:
+        return data
+
+    while len(data) > profile.max_bytes:
+        for quality in BUDGET_JPEG_QUALITIES:
+            if quality >= profile.jpeg_quality:
+                continue
+            data = _encode_jpeg(img, quality)
+            if len(data) <= profile.max_bytes:
+                return data
+        height, width = img.shape[:2]
+        if max(height, width) * 0.8 < MIN_BUDGET_SIDE:
+            logger.warning(f"图片压缩后仍有{len(data)}字节，超过上限{profile.max_bytes}")
+            break
+        size = (int(width * 0.8), int(height * 0.8))
+        img = np.asarray(Image.fromarray(img).resize(size, Image.BILINEAR))
+        data = _encode_jpeg(img, profile.jpeg_quality)
+    return data
+
+
+def normalize_bytes(image_data: bytes, profile: PreprocessProfile) -> bytes:
+    """归一化图片二进制数据，供直接上传图片的OCR接口使用
+
+    未启用任何处理项且不超过字节上限时原样返回；否则先按EXIF方向摆正（与本地识别的 decode_image 一致）。
+    """
+    within_budget = not profile.max_bytes or len(image_data) <= profile.max_bytes
+    if within_budget and not (profile.max_side or profile.grayscale or profile.binarize or profile.deskew):
+        return image_data
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(image_data)))
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    img, _ = normalize_array(np.asarray(image), profile)
+    return encode_within_budget(img, profile)
@@ -1,16 +1,20 @@
-from paddleocr import PaddleOCR
 import re
 from datetime import datetime
 from ..models import Document, Invoice
 from sqlalchemy.orm import Session
 from ..utils.storage import MinioStorage
+from .ocr_engine import get_ocr_engine
 import os
 from uuid import uuid4
 
 class InvoiceService:
     def __init__(self):
-        self.ocr = PaddleOCR(use_angle_cls=True, lang="ch")
         self.storage = MinioStorage()
+
+    @property
+    def ocr(self):
+        """与OCRService共享的PaddleOCR引擎"""
+        return get_ocr_engine()
     
     def create_invoice(self, db: Session, file_data: bytes, invoice_data: dict):
         """创建发票记录"""
@@ -0,0 +1,58 @@
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List
+
+
+class KeywordTagger:
+    """多模式关键词标注器（Aho-Corasick自动机）
+
+    把多组关键词编译成一个自动机，对文本只扫描一遍，
+    返回其中出现过关键词的分组名称集合，代替逐组逐词的 `keyword in text` 判断。
+    """
+
+    def __init__(self, keyword_sets: Dict[str, Iterable[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+
+        outputs = [set()]
+        for tag, keywords in keyword_sets.items():
+            for keyword in keywords:
+                if not keyword:
+                    continue
+                node = 0
+                for ch in keyword:
+                    nxt = self._goto[node].get(ch)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[node][ch] = nxt
+                        self._goto.append({})
+                        self._fail.append(0)
+                        outputs.append(set())
+                    node = nxt
+                outputs[node].add(tag)
+
+        # 广度优先构建失败指针，并把失败链上的输出合并到当前状态
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                outputs[nxt] |= outputs[self._fail[nxt]]
+                queue.append(nxt)
+
+        self._out: List[FrozenSet[str]] = [frozenset(tags) for tags in outputs]
+
+    def tag(self, text: str) -> FrozenSet[str]:
+        """返回文本中命中的关键词分组"""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        found = set()
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found |= out[node]
+        return frozenset(found)
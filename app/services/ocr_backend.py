@@ -0,0 +1,143 @@
+import os
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from dotenv import load_dotenv
+
+from .ocr_bundle import OCRBundle
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class OCRBackend(ABC):
+    """银行流水OCR后端
+
+    识别结果统一采用百度OCR接口的结构（tables_result / words_result），
+    各解析器的 clean_data 不需要关心结果来自哪个后端。
+    """
+
+    name = ""
+
+    def encode_image(self, image_data: bytes) -> Any:
+        """把图片转换为后端需要的输入形式，同一图片由 OCRBundle 只调用一次"""
+        return image_data
+
+    @abstractmethod
+    def recognize_table(self, image_data: bytes, encode: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+        """表格文字识别，返回 {"tables_result": [{"header": [...], "body": [...], "footer": [...]}]}"""
+        pass
+
+    @abstractmethod
+    def recognize_general(self, image_data: bytes, encode: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+        """通用文字识别，返回 {"words_result": [{"words": ...}]}"""
+        pass
+
+    def recognize_handwriting(self, image_data: bytes, encode: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+        """手写文字识别，默认使用通用文字识别"""
+        return self.recognize_general(image_data, encode)
+
+    def recognize_table_and_general(
+        self,
+        image: Union[bytes, OCRBundle],
+        general_required: bool = True
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """并发调用表格识别和通用文字识别
+        
+        通用文字识别提交到共享线程池，表格识别在当前线程执行，
+        总耗时约等于两者中较慢的一个。
+        
+        Args:
+            image: 图片二进制数据或 OCRBundle
+            general_required: 通用文字识别失败时是否抛出异常；为False时返回None
+            
+        Returns:
+            Tuple: (表格识别结果, 通用文字识别结果)
+        """
+        bundle = OCRBundle.wrap(image, self)
+        bundle.prefetch("general")
+        table_result = bundle.table
+        
+        try:
+            general_result = bundle.general
+        except Exception as e:
+            if general_required:
+                raise
+            logger.warning("通用文字识别失败，只使用表格识别结果: %s", e)
+            general_result = None
+        return table_result, general_result
+            
+    def recognize_table_and_text(self, image: Union[bytes, OCRBundle]) -> Dict[str, Any]:
+        """同时进行表格识别和通用文字识别
+        
+        Args:
+            image: 图片二进制数据或 OCRBundle
+            
+        Returns:
+            Dict: 合并后的识别结果
+        """
+        try:
+            # 并发调用表格识别和通用文字识别
+            table_result, text_result = self.recognize_table_and_general(image)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("表格识别结果: %s", json.dumps(table_result, ensure_ascii=False, indent=2))
+                logger.debug("通用文字识别结果: %s", json.dumps(text_result, ensure_ascii=False, indent=2))
+            
+            # 3. 合并结果（复制一份，不修改 OCRBundle 中缓存的原始结果）
+            if isinstance(table_result, dict) and isinstance(text_result, dict):
+                # 确保words_result存在
+                table_result = dict(table_result)
+                table_result["words_result"] = list(table_result.get("words_result", []))
+                    
+                # 将通用文字识别的结果添加到words_result中
+                if "words_result" in text_result and isinstance(text_result["words_result"], list):
+                    table_result["words_result"].extend(text_result["words_result"])
+                    
+            return table_result
+        except Exception as e:
+            raise Exception(f"表格和文字识别失败: {str(e)}")
+
+
+_backends: Dict[str, OCRBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def _create_backend(name: str) -> OCRBackend:
+    # 按需导入，只使用百度接口时不加载PaddleOCR
+    if name == "baidu":
+        from .baidu_service import BaiduOCRService
+        return BaiduOCRService()
+    if name == "paddle":
+        from .paddle_backend import PaddleOCRBackend
+        return PaddleOCRBackend()
+    raise ValueError(f"Unsupported OCR backend: {name}")
+
+
+def backend_name_for(bank_type: str) -> str:
+    """银行类型使用的OCR后端名称
+
+    BANK_OCR_BACKENDS 按银行类型指定，如 "ccb_v1=paddle,boc_v2=paddle"，
+    未指定的银行类型使用 BANK_OCR_BACKEND（默认baidu）。
+    """
+    for item in os.getenv("BANK_OCR_BACKENDS", "").split(","):
+        key, sep, value = item.partition("=")
+        if sep and key.strip() == bank_type:
+            return value.strip()
+    return os.getenv("BANK_OCR_BACKEND", "baidu")
+
+
+def get_ocr_backend(bank_type: str) -> OCRBackend:
+    """获取银行类型对应的OCR后端，同名后端在进程内共享"""
+    name = backend_name_for(bank_type)
+    backend = _backends.get(name)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(name)
+            if backend is None:
+                backend = _create_backend(name)
+                _backends[name] = backend
+    return backend
@@ -0,0 +1,83 @@
+import os
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from .ocr_pool import OCRWorkerPool, get_ocr_pool
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class OCRBatcher:
+    """OCR微批处理器
+
+    在一个时间窗口内收集并发提交的图片，凑成一批交给工作池统一识别，
+    识别结果再按请求拆分返回。单个请求额外等待的时间不超过窗口长度。
+    """
+
+    def __init__(
+        self,
+        pool: Optional[OCRWorkerPool] = None,
+        window_ms: Optional[float] = None,
+        max_batch_size: Optional[int] = None
+    ):
+        self.pool = pool or get_ocr_pool()
+        self.window = (window_ms if window_ms is not None else float(os.getenv("OCR_BATCH_WINDOW_MS", "20"))) / 1000
+        self.max_batch_size = max_batch_size or int(os.getenv("OCR_BATCH_MAX_SIZE", "8"))
+        self._pending: List[Tuple[bytes, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, image_bytes: bytes) -> List:
+        """提交一张图片，返回 PaddleOCR 格式的识别结果"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((image_bytes, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[bytes, asyncio.Future]]):
+        logger.info(f"OCR批处理: {len(batch)}张图片")
+        try:
+            results = await self.pool.run_ocr_batch([image_bytes for image_bytes, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+_batcher: Optional[OCRBatcher] = None
+
+
+def get_ocr_batcher() -> OCRBatcher:
+    """获取进程内共享的OCR批处理器"""
+    global _batcher
+    if _batcher is None:
+        _batcher = OCRBatcher()
+    return _batcher
@@ -0,0 +1,94 @@
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Union
+
+from .http_client import get_baidu_executor
+
+if TYPE_CHECKING:
+    from .ocr_backend import OCRBackend
+
+
+class OCRBundle:
+    """单张图片的OCR结果集合
+
+    图片只编码一次（编码形式由OCR后端决定），各接口结果在首次访问时才请求并缓存，
+    同一张图片的任一接口最多调用一次（失败结果同样缓存）。
+    并发访问同一接口时只会发出一个请求，其余调用方等待其结果。
+    """
+
+    # 结果名称 -> OCRBackend 上的识别方法
+    ENDPOINTS = {
+        "table": "recognize_table",
+        "general": "recognize_general",
+        "handwriting": "recognize_handwriting",
+    }
+
+    def __init__(self, image_data: bytes, ocr_service: "OCRBackend"):
+        self.image_data = image_data
+        self.ocr_service = ocr_service
+        self._encoded = None
+        self._encode_lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def wrap(cls, image: Union[bytes, "OCRBundle"], ocr_service) -> "OCRBundle":
+        """parse() 既可接收图片数据也可接收已有的结果集合"""
+        if isinstance(image, cls):
+            return image
+        return cls(image, ocr_service)
+
+    def encode(self) -> Any:
+        """预处理并编码图片，只执行一次"""
+        if self._encoded is None:
+            with self._encode_lock:
+                if self._encoded is None:
+                    self._encoded = self.ocr_service.encode_image(self.image_data)
+        return self._encoded
+
+    def result(self, name: str) -> Dict[str, Any]:
+        """获取指定接口的识别结果，未请求过时同步请求"""
+        with self._lock:
+            future = self._futures.get(name)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[name] = future
+
+        if owner:
+            recognize: Callable = getattr(self.ocr_service, self.ENDPOINTS[name])
+            try:
+                future.set_result(recognize(self.image_data, encode=self.encode))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+    def prefetch(self, *names: str):
+        """在后台并发请求尚未请求过的接口"""
+        executor = get_baidu_executor()
+        for name in names:
+            if name not in self._futures:
+                executor.submit(self.result, name)
+
+    @property
+    def table(self) -> Dict[str, Any]:
+        """表格识别结果"""
+        return self.result("table")
+
+    @property
+    def general(self) -> Dict[str, Any]:
+        """通用文字识别结果"""
+        return self.result("general")
+
+    @property
+    def handwriting(self) -> Dict[str, Any]:
+        """手写文字识别结果"""
+        return self.result("handwriting")
+
+    @property
+    def words(self) -> List[str]:
+        """通用文字识别得到的文本行"""
+        words_result = self.general.get("words_result", [])
+        if not isinstance(words_result, list):
+            return []
+        return [item["words"] for item in words_result if isinstance(item, dict) and "words" in item]
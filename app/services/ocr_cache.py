@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class OCRResultCache:
+    """OCR原始结果磁盘缓存
+
+    以图片内容的SHA-256和引擎/配置版本作为键，缓存OCR接口返回的原始结果。
+    总大小超过上限时按最近最少使用（LRU）淘汰，读取时更新文件修改时间作为访问时间。
+
+    多个进程（如多个uvicorn worker）可以共用同一个缓存目录：上限按目录的实际内容执行。
+    本进程估算的大小超限，或距上次扫描超过 OCR_CACHE_SCAN_INTERVAL 秒（默认60）时，
+    写入后重新扫描目录，按修改时间淘汰最旧的文件；两次扫描之间其他进程写入的内容可能短暂超出上限。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        scan_interval: Optional[float] = None
+    ):
+        self.cache_dir = cache_dir or os.getenv("OCR_CACHE_DIR", os.path.join(".cache", "ocr"))
+        self.max_bytes = max_bytes or int(float(os.getenv("OCR_CACHE_MAX_MB", "512")) * 1024 * 1024)
+        self.scan_interval = (
+            scan_interval if scan_interval is not None else float(os.getenv("OCR_CACHE_SCAN_INTERVAL", "60"))
+        )
+        self._lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, int]"] = None  # key -> 文件大小，按访问时间排序
+        self._size = 0
+        self._scanned_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(data: bytes, version: str) -> str:
+        """根据图片内容和版本生成缓存键"""
+        digest = hashlib.sha256(data).hexdigest()
+        version_digest = hashlib.sha256(version.encode("utf-8")).hexdigest()[:16]
+        return f"{version_digest}_{digest}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load_index(self):
+        """启动后首次访问时扫描缓存目录"""
+        if self._index is None:
+            self._scan()
+
+    def _scan(self):
+        """扫描缓存目录，按修改时间重建LRU索引（包含其他进程写入的文件）"""
+        entries = []
+        if os.path.isdir(self.cache_dir):
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if not name.endswith(".json"):
+                        continue
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, name[:-5], stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._size = sum(size for _, _, size in entries)
+        self._scanned_at = time.monotonic()
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存，未命中返回None"""
+        path = self._path(key)
+        with self._lock:
+            self._load_index()
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    value = json.load(f)
+            except (OSError, ValueError):
+                # 文件不存在（可能已被其他进程淘汰）或内容损坏
+                self.misses += 1
+                if key in self._index:
+                    self._size -= self._index.pop(key)
+                return None
+
+            self.hits += 1
+            if key in self._index:
+                self._index.move_to_end(key)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return value
+
+    def set(self, key: str, value: Any):
+        """写入缓存并按需淘汰最旧的条目"""
+        path = self._path(key)
+        data = json.dumps(value, ensure_ascii=False, default=float).encode("utf-8")
+        with self._lock:
+            self._load_index()
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"写入OCR缓存失败: {str(e)}")
+                return
+
+            if key in self._index:
+                self._size -= self._index.pop(key)
+            self._index[key] = len(data)
+            self._size += len(data)
+            if self._size > self.max_bytes or time.monotonic() - self._scanned_at >= self.scan_interval:
+                # 以目录实际内容为准，计入其他进程写入和淘汰的文件
+                self._scan()
+            self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """缓存命中统计"""
+        with self._lock:
+            self._load_index()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._index),
+                "size_bytes": self._size
+            }
+
+
+_cache: Optional[OCRResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> Optional[OCRResultCache]:
+    """获取进程内共享的OCR结果缓存，OCR_CACHE_ENABLED=false 时返回None"""
+    global _cache
+    if os.getenv("OCR_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = OCRResultCache()
+    return _cache
@@ -0,0 +1,334 @@
+import os
+import threading
+import logging
+import multiprocessing
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class OCREngineConfig(NamedTuple):
+    """PaddleOCR引擎配置，同一配置在进程内只加载一次模型"""
+    lang: str = "ch"
+    use_angle_cls: bool = True
+    enable_mkldnn: bool = True
+    cpu_threads: int = 10
+    rec_batch_num: int = 16
+
+
+def default_engine_config() -> OCREngineConfig:
+    """从环境变量读取默认引擎配置"""
+    return OCREngineConfig(
+        lang=os.getenv("OCR_LANG", "ch"),
+        use_angle_cls=os.getenv("OCR_USE_ANGLE_CLS", "true").lower() == "true",
+        enable_mkldnn=os.getenv("OCR_ENABLE_MKLDNN", "true").lower() == "true",
+        cpu_threads=int(os.getenv("OCR_CPU_THREADS", "10")),
+        rec_batch_num=int(os.getenv("OCR_REC_BATCH_NUM", "16"))
+    )
+
+
+_engines: Dict[OCREngineConfig, object] = {}
+_engines_lock = threading.Lock()
+
+
+def get_ocr_engine(config: Optional[OCREngineConfig] = None):
+    """获取共享的PaddleOCR引擎
+
+    引擎按配置懒加载并在进程内复用，避免各服务重复加载检测、方向分类和识别模型。
+
+    Args:
+        config: 引擎配置，默认读取环境变量
+
+    Returns:
+        PaddleOCR实例
+    """
+    config = config or default_engine_config()
+    engine = _engines.get(config)
+    if engine is not None:
+        return engine
+
+    with _engines_lock:
+        # 双重检查，保证并发首次调用时只加载一次模型
+        engine = _engines.get(config)
+        if engine is None:
+            from paddleocr import PaddleOCR
+
+            logger.info(f"加载PaddleOCR模型: {config}")
+            engine = PaddleOCR(
+                use_angle_cls=config.use_angle_cls,
+                lang=config.lang,
+                show_log=True,
+                use_gpu=False,
+                enable_mkldnn=config.enable_mkldnn,
+                cpu_threads=config.cpu_threads,
+                rec_batch_num=config.rec_batch_num
+            )
+            _engines[config] = engine
+    return engine
+
+
+def _sorted_boxes(dt_boxes) -> List[np.ndarray]:
+    """按从上到下、从左到右排序文本框（与PaddleOCR一致）"""
+    boxes = sorted(dt_boxes, key=lambda x: (x[0][1], x[0][0]))
+    for i in range(len(boxes) - 1):
+        for j in range(i, -1, -1):
+            if abs(boxes[j + 1][0][1] - boxes[j][0][1]) < 10 and boxes[j + 1][0][0] < boxes[j][0][0]:
+                boxes[j], boxes[j + 1] = boxes[j + 1], boxes[j]
+            else:
+                break
+    return boxes
+
+
+def _crop_box(img: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """按文本框透视裁剪出文本行图像"""
+    import cv2
+
+    points = points.astype(np.float32)
+    width = int(max(np.linalg.norm(points[0] - points[1]), np.linalg.norm(points[2] - points[3])))
+    height = int(max(np.linalg.norm(points[0] - points[3]), np.linalg.norm(points[1] - points[2])))
+    pts_std = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    matrix = cv2.getPerspectiveTransform(points, pts_std)
+    crop = cv2.warpPerspective(
+        img, matrix, (width, height),
+        borderMode=cv2.BORDER_REPLICATE,
+        flags=cv2.INTER_CUBIC
+    )
+    # 竖排文本旋转为横排
+    if crop.shape[0] / max(crop.shape[1], 1) >= 1.5:
+        crop = np.rot90(crop)
+    return crop
+
+
+class OrientationStats:
+    """页面方向判断统计，可在工作进程间共享"""
+
+    def __init__(self, ctx=None):
+        ctx = ctx or multiprocessing
+        self.pages = ctx.Value("i", 0)          # 处理的页数
+        self.slow_path = ctx.Value("i", 0)      # 需要逐个文本框做方向分类的页数
+        self.flipped = ctx.Value("i", 0)        # 整页倒置的页数
+        self.rotated_90 = ctx.Value("i", 0)     # 整页旋转90度的页数
+        self.exif_rotated = ctx.Value("i", 0)   # 按EXIF方向校正的页数
+
+    @staticmethod
+    def _incr(counter):
+        with counter.get_lock():
+            counter.value += 1
+
+    def record_page(self, slow_path: bool = False, flipped: bool = False, rotated_90: bool = False):
+        self._incr(self.pages)
+        if slow_path:
+            self._incr(self.slow_path)
+        if flipped:
+            self._incr(self.flipped)
+        if rotated_90:
+            self._incr(self.rotated_90)
+
+    def record_exif(self):
+        self._incr(self.exif_rotated)
+
+    def snapshot(self) -> Dict[str, float]:
+        pages = self.pages.value
+        return {
+            "pages": pages,
+            "slow_path": self.slow_path.value,
+            "slow_path_rate": self.slow_path.value / pages if pages else 0.0,
+            "flipped": self.flipped.value,
+            "rotated_90": self.rotated_90.value,
+            "exif_rotated": self.exif_rotated.value
+        }
+
+
+_orientation_stats: Optional[OrientationStats] = None
+
+
+def set_orientation_stats(stats: OrientationStats):
+    """设置本进程使用的方向统计（工作进程初始化时传入共享计数器）"""
+    global _orientation_stats
+    _orientation_stats = stats
+
+
+def get_orientation_stats() -> OrientationStats:
+    global _orientation_stats
+    if _orientation_stats is None:
+        _orientation_stats = OrientationStats()
+    return _orientation_stats
+
+
+# 整页方向判断时抽样的文本行数量
+ORIENTATION_SAMPLE_SIZE = int(os.getenv("OCR_ORIENTATION_SAMPLE", "8"))
+
+
+def _detect(engine, img: np.ndarray) -> List[np.ndarray]:
+    dt_boxes, _ = engine.text_detector(img)
+    if dt_boxes is None or len(dt_boxes) == 0:
+        return []
+    return _sorted_boxes(dt_boxes)
+
+
+def _is_rotated_90(boxes: List[np.ndarray]) -> bool:
+    """大部分文本框为竖长形时，判定整页旋转了90度"""
+    if len(boxes) < 5:
+        return False
+    tall = sum(
+        1 for box in boxes
+        if np.linalg.norm(box[0] - box[3]) > 1.5 * np.linalg.norm(box[0] - box[1])
+    )
+    return tall / len(boxes) > 0.6
+
+
+def _page_orientation(engine, crops: List[np.ndarray]) -> str:
+    """抽样最宽的几行做方向分类，判断整页朝向
+
+    Returns:
+        upright: 全部正向；flipped: 多数倒置；mixed: 无法确定，需要逐行分类
+    """
+    sample = sorted(crops, key=lambda c: c.shape[1], reverse=True)[:ORIENTATION_SAMPLE_SIZE]
+    _, cls_res, _ = engine.text_classifier(list(sample))
+    flipped = sum(1 for label, score in cls_res if label == "180" and score > 0.9)
+    if flipped == 0:
+        return "upright"
+    if flipped * 2 > len(cls_res):
+        return "flipped"
+    return "mixed"
+
+
+def batch_ocr(engine, images: List[np.ndarray], cls: bool = True) -> List[List]:
+    """对多张图片执行批量OCR
+
+    逐张执行文本检测和整页方向判断后，将所有图片的文本行合并为一批做文字识别，
+    再按图片拆分结果。返回格式与 PaddleOCR.ocr 单张调用的 result[0] 一致。
+
+    方向按页判断：多数文本框为竖长形时整页旋转90度后重新检测；
+    再抽样少量文本行做方向分类，整页正向时跳过逐行分类，整页倒置时整体翻转，
+    只有方向不一致时才对每个文本框执行方向分类。
+
+    Args:
+        engine: PaddleOCR实例
+        images: 图片数组列表
+        cls: 是否处理文字方向
+
+    Returns:
+        每张图片的识别结果列表
+    """
+    import cv2
+
+    classifier = getattr(engine, "text_classifier", None) if cls else None
+    stats = get_orientation_stats()
+
+    all_crops = []
+    owners = []  # 每个文本行对应的(图片序号, 文本框)
+    for image_idx, img in enumerate(images):
+        boxes = _detect(engine, img)
+        rotated_90 = False
+        if cls and _is_rotated_90(boxes):
+            img = cv2.rotate(img, cv2.ROTATE_90_CLOCKWISE)
+            boxes = _detect(engine, img)
+            rotated_90 = True
+        if not boxes:
+            continue
+
+        crops = [_crop_box(img, box) for box in boxes]
+        orientation = "upright"
+        if classifier is not None:
+            orientation = _page_orientation(engine, crops)
+            if orientation == "flipped":
+                crops = [np.rot90(crop, 2) for crop in crops]
+            elif orientation == "mixed":
+                crops, _, _ = classifier(crops)
+        if cls:
+            stats.record_page(
+                slow_path=orientation == "mixed",
+                flipped=orientation == "flipped",
+                rotated_90=rotated_90
+            )
+
+        all_crops.extend(crops)
+        owners.extend((image_idx, box) for box in boxes)
+
+    results: List[List] = [[] for _ in images]
+    if not all_crops:
+        return results
+
+    rec_res, _ = engine.text_recognizer(all_crops)
+
+    drop_score = getattr(engine, "drop_score", 0.5)
+    for (image_idx, box), (text, score) in zip(owners, rec_res):
+        if score >= drop_score:
+            results[image_idx].append([box.tolist(), (text, float(score))])
+    return results
+
+
+# 增值税发票模板区域，坐标为相对发票表格外框的比例 (x0, y0, x1, y1)
+# y为负表示外框上方：发票代码、号码、开票日期位于表格右上方
+INVOICE_REGIONS: Dict[str, Tuple[float, float, float, float]] = {
+    "header": (0.55, -0.45, 1.0, 0.0),   # 发票代码/号码/开票日期
+    "buyer": (0.0, 0.0, 0.65, 0.25),     # 购买方信息
+    "items": (0.0, 0.25, 1.0, 0.55),     # 商品明细表（含列标题行）
+    "amount": (0.0, 0.55, 1.0, 0.78),    # 合计/价税合计行
+    "seller": (0.0, 0.78, 0.65, 1.0),    # 销售方信息
+}
+
+
+def locate_invoice_frame(img: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+    """定位发票表格外框
+
+    提取长横线和竖线后取面积最大的外接矩形，面积不足整页30%时视为未找到。
+
+    Returns:
+        (x0, y0, x1, y1)，未找到时返回None
+    """
+    import cv2
+
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    height, width = gray.shape
+    binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 15, 10)
+    horizontal = cv2.morphologyEx(
+        binary, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (max(width // 20, 1), 1))
+    )
+    vertical = cv2.morphologyEx(
+        binary, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(height // 20, 1)))
+    )
+    contours, _ = cv2.findContours(cv2.bitwise_or(horizontal, vertical), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+
+    x, y, w, h = max((cv2.boundingRect(c) for c in contours), key=lambda r: r[2] * r[3])
+    if w * h < 0.3 * width * height:
+        return None
+    return x, y, x + w, y + h
+
+
+def region_ocr(engine, img: np.ndarray, frame: Tuple[int, int, int, int]) -> List:
+    """只识别发票模板区域内的文字
+
+    各区域裁剪后作为一批执行检测和识别，文本框坐标换算回整页坐标，
+    返回格式与 PaddleOCR.ocr 单张调用的 result[0] 一致。
+    """
+    height, width = img.shape[:2]
+    fx0, fy0, fx1, fy1 = frame
+    fw, fh = fx1 - fx0, fy1 - fy0
+
+    crops = []
+    offsets = []
+    for rx0, ry0, rx1, ry1 in INVOICE_REGIONS.values():
+        x0 = max(int(fx0 + rx0 * fw), 0)
+        y0 = max(int(fy0 + ry0 * fh), 0)
+        x1 = min(int(fx0 + rx1 * fw), width)
+        y1 = min(int(fy0 + ry1 * fh), height)
+        if x1 - x0 < 8 or y1 - y0 < 8:
+            continue
+        crops.append(np.ascontiguousarray(img[y0:y1, x0:x1]))
+        offsets.append((x0, y0))
+
+    # 区域裁剪图较小，不做整页方向判断；方向异常导致字段缺失时由调用方回退整页识别
+    lines = []
+    for (x0, y0), region_lines in zip(offsets, batch_ocr(engine, crops, cls=False)):
+        for box, text_info in region_lines:
+            lines.append([[[x + x0, y + y0] for x, y in box], text_info])
+    return lines
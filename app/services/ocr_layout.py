@@ -0,0 +1,40 @@
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+
+class LineIndex:
+    """OCR文本行的纵向索引
+
+    把文本行按y坐标排序一次，之后"同一行/附近行"的查询通过二分查找完成，
+    复杂度为 O(log n + k)，不再对全部文本行做线性扫描。
+    查询返回的是文本行在原始列表中的下标，并保持原始顺序。
+    """
+
+    def __init__(self, ys: Sequence[float]):
+        order = sorted(range(len(ys)), key=ys.__getitem__)
+        self._ys = [ys[i] for i in order]
+        self._ids = order
+
+    @classmethod
+    def from_lines(cls, texts_with_pos: Iterable[Tuple]) -> "LineIndex":
+        """由 (文本, 置信度, 坐标) 列表建立索引，取左上角y坐标"""
+        return cls([pos[0][1] for _, _, pos in texts_with_pos])
+
+    def _span(self, y: float, tolerance: float) -> Tuple[int, int]:
+        # 与 abs(y' - y) < tolerance 等价的开区间
+        return bisect_right(self._ys, y - tolerance), bisect_left(self._ys, y + tolerance)
+
+    def has_near(self, y: float, tolerance: float) -> bool:
+        """是否存在与y距离小于tolerance的文本行"""
+        lo, hi = self._span(y, tolerance)
+        return lo < hi
+
+    def near(self, y: float, tolerance: float) -> List[int]:
+        """与y距离小于tolerance的文本行下标，按原始顺序"""
+        lo, hi = self._span(y, tolerance)
+        return sorted(self._ids[lo:hi])
+
+    def first_near(self, y: float, tolerance: float) -> Optional[int]:
+        """与y距离小于tolerance的第一条文本行下标（按原始顺序），不存在时返回None"""
+        lo, hi = self._span(y, tolerance)
+        return min(self._ids[lo:hi], default=None)
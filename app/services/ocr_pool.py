@@ -0,0 +1,307 @@
+import os
+import io
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from .ocr_engine import (
+    OCREngineConfig, OrientationStats, batch_ocr, default_engine_config, get_ocr_engine,
+    get_orientation_stats, locate_invoice_frame, region_ocr, set_orientation_stats
+)
+from .image_preprocess import PreprocessProfile, get_profile, normalize_array
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class OCRPoolBusyError(Exception):
+    """OCR任务队列已满"""
+
+
+class OCRTimeoutError(Exception):
+    """OCR任务执行超时"""
+
+
+def _init_worker(config: OCREngineConfig, stats: OrientationStats):
+    """工作进程初始化：预先加载本进程的OCR模型，并接入共享的方向统计"""
+    set_orientation_stats(stats)
+    get_ocr_engine(config)
+
+
+# EXIF方向值对应的图像变换
+_EXIF_TRANSFORMS = {
+    2: lambda a: a[:, ::-1],
+    3: lambda a: a[::-1, ::-1],
+    4: lambda a: a[::-1],
+    5: lambda a: np.swapaxes(a, 0, 1),
+    6: lambda a: np.swapaxes(a, 0, 1)[:, ::-1],
+    7: lambda a: np.swapaxes(a, 0, 1)[::-1, ::-1],
+    8: lambda a: np.swapaxes(a, 0, 1)[::-1],
+}
+
+
+def _exif_orientation(image_bytes: bytes) -> int:
+    """读取EXIF方向标记，只解析文件头部"""
+    try:
+        from PIL import Image
+
+        with Image.open(io.BytesIO(bytes(memoryview(image_bytes)[:128 * 1024]))) as image:
+            return int(image.getexif().get(0x0112, 1))
+    except Exception:
+        return 1
+
+
+def decode_image(image_bytes: bytes, profile: PreprocessProfile) -> Tuple[np.ndarray, float]:
+    """解码并归一化图片，返回(三通道图片数组, 缩放比例)
+
+    直接从原始缓冲区解码为NumPy数组，不经过中间的PIL图像和额外复制；
+    需要灰度时直接按灰度解码。
+    """
+    import cv2
+
+    flags = cv2.IMREAD_GRAYSCALE if (profile.grayscale or profile.binarize) else cv2.IMREAD_COLOR
+    img_array = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), flags | cv2.IMREAD_IGNORE_ORIENTATION)
+    if img_array is None:
+        raise ValueError("无法解码图片数据")
+
+    # 手机拍摄的图片按EXIF方向摆正
+    orientation = _exif_orientation(image_bytes)
+    if orientation in _EXIF_TRANSFORMS:
+        img_array = np.ascontiguousarray(_EXIF_TRANSFORMS[orientation](img_array))
+        get_orientation_stats().record_exif()
+
+    img_array, scale = normalize_array(img_array, profile, bgr=True)
+    if img_array.ndim == 2:
+        # 检测模型需要三通道输入
+        img_array = cv2.cvtColor(img_array, cv2.COLOR_GRAY2BGR)
+    return img_array, scale
+
+
+def restore_scale(lines: Optional[List], scale: float) -> Optional[List]:
+    """将文本框坐标换算回原图尺寸，保证后续按像素距离的判断不受缩放影响"""
+    if not lines or scale == 1.0:
+        return lines
+    return [
+        [[[x / scale, y / scale] for x, y in box], text_info]
+        for box, text_info in lines
+    ]
+
+
+def run_ocr(image_bytes: bytes, config: OCREngineConfig, profile: PreprocessProfile) -> List:
+    """在工作进程中执行OCR识别
+
+    Args:
+        image_bytes: 图片二进制数据
+        config: 引擎配置
+        profile: 图片预处理配置
+
+    Returns:
+        PaddleOCR原始识别结果
+    """
+    img_array, scale = decode_image(image_bytes, profile)
+    lines = batch_ocr(get_ocr_engine(config), [img_array], cls=True)[0]
+    return [restore_scale(lines, scale)]
+
+
+def run_ocr_batch(images: List[bytes], config: OCREngineConfig, profile: PreprocessProfile) -> List:
+    """在工作进程中批量识别多张图片
+
+    Returns:
+        与输入一一对应的列表，成功时为 PaddleOCR 格式的结果（[lines]），
+        单张图片解码失败时为对应的异常对象，不影响同批其他图片
+    """
+    arrays = []
+    outputs: List[Any] = [None] * len(images)
+    for idx, image_bytes in enumerate(images):
+        try:
+            img_array, scale = decode_image(image_bytes, profile)
+            arrays.append((idx, img_array, scale))
+        except Exception as e:
+            outputs[idx] = ValueError(f"图片解码失败: {str(e)}")
+
+    if arrays:
+        results = batch_ocr(get_ocr_engine(config), [arr for _, arr, _ in arrays], cls=True)
+        for (idx, _, scale), lines in zip(arrays, results):
+            outputs[idx] = [restore_scale(lines, scale)]
+    return outputs
+
+
+def run_ocr_regions(image_bytes: bytes, config: OCREngineConfig, profile: PreprocessProfile) -> Optional[List]:
+    """在工作进程中只识别发票模板区域
+
+    Returns:
+        PaddleOCR格式的识别结果；未定位到发票外框时返回None
+    """
+    img_array, scale = decode_image(image_bytes, profile)
+    frame = locate_invoice_frame(img_array)
+    if frame is None:
+        return None
+    lines = region_ocr(get_ocr_engine(config), img_array, frame)
+    return [restore_scale(lines, scale)]
+
+
+class OCRWorkerPool:
+    """OCR工作进程池
+
+    每个工作进程持有独立的模型，任务在事件循环之外执行。
+    排队中与执行中的任务总数受限，超出时直接拒绝而不是无限堆积。
+    等待超时的任务仍在工作进程中运行，直到真正结束才释放名额。
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        job_timeout: Optional[float] = None,
+        engine_config: Optional[OCREngineConfig] = None,
+        preprocess_profile: Optional[PreprocessProfile] = None
+    ):
+        default_workers = min(2, os.cpu_count() or 1)
+        self.workers = workers if workers is not None else int(os.getenv("OCR_WORKERS", default_workers))
+        self.queue_size = queue_size if queue_size is not None else int(os.getenv("OCR_QUEUE_SIZE", "8"))
+        self.job_timeout = job_timeout if job_timeout is not None else float(os.getenv("OCR_JOB_TIMEOUT", "60"))
+        self.engine_config = engine_config or default_engine_config()
+        self.preprocess_profile = preprocess_profile or get_profile("invoice")
+        self._mp_context = multiprocessing.get_context("spawn")
+        self.orientation_stats = OrientationStats(self._mp_context)
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        """允许同时存在（执行中+排队中）的任务数"""
+        return max(self.workers, 1) + self.queue_size
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.workers > 0:
+                # 使用spawn避免fork后共享Paddle推理库的内部状态
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=self._mp_context,
+                    initializer=_init_worker,
+                    initargs=(self.engine_config, self.orientation_stats)
+                )
+            else:
+                # workers=0 时在本进程的后台线程中执行，使用共享引擎
+                set_orientation_stats(self.orientation_stats)
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr")
+            logger.info(f"OCR工作池已启动: workers={self.workers}, queue_size={self.queue_size}")
+        return self._executor
+
+    def _start(self, fn: Callable, *args: Any) -> Future:
+        """占用一个名额并把任务交给执行器
+
+        名额在任务真正结束（或排队中被取消）时释放：等待超时只放弃等待，
+        已在执行的任务会继续占用工作进程。
+        """
+        with self._pending_lock:
+            if self._pending >= self.capacity:
+                raise OCRPoolBusyError(f"OCR任务队列已满({self.capacity})，请稍后重试")
+            self._pending += 1
+
+        try:
+            job = self._get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            self._release()
+            self._reset_broken()
+            raise
+        except BaseException:
+            self._release()
+            raise
+        job.add_done_callback(self._release)
+        return job
+
+    def _release(self, job: Any = None):
+        with self._pending_lock:
+            self._pending -= 1
+
+    def _reset_broken(self):
+        # 工作进程异常退出，丢弃旧进程池，下次提交时重建
+        logger.error("OCR工作进程异常退出，重建进程池")
+        self.shutdown(wait=False)
+
+    async def submit(self, fn: Callable, *args: Any, timeout: Optional[float] = None) -> Any:
+        """提交任务并等待结果
+
+        Args:
+            fn: 可被pickle的模块级函数
+            *args: 函数参数
+            timeout: 单个任务超时时间（秒），默认使用池配置
+
+        Raises:
+            OCRPoolBusyError: 队列已满
+            OCRTimeoutError: 任务超时
+        """
+        job = self._start(fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), timeout or self.job_timeout)
+        except asyncio.TimeoutError:
+            raise OCRTimeoutError(f"OCR任务超时({timeout or self.job_timeout}秒)")
+        except BrokenProcessPool:
+            self._reset_broken()
+            raise
+
+    def run(self, fn: Callable, *args: Any, timeout: Optional[float] = None) -> Any:
+        """同步提交任务并阻塞等待结果，供在线程池中执行的同步代码使用（如本地OCR后端）
+
+        参数和异常与 submit 相同。
+        """
+        job = self._start(fn, *args)
+        try:
+            return job.result(timeout or self.job_timeout)
+        except FutureTimeoutError:
+            job.cancel()
+            raise OCRTimeoutError(f"OCR任务超时({timeout or self.job_timeout}秒)")
+        except BrokenProcessPool:
+            self._reset_broken()
+            raise
+
+    async def run_ocr(self, image_bytes: bytes, timeout: Optional[float] = None) -> List:
+        """在工作池中识别单张图片"""
+        return await self.submit(run_ocr, image_bytes, self.engine_config, self.preprocess_profile, timeout=timeout)
+
+    async def run_ocr_batch(self, images: List[bytes], timeout: Optional[float] = None) -> List:
+        """在工作池中批量识别多张图片"""
+        return await self.submit(run_ocr_batch, images, self.engine_config, self.preprocess_profile, timeout=timeout)
+
+    async def run_ocr_regions(self, image_bytes: bytes, timeout: Optional[float] = None) -> Optional[List]:
+        """在工作池中只识别发票模板区域"""
+        return await self.submit(run_ocr_regions, image_bytes, self.engine_config, self.preprocess_profile, timeout=timeout)
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+_pool: Optional[OCRWorkerPool] = None
+
+
+def get_ocr_pool() -> OCRWorkerPool:
+    """获取进程内共享的OCR工作池"""
+    global _pool
+    if _pool is None:
+        _pool = OCRWorkerPool()
+    return _pool
+
+
+def shutdown_ocr_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
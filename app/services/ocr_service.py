@@ -1,48 +1,113 @@
-from paddleocr import PaddleOCR
 import os
+import asyncio
 from typing import Dict, List, Optional
-import numpy as np
-from PIL import Image
-import io
 import logging
 import re
 
+from .ocr_engine import INVOICE_REGIONS, OCREngineConfig, default_engine_config, get_ocr_engine
+from .ocr_pool import OCRPoolBusyError, OCRTimeoutError, OCRWorkerPool, get_ocr_pool
+from .ocr_batcher import OCRBatcher, get_ocr_batcher
+from .ocr_cache import get_ocr_cache
+from .ocr_layout import LineIndex
+from .keyword_tagger import KeywordTagger
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 快速模式下必须识别到的字段，任一缺失（包括没有商品明细）时回退整页识别
+FAST_MODE_FIELDS = ("invoice_number", "invoice_date", "total_amount", "tax_amount", "seller", "buyer", "items")
+
+# 发票字段提取用到的关键词分组，编译为一个自动机，每行文本只扫描一遍
+INVOICE_KEYWORDS = {
+    # 购买方/销售方标记
+    "section": ["名称", "方"],
+    "buyer": ["购买方", "购方", "购"],
+    "seller": ["销售方", "销"],
+    # 公司名称特征，以及公司名称行中不应出现的字段
+    "company": ["公司", "有限", "企业", "厂"],
+    "company_excluded": ["识别号", "地址", "电话", "开户", "账号"],
+    # 金额行特征
+    "amount": ["¥", "￥", "元", "金额", "税额", "合计", "小计", "价税", "总额", "（小写）"],
+    "total": ["合计"],
+    "yen": ["¥"],
+    # 商品区域的开始/结束标记
+    "item_start": ["货物名称", "项目名称", "服务名称", "商品名称", "规格型号"],
+    "item_end": ["合计", "小计", "价税合计", "税额", "金额", "价税", "复核", "收款人", "备注"],
+    # 商品明细中的无效字符和关键词
+    "item_invalid": [
+        "/", "[", "]", "¥", "￥", "*", "+", ":", "：", "(", ")", "（", "）",
+        "发票", "联", "东港", "安", "壹", "贰", "叁", "肆", "伍", "陆", "柒", "捌", "玖", "拾",
+        "佰", "仟", "万", "亿", "圆", "整", "金额", "税额", "价税", "合计", "小计", "规格",
+        "型号", "单位", "数量", "单价", "税率", "价税合计", "大写", "小写",
+        "公司", "有限", "名称", "纳税人", "识别号", "地址", "电话", "开户", "账号"
+    ],
+    # 商品明细行需要排除的关键词
+    "excluded": [
+        "地址", "电话", "开户", "账号", "行号", "纳税人", "识别号",
+        "规格", "型号", "合计", "小计", "税额", "价税",
+        "传真", "邮编", "名称", "代码", "日期", "号码",
+        "备注", "复核", "收款人", "开票人"
+    ],
+}
+
+# 商品名称中不应出现的文本
+ITEM_NAME_INVALID_KEYWORDS = {
+    "invalid": [
+        "地址", "电话", "开户", "账号", "行号", "纳税人", "识别号",
+        "合计", "小计", "税额", "价税", "传真", "邮编", "备注",
+        "复核", "收款人", "开票人", "名称", "代码", "日期", "号码",
+        "(小写)", "(大写)", "￥", "¥", "元", "(", ")", "小写", "大写"
+    ],
+}
+
+_invoice_tagger = KeywordTagger(INVOICE_KEYWORDS)
+_item_name_tagger = KeywordTagger(ITEM_NAME_INVALID_KEYWORDS)
+
 class OCRService:
-    def __init__(self):
-        self.ocr = PaddleOCR(
-            use_angle_cls=True,
-            lang="ch",
-            show_log=True,
-            use_gpu=False,
-            enable_mkldnn=True
-        )
+    def __init__(
+        self,
+        engine_config: Optional[OCREngineConfig] = None,
+        pool: Optional[OCRWorkerPool] = None
+    ):
+        self.engine_config = engine_config or default_engine_config()
+        self._pool = pool
+        # 是否对并发请求做微批处理
+        self.batching = os.getenv("OCR_BATCHING", "true").lower() == "true"
+        # 是否启用模板区域快速识别
+        self.fast_mode = os.getenv("OCR_FAST_MODE", "false").lower() == "true"
+        self._batcher: Optional[OCRBatcher] = None
+
+    @property
+    def pool(self) -> OCRWorkerPool:
+        """OCR工作池（默认使用进程内共享实例）"""
+        if self._pool is None:
+            self._pool = get_ocr_pool()
+        return self._pool
+
+    @property
+    def batcher(self) -> OCRBatcher:
+        """OCR微批处理器"""
+        if self._batcher is None:
+            self._batcher = OCRBatcher(pool=self._pool) if self._pool else get_ocr_batcher()
+        return self._batcher
+
+    @property
+    def ocr(self):
+        """共享的PaddleOCR引擎（首次使用时加载）"""
+        return get_ocr_engine(self.engine_config)
         
     async def process_invoice(self, image_bytes: bytes) -> Dict:
         """处理发票图片并提取信息"""
         try:
-            # 将字节流转换为PIL Image
-            image = Image.open(io.BytesIO(image_bytes))
-            
-            # 转换为numpy数组
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            img_array = np.array(image)
+            invoice_info = None
             
-            # OCR识别
-            logger.info("开始OCR识别...")
-            result = self.ocr.ocr(img_array, cls=True)
+            # 快速模式：只识别模板区域中的表头字段
+            if self.fast_mode:
+                invoice_info = await self._process_regions(image_bytes)
             
-            # 打印原始识别结果
-            logger.info("OCR原始识别结果:")
-            for idx, line in enumerate(result[0]):
-                logger.info(f"第{idx+1}行: 位置={line[0]}, 文本='{line[1][0]}', 置信度={line[1][1]}")
-            
-            # 提取发票信息
-            invoice_info = self._extract_invoice_info(result)
+            if invoice_info is None:
+                invoice_info = await self._process_full_page(image_bytes)
             logger.info(f"提取的发票信息: {invoice_info}")
             
             return {
@@ -50,6 +115,8 @@ class OCRService:
                 "data": invoice_info
             }
             
+        except (OCRPoolBusyError, OCRTimeoutError):
+            raise
         except Exception as e:
             logger.error(f"OCR处理错误: {str(e)}")
             return {
@@ -57,6 +124,77 @@ class OCRService:
                 "message": str(e)
             }
     
+    async def _process_full_page(self, image_bytes: bytes) -> Dict:
+        """整页识别并提取发票信息"""
+        # OCR识别（命中缓存时直接使用原始结果）
+        result = await self._recognize(image_bytes)
+        
+        # 打印原始识别结果
+        logger.info("OCR原始识别结果:")
+        for idx, line in enumerate(result[0] or []):
+            logger.info(f"第{idx+1}行: 位置={line[0]}, 文本='{line[1][0]}', 置信度={line[1][1]}")
+        
+        # 提取发票信息
+        return await asyncio.to_thread(self._extract_invoice_info, result)
+    
+    async def _process_regions(self, image_bytes: bytes) -> Optional[Dict]:
+        """快速模式：先定位发票外框，只识别模板区域
+
+        模板区域包含商品明细表，明细与表头字段一起提取；有字段缺失或没有识别到明细时
+        再做整页识别补齐，未定位到外框时返回None，由调用方整页识别。
+        """
+        result = await self._recognize(image_bytes, regions_only=True)
+        if result is None:
+            logger.info("未定位到发票外框，使用整页识别")
+            return None
+        
+        invoice_info = await asyncio.to_thread(self._extract_invoice_info, result)
+        missing = [field for field in FAST_MODE_FIELDS if not invoice_info.get(field)]
+        if not missing:
+            return invoice_info
+        
+        logger.info(f"快速模式缺少字段{missing}，回退整页识别")
+        full_info = await self._process_full_page(image_bytes)
+        for field, value in full_info.items():
+            if not invoice_info.get(field):
+                invoice_info[field] = value
+        return invoice_info
+    
+    async def _recognize(self, image_bytes: bytes, regions_only: bool = False) -> Optional[List]:
+        """获取图片的OCR原始结果，优先读取缓存
+
+        Args:
+            image_bytes: 图片二进制数据
+            regions_only: 只识别发票模板区域
+        """
+        cache = get_ocr_cache()
+        cache_key = None
+        if cache:
+            mode = "regions" if regions_only else "full"
+            if regions_only:
+                # 模板区域调整后不复用旧的区域识别结果
+                mode = f"{mode}:{tuple(INVOICE_REGIONS.values())}"
+            version = f"paddle:{mode}:{tuple(self.engine_config)}:{tuple(self.pool.preprocess_profile)}"
+            cache_key = cache.make_key(image_bytes, version)
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None:
+                logger.info(f"OCR缓存命中: {cache_key}")
+                # 区域识别未定位到外框时缓存为空字典
+                return cached or None
+
+        # 在工作池中执行，不阻塞事件循环
+        logger.info("开始OCR识别...")
+        if regions_only:
+            result = await self.pool.run_ocr_regions(image_bytes)
+        elif self.batching:
+            result = await self.batcher.submit(image_bytes)
+        else:
+            result = await self.pool.run_ocr(image_bytes)
+
+        if cache_key:
+            await asyncio.to_thread(cache.set, cache_key, result if result is not None else {})
+        return result
+
     def _extract_invoice_info(self, ocr_result: List) -> Dict:
         """从OCR结果中提取发票信息"""
         invoice_info = {
@@ -77,6 +215,10 @@ class OCRService:
 
             # 将所有识别出的文本转换为列表，保留位置信息
             texts_with_pos = [(line[1][0].strip(), line[1][1], line[0]) for line in ocr_result[0]]
+            # 按y坐标建立索引，附近行查询走二分查找
+            line_index = LineIndex.from_lines(texts_with_pos)
+            # 每行文本一次性标注命中的关键词分组，后续各遍扫描直接读取
+            line_tags = [_invoice_tagger.tag(text) for text, _, _ in texts_with_pos]
             
             # 存储所有可能的数字值和税率
             numbers = []
@@ -85,20 +227,6 @@ class OCRService:
             found_seller = False
             found_buyer = False
             current_item = None
-            
-            # 定义需要排除的关键词
-            exclude_keywords = {
-                '地址', '电话', '开户', '账号', '行号', '纳税人', '识别号', 
-                '规格', '型号', '合计', '小计', '税额', '价税',
-                '传真', '邮编', '名称', '代码', '日期', '号码',
-                '备注', '复核', '收款人', '开票人'
-            }
-            
-            # 定义商品区域的开始标记
-            item_start_keywords = {'货物名称', '项目名称', '服务名称', '商品名称', '*', '单位'}
-            
-            # 定义商品区域的结束标记
-            item_end_keywords = {'合计', '小计', '价税合计', '税额', '金额', '价税', '复核', '收款人'}
 
             # 获取发票的大致区域范围
             y_coordinates = [pos[0][1] for text, conf, pos in texts_with_pos]
@@ -111,26 +239,26 @@ class OCRService:
             seller_section_y = None
             
             # 第一遍：寻找标记位置
-            for text, confidence, pos in texts_with_pos:
+            for (text, confidence, pos), tags in zip(texts_with_pos, line_tags):
                 text = text.strip()
                 text_y = pos[0][1]
                 
                 # 寻找购买方和销售方的标记位置
-                if "名称" in text or "方" in text:
-                    if any(keyword in text for keyword in ["购买方", "购方", "购"]):
+                if "section" in tags:
+                    if "buyer" in tags:
                         buyer_section_y = text_y
                         logger.info(f"找到购买方标记位置: {text_y}")
-                    elif any(keyword in text for keyword in ["销售方", "销"]):
+                    elif "seller" in tags:
                         seller_section_y = text_y
                         logger.info(f"找到销售方标记位置: {text_y}")
 
             # 第二遍：根据标记位置识别公司名称
-            for text, confidence, pos in texts_with_pos:
+            for (text, confidence, pos), tags in zip(texts_with_pos, line_tags):
                 text = text.strip()
                 text_y = pos[0][1]
                 
-                if len(text.strip()) > 4 and any(keyword in text for keyword in ["公司", "有限", "企业", "厂"]):
-                    if not any(keyword in text for keyword in ["识别号", "地址", "电话", "开户", "账号"]):
+                if len(text.strip()) > 4 and "company" in tags:
+                    if "company_excluded" not in tags:
                         # 根据与标记位置的距离判断
                         if buyer_section_y and abs(text_y - buyer_section_y) < 50 and not invoice_info["buyer"]:
                             invoice_info["buyer"] = text.strip()
@@ -141,12 +269,12 @@ class OCRService:
 
             # 如果还没找到，使用上下半部分判断
             if not invoice_info["seller"] or not invoice_info["buyer"]:
-                for text, confidence, pos in texts_with_pos:
+                for (text, confidence, pos), tags in zip(texts_with_pos, line_tags):
                     text = text.strip()
                     text_y = pos[0][1]
                     
-                    if len(text.strip()) > 4 and any(keyword in text for keyword in ["公司", "有限", "企业", "厂"]):
-                        if not any(keyword in text for keyword in ["识别号", "地址", "电话", "开户", "账号"]):
+                    if len(text.strip()) > 4 and "company" in tags:
+                        if "company_excluded" not in tags:
                             if text_y < mid_y and not invoice_info["buyer"]:
                                 invoice_info["buyer"] = text.strip()
                                 logger.info(f"根据位置找到购买方: {text}")
@@ -205,20 +333,21 @@ class OCRService:
             amount_positions = set()  # 记录已识别为金额的数字位置
             
             # 先找到所有可能的金额行
-            for text, confidence, pos in texts_with_pos:
+            for (text, confidence, pos), tags in zip(texts_with_pos, line_tags):
                 # 扩展金额行判断条件
-                if any(char in text for char in ["¥", "￥", "元"]) or \
-                   any(keyword in text for keyword in ["金额", "税额", "合计", "小计", "价税", "总额", "（小写）", "￥"]):
+                if "amount" in tags:
                     amount_lines.add(pos[0][1])
                     logger.info(f"找到金额行: {text} at y={pos[0][1]}")
 
+            amount_line_index = LineIndex(list(amount_lines))
+
             # 处理金额
             if numbers:
                 # 收集所有金额行的数字
                 amount_numbers = []
                 for num, text, pos in numbers:
                     # 检查是否在金额行或附近
-                    if any(abs(pos[0][1] - amount_y) < 25 for amount_y in amount_lines):  # 增加容差范围
+                    if amount_line_index.has_near(pos[0][1], 25):  # 增加容差范围
                         # 过滤掉明显错误的数字
                         if 1 <= num <= 1000000 and round(num, 2) == num:  # 只接受最多两位小数的合理数字
                             amount_numbers.append((num, pos))
@@ -278,57 +407,42 @@ class OCRService:
                             # 检查数字格式是否符合金额特征
                             if round(num, 2) == num and 100 <= num <= 1000000:
                                 # 查找附近是否有税率信息
-                                for text, conf, text_pos in texts_with_pos:
-                                    if abs(text_pos[0][1] - pos[0][1]) < 30:
-                                        if "%" in text:
-                                            tax_match = re.search(r'(\d+)%', text)
-                                            if tax_match:
-                                                tax_rate = float(tax_match.group(1)) / 100
-                                                tax = round(num * tax_rate, 2)
-                                                invoice_info["total_amount"] = f"{num:.2f}"
-                                                invoice_info["tax_amount"] = f"{tax:.2f}"
-                                                logger.info(f"基于税率计算找到金额: {num} 和税额: {tax}")
-                                                break
+                                for line_idx in line_index.near(pos[0][1], 30):
+                                    text = texts_with_pos[line_idx][0]
+                                    if "%" in text:
+                                        tax_match = re.search(r'(\d+)%', text)
+                                        if tax_match:
+                                            tax_rate = float(tax_match.group(1)) / 100
+                                            tax = round(num * tax_rate, 2)
+                                            invoice_info["total_amount"] = f"{num:.2f}"
+                                            invoice_info["tax_amount"] = f"{tax:.2f}"
+                                            logger.info(f"基于税率计算找到金额: {num} 和税额: {tax}")
+                                            break
 
             # 商品明细处理优化
             items_started = False
             current_item = None
-            
-            # 更新商品区域标记关键词
-            item_start_keywords = {'货物名称', '项目名称', '服务名称', '商品名称', '规格型号'}
-            item_end_keywords = {'合计', '小计', '价税合计', '税额', '金额', '价税', '复核', '收款人', '备注'}
-            
-            # 更新无效字符和关键词
-            invalid_chars = {'/', '[', ']', '¥', '￥', '*', '+', ':', '：', '(', ')', '（', '）'}
-            invalid_keywords = {
-                '发票', '联', '东港', '安', '壹', '贰', '叁', '肆', '伍', '陆', '柒', '捌', '玖', '拾',
-                '佰', '仟', '万', '亿', '圆', '整', '金额', '税额', '价税', '合计', '小计', '规格',
-                '型号', '单位', '数量', '单价', '金额', '税率', '税额', '价税合计', '大写', '小写',
-                '公司', '有限', '名称', '纳税人', '识别号', '地址', '电话', '开户', '账号'
-            }
 
             # 商品明细提取
             for idx, (text, confidence, pos) in enumerate(texts_with_pos):
+                tags = line_tags[idx]
                 text = text.strip()
                 text_y = pos[0][1]
                 
                 # 跳过金额行和已识别为金额的位置
-                if any(abs(text_y - amount_y) < 25 for amount_y in amount_lines) or \
-                   text_y in amount_positions:
+                if amount_line_index.has_near(text_y, 25) or text_y in amount_positions:
                     continue
                 
                 # 跳过无效内容
-                if (len(text) < 3 or
-                    any(char in text for char in invalid_chars) or
-                    any(keyword in text for keyword in invalid_keywords)):
+                if len(text) < 3 or "item_invalid" in tags:
                     continue
                 
                 # 商品区域识别
-                if any(keyword in text for keyword in item_start_keywords):
+                if "item_start" in tags:
                     items_started = True
                     continue
                 
-                if items_started and any(keyword in text for keyword in item_end_keywords):
+                if items_started and "item_end" in tags:
                     items_started = False
                     continue
                 
@@ -338,13 +452,12 @@ class OCRService:
                     if item_info and item_info.get("item_name"):
                         # 额外的有效性检查
                         item_name = item_info["item_name"]
-                        if (len(item_name) > 2 and 
-                            not any(char in item_name for char in invalid_chars) and
-                            not any(keyword in item_name for keyword in invalid_keywords)):
+                        if len(item_name) > 2 and "item_invalid" not in _invoice_tagger.tag(item_name):
                             invoice_info["items"].append(item_info)
 
             # 第二遍扫描: 处理其他信息
             for idx, (text, confidence, pos) in enumerate(texts_with_pos):
+                tags = line_tags[idx]
                 text = text.strip()
                 
                 # 发票代码（支持不同格式）
@@ -390,11 +503,11 @@ class OCRService:
                             logger.info(f"找到开票日期: {date_str}")
                 
                 # 商品明细区域识别优化
-                if any(keyword in text for keyword in item_start_keywords):
+                if "item_start" in tags:
                     items_started = True
                     continue
                 
-                if items_started and any(keyword in text for keyword in item_end_keywords):
+                if items_started and "item_end" in tags:
                     items_started = False
                     continue
                 
@@ -404,7 +517,7 @@ class OCRService:
                     text = text.strip('*: ：')
                     
                     # 排除不需要的行
-                    if (any(keyword in text for keyword in exclude_keywords) or
+                    if ("excluded" in tags or
                         re.match(r'^[\d.,]+$', text) or  # 纯数字
                         re.match(r'^[*\s]+$', text) or   # 纯符号
                         len(text) < 3):                  # 过短的文本
@@ -422,8 +535,8 @@ class OCRService:
                 amounts_with_symbol = []
                 for num, text, pos in numbers:
                     # 检查原始文本中是否包含¥符号
-                    original_text = next((t[0] for t in texts_with_pos if abs(t[2][0][1] - pos[0][1]) < 10), "")
-                    if "¥" in original_text:
+                    line_idx = line_index.first_near(pos[0][1], 10)
+                    if line_idx is not None and "yen" in line_tags[line_idx]:
                         amounts_with_symbol.append((num, text, pos))
                         logger.info(f"找到带¥符号的金额: {num}")
 
@@ -451,8 +564,8 @@ class OCRService:
                     
                     # 先查找是否有合计行
                     total_line_y = None
-                    for text, confidence, pos in texts_with_pos:
-                        if "合计" in text:
+                    for (text, confidence, pos), tags in zip(texts_with_pos, line_tags):
+                        if "total" in tags:
                             total_line_y = pos[0][1]
                             logger.info(f"找到合计行位置: {total_line_y}")
                             break
@@ -625,14 +738,7 @@ class OCRService:
             return False
             
         # 排除常见的非商品文本
-        invalid_keywords = {
-            '地址', '电话', '开户', '账号', '行号', '纳税人', '识别号', 
-            '合计', '小计', '税额', '价税', '传真', '邮编', '备注',
-            '复核', '收款人', '开票人', '名称', '代码', '日期', '号码',
-            '(小写)', '(大写)', '￥', '¥', '元', '(', ')', '小写', '大写'
-        }
-        
-        if any(keyword in name for keyword in invalid_keywords):
+        if _item_name_tagger.tag(name):
             return False
             
         # 排除可能是金额的行
@@ -0,0 +1,246 @@
+import os
+import logging
+import threading
+from html.parser import HTMLParser
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from .ocr_backend import OCRBackend
+from .ocr_cache import get_ocr_cache
+from .ocr_engine import OCREngineConfig, batch_ocr, default_engine_config, get_ocr_engine
+from .ocr_pool import OCRWorkerPool, decode_image, get_ocr_pool, restore_scale
+from .image_preprocess import get_profile
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Paddle预测器不是线程安全的，同一进程内的识别调用串行执行
+_predict_lock = threading.Lock()
+
+# 各OCR工作进程自己的PP-Structure引擎，按 (引擎配置, 是否版面分析) 缓存
+_table_engines: Dict[Tuple, Any] = {}
+
+
+def get_table_engine(config: OCREngineConfig, use_layout: bool):
+    """获取本进程的PP-Structure引擎（首次使用时加载）"""
+    key = (tuple(config), use_layout)
+    engine = _table_engines.get(key)
+    if engine is None:
+        with _predict_lock:
+            engine = _table_engines.get(key)
+            if engine is None:
+                from paddleocr import PPStructure
+                engine = PPStructure(
+                    layout=use_layout,
+                    lang=config.lang,
+                    show_log=False,
+                    use_gpu=False,
+                    enable_mkldnn=config.enable_mkldnn,
+                    cpu_threads=config.cpu_threads
+                )
+                _table_engines[key] = engine
+    return engine
+
+
+def run_table_structure(img: np.ndarray, config: OCREngineConfig, use_layout: bool) -> List[Dict[str, Any]]:
+    """在OCR工作进程中执行版面分析和表格结构识别
+
+    只返回后续转换需要的字段（类型、位置、表格HTML、文本行），不回传区域截图。
+    """
+    engine = get_table_engine(config, use_layout)
+    with _predict_lock:
+        regions = engine(img)
+    output = []
+    for region in regions:
+        res = region.get("res")
+        if isinstance(res, dict):
+            res = {"html": res.get("html", "")}
+        elif isinstance(res, list):
+            res = [
+                {"text": line["text"], "text_region": np.asarray(line["text_region"]).tolist()}
+                for line in res
+            ]
+        output.append({
+            "type": region.get("type"),
+            "bbox": np.asarray(region["bbox"]).tolist(),
+            "res": res
+        })
+    return output
+
+
+def run_general_ocr(img: np.ndarray, config: OCREngineConfig) -> List:
+    """在OCR工作进程中执行通用文字识别，返回PaddleOCR格式的文本行"""
+    engine = get_ocr_engine(config)
+    with _predict_lock:
+        return batch_ocr(engine, [img])[0]
+
+
+class _TableHTMLParser(HTMLParser):
+    """把PP-Structure输出的表格HTML转换为百度表格识别的单元格结构"""
+
+    def __init__(self):
+        super().__init__()
+        self.cells: List[Dict[str, Any]] = []
+        self._row = -1
+        self._col = 0
+        self._occupied = set()  # 被跨行/跨列单元格占用的 (行, 列)
+        self._cell: Optional[Dict[str, Any]] = None
+
+    @staticmethod
+    def _span(value: Optional[str]) -> int:
+        try:
+            return max(int(value), 1)
+        except (TypeError, ValueError):
+            return 1
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self._row += 1
+            self._col = 0
+        elif tag in ("td", "th"):
+            while (self._row, self._col) in self._occupied:
+                self._col += 1
+            attrs = dict(attrs)
+            rowspan = self._span(attrs.get("rowspan"))
+            colspan = self._span(attrs.get("colspan"))
+            self._cell = {
+                "row_start": self._row,
+                "row_end": self._row + rowspan,
+                "col_start": self._col,
+                "col_end": self._col + colspan,
+                "words": ""
+            }
+            for row in range(self._row, self._row + rowspan):
+                for col in range(self._col, self._col + colspan):
+                    self._occupied.add((row, col))
+            self._col += colspan
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._cell is not None:
+            self._cell["words"] = self._cell["words"].strip()
+            self.cells.append(self._cell)
+            self._cell = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell["words"] += data
+
+
+def _location(box, scale: float) -> Dict[str, int]:
+    """文本框或 [x1, y1, x2, y2] 换算为原图坐标下的百度 location 结构"""
+    points = np.asarray(box, dtype=np.float32).reshape(-1, 2) / scale
+    left, top = points.min(axis=0)
+    right, bottom = points.max(axis=0)
+    return {"left": int(left), "top": int(top), "width": int(right - left), "height": int(bottom - top)}
+
+
+class PaddleOCRBackend(OCRBackend):
+    """本地PaddleOCR后端
+
+    表格识别使用PP-Structure（版面分析 + 表格结构识别），通用文字识别使用PaddleOCR，
+    输出转换为与百度接口一致的 tables_result / words_result 结构，可完全离线运行。
+    模型推理提交到OCR工作池，在各工作进程自己的引擎中执行，不占用调用方线程中的模型锁。
+    """
+
+    name = "paddle"
+
+    def __init__(
+        self,
+        engine_config: Optional[OCREngineConfig] = None,
+        pool: Optional[OCRWorkerPool] = None
+    ):
+        self.engine_config = engine_config or default_engine_config()
+        self.preprocess_profile = get_profile("bank_statement")
+        self.cache = get_ocr_cache()
+        # 关闭版面分析时整张图片作为一个表格
+        self.use_layout = os.getenv("PADDLE_TABLE_LAYOUT", "true").lower() == "true"
+        self._pool = pool
+
+    @property
+    def pool(self) -> OCRWorkerPool:
+        """OCR工作池（默认使用进程内共享实例）"""
+        if self._pool is None:
+            self._pool = get_ocr_pool()
+        return self._pool
+
+    def encode_image(self, image_data: bytes) -> Tuple[np.ndarray, float]:
+        """解码并归一化图片，表格识别和文字识别共用"""
+        return decode_image(image_data, self.preprocess_profile)
+
+    def _cached(self, endpoint: str, image_data: bytes, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        cache_key = None
+        if self.cache:
+            version = f"paddle:{endpoint}:{tuple(self.engine_config)}:{tuple(self.preprocess_profile)}:{self.use_layout}"
+            cache_key = self.cache.make_key(image_data, version)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug("本地OCR缓存命中: %s", endpoint)
+                return cached
+        result = compute()
+        if cache_key:
+            self.cache.set(cache_key, result)
+        return result
+
+    def recognize_table(self, image_data: bytes, encode: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+        """表格文字识别"""
+        def compute():
+            img, scale = encode() if encode else self.encode_image(image_data)
+            regions = self.pool.run(run_table_structure, img, self.engine_config, self.use_layout)
+
+            tables = sorted(
+                (region for region in regions if region.get("type") == "table"),
+                key=lambda region: region["bbox"][1]
+            )
+            texts = []
+            for region in regions:
+                if region.get("type") == "table" or not isinstance(region.get("res"), list):
+                    continue
+                for line in region["res"]:
+                    texts.append((line["text"], line["text_region"]))
+
+            tables_result = []
+            for table in tables:
+                parser = _TableHTMLParser()
+                parser.feed(table["res"].get("html", ""))
+                top, bottom = table["bbox"][1], table["bbox"][3]
+                # 表格上方的文字作为表头（户名、账号等），下方的作为表尾
+                header = [
+                    {"words": text, "location": _location(box, scale)}
+                    for text, box in texts if max(y for _, y in box) <= top
+                ]
+                footer = [
+                    {"words": text, "location": _location(box, scale)}
+                    for text, box in texts if min(y for _, y in box) >= bottom
+                ]
+                tables_result.append({
+                    "table_location": _location(table["bbox"], scale),
+                    "header": header,
+                    "body": parser.cells,
+                    "footer": footer
+                })
+            return {"tables_result": tables_result, "table_num": len(tables_result)}
+
+        try:
+            return self._cached("table", image_data, compute)
+        except Exception as e:
+            raise Exception(f"表格识别失败: {str(e)}")
+
+    def recognize_general(self, image_data: bytes, encode: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+        """通用文字识别"""
+        def compute():
+            img, scale = encode() if encode else self.encode_image(image_data)
+            lines = self.pool.run(run_general_ocr, img, self.engine_config)
+            lines = restore_scale(lines, scale) or []
+            words_result = [
+                {"words": text, "location": _location(box, 1.0), "probability": {"average": score}}
+                for box, (text, score) in lines
+            ]
+            return {"words_result": words_result, "words_result_num": len(words_result)}
+
+        try:
+            return self._cached("general", image_data, compute)
+        except Exception as e:
+            raise Exception(f"通用文字识别失败: {str(e)}")
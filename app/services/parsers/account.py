@@ -0,0 +1,216 @@
+import re
+import logging
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AccountRule(NamedTuple):
+    """银行账号校验规则"""
+    card_lengths: Tuple[int, ...] = (16, 17, 18, 19)  # 银行卡号长度，需通过Luhn校验
+    account_lengths: Tuple[int, ...] = ()              # 对公/内部账号长度，不做Luhn校验
+
+
+# 各银行的账号规则，按解析器类型前缀（如 ceb_v1 -> ceb）查找
+BANK_ACCOUNT_RULES: Dict[str, AccountRule] = {
+    "beijing_bank": AccountRule(card_lengths=(16, 19), account_lengths=(20,)),
+    "ceb": AccountRule(card_lengths=(16, 19), account_lengths=(16, 18)),
+    "ccb": AccountRule(card_lengths=(16, 19), account_lengths=(20,)),
+    "boc": AccountRule(card_lengths=(16, 19), account_lengths=(21,)),
+}
+
+DEFAULT_ACCOUNT_RULE = AccountRule()
+
+def get_account_rule(bank_type: Optional[str]) -> AccountRule:
+    """获取银行类型对应的账号规则"""
+    if bank_type:
+        for prefix, rule in BANK_ACCOUNT_RULES.items():
+            if bank_type.startswith(prefix):
+                return rule
+    return DEFAULT_ACCOUNT_RULE
+
+
+def luhn_valid(digits: str) -> bool:
+    """Luhn（模10）校验"""
+    total = 0
+    for i, ch in enumerate(reversed(digits)):
+        n = ord(ch) - 48
+        if i % 2:
+            n *= 2
+            if n > 9:
+                n -= 9
+        total += n
+    return total % 10 == 0
+
+
+def is_date_like(digits: str) -> bool:
+    """8位数字是否形如 YYYYMMDD 的日期"""
+    return (
+        len(digits) == 8 and digits.isdigit()
+        and 1900 <= int(digits[:4]) <= 2099
+        and 1 <= int(digits[4:6]) <= 12
+        and 1 <= int(digits[6:]) <= 31
+    )
+
+
+def is_valid_account(digits: str, rule: AccountRule = DEFAULT_ACCOUNT_RULE) -> bool:
+    """按长度和Luhn校验判断是否为有效账号"""
+    length = len(digits)
+    if length in rule.account_lengths:
+        return True
+    return length in rule.card_lengths and luhn_valid(digits)
+
+
+class AccountCandidate(NamedTuple):
+    """扫描得到的候选账号"""
+    digits: str
+    start: int
+    labelled: bool      # 紧跟在"账号/卡号"等标签之后
+    currency: bool      # 后面紧跟币种（如"人民币"）
+    counterparty: bool  # 标签为"对方账号"等，是交易对手的账号
+
+
+class AccountScanner:
+    """单次线性扫描的账号识别器
+
+    一个预编译的正则同时匹配标签关键词、币种和数字组，一次 finditer 得到全部候选及其上下文，
+    再按"非对方账号 > 紧跟标签 > 长度 >= prefer_length > 后跟币种 > 位置靠前"排序。
+    正则中没有可回溯的嵌套量词，耗时与文本长度线性相关；超过 max_chars 的文本只扫描前面部分。
+    """
+
+    # 分隔后的数字组只能是卡号式的3-4位，避免把 "1 2 3" 这类短数字或 "20230101 20230102" 这类日期拼成账号
+    TOKEN = re.compile(
+        r'(?P<counterparty>对方)'
+        r'|(?P<label>[账帐]\s?[号户]|卡\s?号)'
+        r'|(?P<currency>人民币)'
+        r'|(?P<digits>(?<!\d)\d+(?:[ \-]\d{3,4}(?!\d))*(?!\d))'
+    )
+    # 标签与账号之间允许的最大字符数（冒号、空格、"为"等）
+    LABEL_GAP = 8
+    CURRENCY_GAP = 3
+
+    def __init__(
+        self,
+        lengths=range(16, 20),
+        prefer_length: int = 18,
+        max_chars: int = 20000,
+        valid: Optional[Callable[[str], bool]] = None
+    ):
+        self.lengths = frozenset(lengths)
+        self._max_length = max(self.lengths)
+        self.valid = valid
+        self.prefer_length = prefer_length
+        self.max_chars = max_chars
+
+    def _spans(self, run: str, offset: int) -> List[Tuple[str, int]]:
+        """数字组（可含空格/连字符分隔）中长度合法的数字串
+
+        从每个分组起取满足长度要求（及 valid 校验）的最长连续分组，避免把账号与前后的数字拼在一起；
+        形如日期的8位数字组不与其他组合并。
+        """
+        groups = [(m.group(), offset + m.start()) for m in re.finditer(r'\d+', run)]
+        spans = []
+        for i in range(len(groups)):
+            digits = ""
+            best = None
+            for group, _ in groups[i:]:
+                if is_date_like(group):
+                    break
+                digits += group
+                if len(digits) > self._max_length:
+                    break
+                if len(digits) in self.lengths and (self.valid is None or self.valid(digits)):
+                    best = digits
+            if best:
+                spans.append((best, groups[i][1]))
+        return spans
+
+    def scan(self, text: str) -> List[AccountCandidate]:
+        """扫描文本，按出现顺序返回全部候选"""
+        if not text:
+            return []
+        if len(text) > self.max_chars:
+            logger.warning("账号识别文本过长(%d字符)，只扫描前%d字符", len(text), self.max_chars)
+            text = text[:self.max_chars]
+
+        candidates: List[AccountCandidate] = []
+        label_end = -1
+        counterparty_end = -1
+        run_end = -1   # 上一个数字组的结束位置
+        run_first = 0  # 上一个数字组产生的第一个候选下标
+        min_length = min(self.lengths)
+        for match in self.TOKEN.finditer(text):
+            kind = match.lastgroup
+            if kind == "counterparty":
+                counterparty_end = match.end()
+            elif kind == "label":
+                label_end = match.end()
+            elif kind == "currency":
+                if run_end >= 0 and match.start() - run_end <= self.CURRENCY_GAP:
+                    for i in range(run_first, len(candidates)):
+                        candidates[i] = candidates[i]._replace(currency=True)
+            else:
+                labelled = label_end >= 0 and match.start() - label_end <= self.LABEL_GAP
+                counterparty = labelled and counterparty_end >= 0 and label_end - counterparty_end <= 2
+                label_end = counterparty_end = -1
+                run_end = match.end()
+                run_first = len(candidates)
+                # 含分隔符的长度不小于数字位数，太短的数字组（日期、金额）直接跳过
+                if match.end() - match.start() < min_length:
+                    continue
+                for digits, start in self._spans(match.group(), match.start()):
+                    candidates.append(AccountCandidate(
+                        digits, start, labelled and start == match.start(), False, counterparty
+                    ))
+        return candidates
+
+    def rank(self, candidates: List[AccountCandidate]) -> List[AccountCandidate]:
+        """候选按可信度从高到低排序"""
+        return sorted(
+            candidates,
+            key=lambda c: (c.counterparty, not c.labelled, len(c.digits) < self.prefer_length, not c.currency, c.start)
+        )
+
+    def find(self, text: str) -> Optional[str]:
+        """返回可信度最高的本方账号，未找到时返回None"""
+        ranked = self.rank(self.scan(text))
+        return ranked[0].digits if ranked and not ranked[0].counterparty else None
+
+
+_rule_scanners: Dict[AccountRule, AccountScanner] = {}
+
+
+def _rule_scanner(rule: AccountRule) -> AccountScanner:
+    """账号规则对应的扫描器（按规则缓存）"""
+    scanner = _rule_scanners.get(rule)
+    if scanner is None:
+        scanner = AccountScanner(
+            lengths=rule.card_lengths + rule.account_lengths,
+            valid=lambda digits: is_valid_account(digits, rule)
+        )
+        _rule_scanners[rule] = scanner
+    return scanner
+
+
+def find_account_number(text: str, bank_type: Optional[str] = None) -> Optional[str]:
+    """从一行文本中识别银行账号/卡号
+
+    Args:
+        text: OCR识别的文本行
+        bank_type: 解析器类型，用于选择账号长度规则
+
+    Returns:
+        校验通过的账号，优先返回紧跟"账号/卡号"等标签的候选，未找到时返回None。
+        没有标签时，20位以下的数字串必须通过Luhn校验（如日期区间拼成的16位数字不会被当作账号）
+    """
+    if not text:
+        return None
+    found = None
+    for candidate in _rule_scanner(get_account_rule(bank_type)).scan(text):
+        if candidate.counterparty:
+            continue
+        if candidate.labelled:
+            return candidate.digits
+        if found is None and (len(candidate.digits) >= 20 or luhn_valid(candidate.digits)):
+            found = candidate.digits
+    return found
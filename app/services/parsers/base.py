@@ -1,15 +1,47 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, NamedTuple, Optional, Tuple, Union
+
+from app.services.ocr_backend import OCRBackend, get_ocr_backend
+from app.services.ocr_bundle import OCRBundle
+
+
+class LayoutSignature(NamedTuple):
+    """流水版式特征，用于自动识别银行类型"""
+    bank_keywords: Tuple[str, ...]    # 标题、表头区域出现的银行名称
+    header_keywords: Tuple[str, ...]  # 表格列标题
+    columns: int                      # 表格列数
+
 
 class BankStatementParser(ABC):
-    """银行流水解析器基类"""
+    """银行流水解析器基类
+    
+    解析器实例由 BankParserFactory 缓存并在并发请求间共享，
+    实现中不要在实例上保存单次解析的中间状态。
+    声明了 layout 的解析器参与上传时的银行类型自动识别。
+    """
+    
+    layout: Optional[LayoutSignature] = None
+    # 注册的银行类型，由 BankParserFactory 创建实例时设置，用于选择OCR后端
+    bank_type: Optional[str] = None
+    _ocr_service: Optional[OCRBackend] = None
+    
+    @property
+    def ocr_service(self) -> OCRBackend:
+        """直接传入图片二进制数据时使用的OCR后端（与上传流程共用 get_ocr_backend 的进程内实例）"""
+        if self._ocr_service is not None:
+            return self._ocr_service
+        return get_ocr_backend(self.bank_type or "")
+    
+    @ocr_service.setter
+    def ocr_service(self, service: OCRBackend):
+        self._ocr_service = service
     
     @abstractmethod
-    def parse(self, image_data: bytes) -> Dict[str, Any]:
+    def parse(self, image_data: Union[bytes, OCRBundle]) -> Dict[str, Any]:
         """解析银行流水图片
         
         Args:
-            image_data: 图片二进制数据
+            image_data: 图片二进制数据，或同一图片的 OCRBundle（复用已有的识别结果）
             
         Returns:
             解析后的数据字典
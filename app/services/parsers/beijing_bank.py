@@ -1,22 +1,26 @@
 from datetime import datetime
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
 import json
 
-from .base import BankStatementParser
-from app.services.baidu_service import BaiduOCRService, BaiduNLPService
+from .base import BankStatementParser, LayoutSignature
+from .account import find_account_number
+from .table_grid import TableGrid
+from app.services.ocr_bundle import OCRBundle
 
 class BeijingBankParser(BankStatementParser):
     """北京银行流水解析器"""
     
-    def __init__(self):
-        self.ocr_service = BaiduOCRService()
-        self.nlp_service = BaiduNLPService()
+    layout = LayoutSignature(
+        bank_keywords=("北京银行", "Bank of Beijing"),
+        header_keywords=("交易日期", "业务种类", "收支标志", "发生额", "余额"),
+        columns=5
+    )
     
-    def parse(self, image_data: bytes) -> Dict[str, Any]:
+    def parse(self, image_data: Union[bytes, OCRBundle]) -> Dict[str, Any]:
         """解析银行流水图片"""
         # OCR识别表格
-        ocr_result = self.ocr_service.recognize_table(image_data)
+        ocr_result = OCRBundle.wrap(image_data, self.ocr_service).table
         print("OCR识别结果:", json.dumps(ocr_result, ensure_ascii=False, indent=2))
         
         # 处理OCR结果
@@ -63,51 +67,34 @@ class BeijingBankParser(BankStatementParser):
             
             # 尝试从表头中提取账号
             for text in header_texts:
-                # 1. 首先尝试NLP实体识别
-                try:
-                    entities = self.nlp_service.entity_recognize(text)
-                    if isinstance(entities, list):
-                        for entity in entities:
-                            if isinstance(entity, dict) and entity.get("type") == "BANK_CARD":
-                                statement_data["account_number"] = entity.get("item")
-                                break
-                except Exception as e:
-                    print(f"NLP实体识别失败: {str(e)}")
+                # 1. 首先按长度和Luhn规则识别账号/卡号
+                account_number = find_account_number(text, "beijing_bank")
+                if account_number:
+                    statement_data["account_number"] = account_number
+                    break
                 
-                # 2. 如果NLP失败，尝试直接匹配数字
+                # 2. 如果未识别到，尝试直接匹配数字
                 if not statement_data["account_number"]:
                     # 查找"卡/账号:"后面的数字
                     card_match = re.search(r'[卡账][/号][:：]\s*(\d+)', text)
                     if card_match:
                         statement_data["account_number"] = card_match.group(1)
-                        continue
+                        break
                         
                     # 直接查找连续数字
                     numbers = re.findall(r'\d{10,}', text)
                     if numbers:
                         statement_data["account_number"] = numbers[0]
+                        break
         
         # 处理表格主体
-        row_cells = {}
-        if "body" in raw_data:
-            for cell in raw_data["body"]:
-                if isinstance(cell, dict) and "row_start" in cell and "words" in cell:
-                    row_idx = cell.get("row_start")
-                    col_idx = cell.get("col_start", 0)
-                    if row_idx not in row_cells:
-                        row_cells[row_idx] = []
-                    row_cells[row_idx].append((col_idx, cell["words"]))
+        grid = TableGrid.from_table(raw_data)
         
         # 处理每一行
-        for row_idx in sorted(row_cells.keys()):
-            cells = row_cells[row_idx]
-            cells.sort(key=lambda x: x[0])  # 按列索引排序
-            
+        for row_idx, cell_texts in grid.iter_rows():
             transaction = statement_data.copy()
             print(f"\n处理第{row_idx}行:")
             
-            # 提取所有单元格文本
-            cell_texts = {col: text.strip() for col, text in cells}
             print("  单元格文本:", cell_texts)
             
             try:
@@ -1,12 +1,20 @@
 from typing import Dict, Any, List
-from datetime import datetime
 import re
 
+from .base import LayoutSignature
 from .boc_base import BOCBaseParser
+from .normalize import amount_columns, date_columns
+from .table_grid import TableGrid
 
 class BOCV1Parser(BOCBaseParser):
     """交通银行版式1解析器"""
     
+    layout = LayoutSignature(
+        bank_keywords=("交通银行", "Bank of Communications"),
+        header_keywords=("序号", "交易日期", "交易地点", "交易方式", "收支标志", "交易金额", "余额"),
+        columns=7
+    )
+    
     def clean_data(self, raw_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """清洗数据"""
         transactions = []
@@ -42,32 +50,23 @@ class BOCV1Parser(BOCBaseParser):
                             break
         
         # 处理表格主体
-        row_cells = {}
-        data_header_row = None  # 记录交易数据表头行
+        grid = TableGrid.from_table(raw_data, collapse_spaces=True)
         header_keywords = ["序号", "交易日期", "交易地点", "交易方式", "收支标志", "交易金额", "余额"]
-        
-        if "body" in raw_data:
-            for cell in raw_data["body"]:
-                if isinstance(cell, dict) and "row_start" in cell and "words" in cell:
-                    row_idx = cell.get("row_start")
-                    col_idx = cell.get("col_start", 0)
-                    if row_idx not in row_cells:
-                        row_cells[row_idx] = {}
-                    # 清理单元格文本
-                    cell_text = cell["words"].strip()
-                    cell_text = re.sub(r'\s+', ' ', cell_text)  # 合并多个空格
-                    row_cells[row_idx][col_idx] = cell_text
-                    
-                    # 标记交易数据表头行
-                    if any(keyword in cell_text for keyword in header_keywords):
-                        data_header_row = row_idx
-                        print(f"找到交易数据表头行: {row_idx}, 关键字: {cell_text}")
+        # 交易数据表头行：包含表头关键字的最后一行，之前的是账户信息
+        header_rows = grid.rows_containing(header_keywords)
+        data_header_row = header_rows[-1] if header_rows else None
+        if data_header_row is not None:
+            print(f"找到交易数据表头行: {data_header_row}, 关键字: {grid.row(data_header_row)}")
         
         if data_header_row is None:
             raise Exception("未找到交易数据表头")
             
+        # 整列转换日期和金额
+        dates = date_columns(grid, [1])
+        amounts = amount_columns(grid, [5, 6], default=None)
+        
         # 处理每一行
-        for row_idx in sorted(row_cells.keys()):
+        for row_idx, cell_texts in grid.iter_rows():
             # 跳过表头行及之前的行
             if row_idx <= data_header_row:
                 print(f"跳过非数据行 {row_idx}")
@@ -76,8 +75,6 @@ class BOCV1Parser(BOCBaseParser):
             transaction = statement_data.copy()
             print(f"\n处理第{row_idx}行:")
             
-            # 提取所有单元格文本
-            cell_texts = row_cells[row_idx]
             print("  单元格文本:", cell_texts)
             
             try:
@@ -93,11 +90,7 @@ class BOCV1Parser(BOCBaseParser):
                     
                     if 1 in cell_texts:
                         date_text = cell_texts[1]
-                        # 处理可能的年月日格式
-                        if len(date_text) == 8:  # 如 20200921
-                            transaction["transaction_date"] = datetime.strptime(date_text, '%Y%m%d')
-                        else:
-                            transaction["transaction_date"] = self._convert_date(date_text)
+                        transaction["transaction_date"] = dates[1][row_idx]
                         
                         if not transaction["transaction_date"]:
                             print(f"  日期转换失败: {date_text}")
@@ -123,8 +116,7 @@ class BOCV1Parser(BOCBaseParser):
                     
                     # 4. 处理收支标志和金额（第4、5列）
                     dc_flag = cell_texts.get(4, "").strip()
-                    amount_text = cell_texts.get(5, "")
-                    amount = self._convert_amount(amount_text)
+                    amount = amounts[5].get(row_idx)
                     
                     if amount is not None:
                         transaction["amount"] = amount
@@ -145,7 +137,7 @@ class BOCV1Parser(BOCBaseParser):
                                 transaction["transaction_type"] = "其他"
                     
                     # 5. 处理余额（第6列）
-                    balance = self._convert_amount(cell_texts.get(6, ""))
+                    balance = amounts[6].get(row_idx)
                     if balance is not None:
                         transaction["balance"] = balance
                     
@@ -166,68 +158,3 @@ class BOCV1Parser(BOCBaseParser):
             
         print(f"成功提取到{len(transactions)}条交易记录")
         return transactions
-    
-    def _convert_date(self, date_str: str) -> datetime:
-        """转换日期字符串为datetime对象"""
-        try:
-            # 移除非数字字符
-            date_str = re.sub(r'[^\d]', '', date_str)
-            if len(date_str) >= 8:
-                return datetime.strptime(date_str[:8], '%Y%m%d')
-        except:
-            pass
-        return None
-    
-    def _convert_amount(self, amount_str: str) -> float:
-        """转换金额字符串为float
-        
-        Args:
-            amount_str: 金额字符串
-            
-        Returns:
-            float: 转换后的金额，如果转换失败返回None
-        """
-        try:
-            if not amount_str or not isinstance(amount_str, str):
-                return None
-                
-            # 清理金额字符串
-            amount_str = amount_str.strip()
-            
-            # 处理特殊符号
-            amount_str = amount_str.replace('¥', '')  # 处理人民币符号
-            amount_str = amount_str.replace('￥', '')
-            amount_str = amount_str.replace(',', '')  # 处理千位分隔符
-            amount_str = amount_str.replace('，', '')  # 处理中文逗号
-            amount_str = amount_str.replace(' ', '')  # 处理空格
-            
-            # 处理中文数字
-            cn_nums = {'零':0, '一':1, '二':2, '三':3, '四':4, '五':5, '六':6, '七':7, '八':8, '九':9}
-            for cn, num in cn_nums.items():
-                amount_str = amount_str.replace(cn, str(num))
-            
-            # 移除其他非数字字符（保留小数点和负号）
-            amount_str = ''.join(c for c in amount_str if c.isdigit() or c in '.-')
-            
-            if not amount_str:
-                return None
-                
-            # 处理多个小数点
-            if amount_str.count('.') > 1:
-                # 只保留第一个小数点
-                first_dot = amount_str.index('.')
-                amount_str = amount_str[:first_dot+1] + amount_str[first_dot+1:].replace('.', '')
-            
-            # 转换为float
-            amount = float(amount_str)
-            
-            # 处理异常值
-            if amount > 999999999999:  # 金额不应超过1万亿
-                print(f"警告：金额 {amount} 可能异常")
-                return None
-                
-            return amount
-            
-        except Exception as e:
-            print(f"金额转换失败: {amount_str}, 错误: {str(e)}")
-            return None 
\ No newline at end of file
@@ -1,12 +1,20 @@
 from typing import Dict, Any, List
 from datetime import datetime
-import re
 
+from .base import LayoutSignature
 from .ccb_base import CCBBaseParser
+from .normalize import amount_columns, date_columns
+from .table_grid import TableGrid
 
 class CCBV1Parser(CCBBaseParser):
     """建设银行版式1解析器"""
     
+    layout = LayoutSignature(
+        bank_keywords=("建设银行", "China Construction Bank"),
+        header_keywords=("日期", "凭证种类", "凭证号码", "借方", "贷方"),
+        columns=11
+    )
+    
     def __init__(self):
         super().__init__()
         # 交易类型关键词映射
@@ -40,26 +48,15 @@ class CCBV1Parser(CCBBaseParser):
             statement_data["account_number"] = account_number
         
         # 处理表格主体
-        row_cells = {}
-        header_rows = set()  # 记录表头行
-        if "body" in raw_data:
-            for cell in raw_data["body"]:
-                if isinstance(cell, dict) and "row_start" in cell and "words" in cell:
-                    row_idx = cell.get("row_start")
-                    col_idx = cell.get("col_start", 0)
-                    if row_idx not in row_cells:
-                        row_cells[row_idx] = {}
-                    # 清理单元格文本
-                    cell_text = cell["words"].strip()
-                    cell_text = re.sub(r'\s+', ' ', cell_text)  # 合并多个空格
-                    row_cells[row_idx][col_idx] = cell_text
-                    
-                    # 标记表头行
-                    if any(header in cell_text for header in ["日期", "凭证种类", "凭证号码", "借方", "贷方"]):
-                        header_rows.add(row_idx)
-                    
+        grid = TableGrid.from_table(raw_data, collapse_spaces=True)
+        header_rows = set(grid.rows_containing(["日期", "凭证种类", "凭证号码", "借方", "贷方"]))  # 记录表头行
+        
+        # 整列转换日期和金额
+        dates = date_columns(grid, [0])
+        amounts = amount_columns(grid, [5, 6, 9], default=0.0)
+        
         # 处理每一行
-        for row_idx in sorted(row_cells.keys()):
+        for row_idx, cell_texts in grid.iter_rows():
             # 跳过表头行
             if row_idx in header_rows:
                 print(f"跳过表头行 {row_idx}")
@@ -68,14 +65,12 @@ class CCBV1Parser(CCBBaseParser):
             transaction = statement_data.copy()
             print(f"\n处理第{row_idx}行:")
             
-            # 提取所有单元格文本
-            cell_texts = row_cells[row_idx]
             print("  单元格文本:", cell_texts)
             
             try:
                 # 1. 处理交易日期（第0列）
                 if 0 in cell_texts:
-                    transaction["transaction_date"] = self._convert_date(cell_texts[0])
+                    transaction["transaction_date"] = dates[0][row_idx]
                     if not transaction["transaction_date"]:
                         print(f"  日期转换失败: {cell_texts[0]}")
                         continue
@@ -88,7 +83,6 @@ class CCBV1Parser(CCBBaseParser):
                 transaction_type = None
                 if 3 in cell_texts:
                     description = cell_texts[3].strip()
-                    description = re.sub(r'\s+', ' ', description)  # 合并多个空格
                     description = description.rstrip(',')  # 移除末尾逗号
                     transaction["description"] = description
                     
@@ -110,11 +104,11 @@ class CCBV1Parser(CCBBaseParser):
                 
                 # 借方金额（第5列）
                 if 5 in cell_texts and cell_texts[5].strip():
-                    debit_amount = self._convert_amount(cell_texts[5])
+                    debit_amount = amounts[5][row_idx]
                 
                 # 贷方金额（第6列）
                 if 6 in cell_texts and cell_texts[6].strip():
-                    credit_amount = self._convert_amount(cell_texts[6])
+                    credit_amount = amounts[6][row_idx]
                 
                 # 6. 设置交易类型和金额
                 if debit_amount > 0:
@@ -130,7 +124,7 @@ class CCBV1Parser(CCBBaseParser):
                 
                 # 7. 处理余额（第9列）
                 if 9 in cell_texts:
-                    balance = self._convert_amount(cell_texts[9])
+                    balance = amounts[9][row_idx]
                     if balance is not None:
                         transaction["balance"] = balance
                 
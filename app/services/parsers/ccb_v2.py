@@ -2,11 +2,20 @@ from typing import Dict, Any, List
 from datetime import datetime
 import re
 
+from .base import LayoutSignature
 from .ccb_base import CCBBaseParser
+from .normalize import amount_columns
+from .table_grid import TableGrid
 
 class CCBV2Parser(CCBBaseParser):
     """建设银行版式2解析器"""
     
+    layout = LayoutSignature(
+        bank_keywords=("建设银行", "China Construction Bank"),
+        header_keywords=("日期", "凭证种类", "凭证号码", "借方", "贷方", "余额"),
+        columns=9
+    )
+    
     def __init__(self):
         super().__init__()
         # 交易类型关键词映射
@@ -40,26 +49,14 @@ class CCBV2Parser(CCBBaseParser):
             statement_data["account_number"] = account_number
         
         # 处理表格主体
-        row_cells = {}
-        header_rows = set()  # 记录表头行
-        if "body" in raw_data:
-            for cell in raw_data["body"]:
-                if isinstance(cell, dict) and "row_start" in cell and "words" in cell:
-                    row_idx = cell.get("row_start")
-                    col_idx = cell.get("col_start", 0)
-                    if row_idx not in row_cells:
-                        row_cells[row_idx] = {}
-                    # 清理单元格文本
-                    cell_text = cell["words"].strip()
-                    cell_text = re.sub(r'\s+', ' ', cell_text)  # 合并多个空格
-                    row_cells[row_idx][col_idx] = cell_text
-                    
-                    # 标记表头行
-                    if any(header in cell_text for header in ["日期", "凭证种类", "凭证号码", "借方", "贷方", "余额"]):
-                        header_rows.add(row_idx)
-                    
+        grid = TableGrid.from_table(raw_data, collapse_spaces=True)
+        header_rows = set(grid.rows_containing(["日期", "凭证种类", "凭证号码", "借方", "贷方", "余额"]))  # 记录表头行
+        
+        # 整列转换日期和金额
+        amounts = amount_columns(grid, [4, 5], default=0.0)
+        
         # 处理每一行
-        for row_idx in sorted(row_cells.keys()):
+        for row_idx, cell_texts in grid.iter_rows():
             # 跳过表头行
             if row_idx in header_rows:
                 print(f"跳过表头行 {row_idx}")
@@ -68,8 +65,6 @@ class CCBV2Parser(CCBBaseParser):
             transaction = statement_data.copy()
             print(f"\n处理第{row_idx}行:")
             
-            # 提取所有单元格文本
-            cell_texts = row_cells[row_idx]
             print("  单元格文本:", cell_texts)
             
             try:
@@ -103,11 +98,11 @@ class CCBV2Parser(CCBBaseParser):
                 
                 # 借方金额（第4列）
                 if 4 in cell_texts and cell_texts[4].strip():
-                    debit_amount = self._convert_amount(cell_texts[4])
+                    debit_amount = amounts[4][row_idx]
                 
                 # 贷方金额（第5列）
                 if 5 in cell_texts and cell_texts[5].strip():
-                    credit_amount = self._convert_amount(cell_texts[5])
+                    credit_amount = amounts[5][row_idx]
                 
                 # 借贷标记（第6列）
                 transaction_type = None
@@ -1,12 +1,20 @@
 from typing import Dict, Any, List
 from datetime import datetime
-import re
 
+from .base import LayoutSignature
 from .ccb_base import CCBBaseParser
+from .normalize import amount_columns, date_columns
+from .table_grid import TableGrid
 
 class CCBV3Parser(CCBBaseParser):
     """建设银行版式3解析器（个人活期账户全部交易明细）"""
     
+    layout = LayoutSignature(
+        bank_keywords=("建设银行", "China Construction Bank"),
+        header_keywords=("序号", "摘要", "币别", "交易日期", "交易金额"),
+        columns=9
+    )
+    
     def __init__(self):
         super().__init__()
         # 交易类型关键词映射
@@ -40,26 +48,15 @@ class CCBV3Parser(CCBBaseParser):
             statement_data["account_number"] = account_number
         
         # 处理表格主体
-        row_cells = {}
-        header_rows = set()  # 记录表头行
-        if "body" in raw_data:
-            for cell in raw_data["body"]:
-                if isinstance(cell, dict) and "row_start" in cell and "words" in cell:
-                    row_idx = cell.get("row_start")
-                    col_idx = cell.get("col_start", 0)
-                    if row_idx not in row_cells:
-                        row_cells[row_idx] = {}
-                    # 清理单元格文本
-                    cell_text = cell["words"].strip()
-                    cell_text = re.sub(r'\s+', ' ', cell_text)  # 合并多个空格
-                    row_cells[row_idx][col_idx] = cell_text
-                    
-                    # 标记表头行
-                    if any(header in cell_text for header in ["序号", "摘要", "币别", "交易日期", "交易金额"]):
-                        header_rows.add(row_idx)
-                    
+        grid = TableGrid.from_table(raw_data, collapse_spaces=True)
+        header_rows = set(grid.rows_containing(["序号", "摘要", "币别", "交易日期", "交易金额"]))  # 记录表头行
+        
+        # 整列转换日期和金额
+        dates = date_columns(grid, [4])
+        amounts = amount_columns(grid, [5, 6], default=0.0)
+        
         # 处理每一行
-        for row_idx in sorted(row_cells.keys()):
+        for row_idx, cell_texts in grid.iter_rows():
             # 跳过表头行
             if row_idx in header_rows:
                 print(f"跳过表头行 {row_idx}")
@@ -68,8 +65,6 @@ class CCBV3Parser(CCBBaseParser):
             transaction = statement_data.copy()
             print(f"\n处理第{row_idx}行:")
             
-            # 提取所有单元格文本
-            cell_texts = row_cells[row_idx]
             print("  单元格文本:", cell_texts)
             
             try:
@@ -77,7 +72,6 @@ class CCBV3Parser(CCBBaseParser):
                 transaction_type = None
                 if 1 in cell_texts:
                     description = cell_texts[1].strip()
-                    description = re.sub(r'\s+', ' ', description)  # 合并多个空格
                     description = description.rstrip(',')  # 移除末尾逗号
                     transaction["description"] = description
                     
@@ -89,7 +83,7 @@ class CCBV3Parser(CCBBaseParser):
                 
                 # 2. 处理交易日期（第4列）
                 if 4 in cell_texts:
-                    transaction["transaction_date"] = self._convert_date(cell_texts[4])
+                    transaction["transaction_date"] = dates[4][row_idx]
                     if not transaction["transaction_date"]:
                         print(f"  日期转换失败: {cell_texts[4]}")
                         continue
@@ -98,7 +92,7 @@ class CCBV3Parser(CCBBaseParser):
                 if 5 in cell_texts:
                     amount_str = cell_texts[5].strip()
                     if amount_str:
-                        amount = self._convert_amount(amount_str)
+                        amount = amounts[5][row_idx]
                         if amount is not None:
                             # 判断金额正负
                             if amount_str.startswith('-'):
@@ -110,7 +104,7 @@ class CCBV3Parser(CCBBaseParser):
                 
                 # 4. 处理账户余额（第6列）
                 if 6 in cell_texts:
-                    balance = self._convert_amount(cell_texts[6])
+                    balance = amounts[6][row_idx]
                     if balance is not None:
                         transaction["balance"] = balance
                 
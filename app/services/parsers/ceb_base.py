@@ -1,22 +1,20 @@
 from datetime import datetime
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
 import json
 
 from .base import BankStatementParser
-from app.services.baidu_service import BaiduOCRService, BaiduNLPService
+from .account import find_account_number
+from .table_grid import TableGrid
+from app.services.ocr_bundle import OCRBundle
 
 class CEBBaseParser(BankStatementParser):
     """光大银行基础解析器"""
     
-    def __init__(self):
-        self.ocr_service = BaiduOCRService()
-        self.nlp_service = BaiduNLPService()
-    
-    def parse(self, image_data: bytes) -> Dict[str, Any]:
+    def parse(self, image_data: Union[bytes, OCRBundle]) -> Dict[str, Any]:
         """解析银行流水图片"""
         # OCR识别表格
-        ocr_result = self.ocr_service.recognize_table(image_data)
+        ocr_result = OCRBundle.wrap(image_data, self.ocr_service).table
         print("OCR识别结果:", json.dumps(ocr_result, ensure_ascii=False, indent=2))
         
         # 处理OCR结果
@@ -63,18 +61,13 @@ class CEBBaseParser(BankStatementParser):
             
             # 尝试从表头中提取账号
             for text in header_texts:
-                # 1. 首先尝试NLP实体识别
-                try:
-                    entities = self.nlp_service.entity_recognize(text)
-                    if isinstance(entities, list):
-                        for entity in entities:
-                            if isinstance(entity, dict) and entity.get("type") == "BANK_CARD":
-                                statement_data["account_number"] = entity.get("item")
-                                break
-                except Exception as e:
-                    print(f"NLP实体识别失败: {str(e)}")
+                # 1. 首先按长度和Luhn规则识别账号/卡号
+                account_number = find_account_number(text, "ceb")
+                if account_number:
+                    statement_data["account_number"] = account_number
+                    break
                 
-                # 2. 如果NLP失败，尝试直接匹配数字
+                # 2. 如果未识别到，尝试直接匹配数字
                 if not statement_data["account_number"]:
                     # 查找账号
                     card_matches = [
@@ -88,28 +81,19 @@ class CEBBaseParser(BankStatementParser):
                         if match:
                             statement_data["account_number"] = match.group(1)
                             break
+                
+                # 取第一个识别到的账号，后面表头行中的数字不再覆盖
+                if statement_data["account_number"]:
+                    break
         
         # 处理表格主体
-        row_cells = {}
-        if "body" in raw_data:
-            for cell in raw_data["body"]:
-                if isinstance(cell, dict) and "row_start" in cell and "words" in cell:
-                    row_idx = cell.get("row_start")
-                    col_idx = cell.get("col_start", 0)
-                    if row_idx not in row_cells:
-                        row_cells[row_idx] = []
-                    row_cells[row_idx].append((col_idx, cell["words"]))
+        grid = TableGrid.from_table(raw_data)
         
         # 处理每一行
-        for row_idx in sorted(row_cells.keys()):
-            cells = row_cells[row_idx]
-            cells.sort(key=lambda x: x[0])  # 按列索引排序
-            
+        for row_idx, cell_texts in grid.iter_rows():
             transaction = statement_data.copy()
             print(f"\n处理第{row_idx}行:")
             
-            # 提取所有单元格文本
-            cell_texts = {col: text.strip() for col, text in cells}
             print("  单元格文本:", cell_texts)
             
             try:
@@ -2,11 +2,19 @@ from typing import Dict, Any, List
 from datetime import datetime
 import re
 
+from .base import LayoutSignature
 from .ceb_base import CEBBaseParser
+from .table_grid import TableGrid
 
 class CEBV2Parser(CEBBaseParser):
     """光大银行版式2解析器"""
     
+    layout = LayoutSignature(
+        bank_keywords=("光大银行", "China Everbright Bank"),
+        header_keywords=("客户号", "交易日期", "交易流水号", "存入金额", "转出金额", "对方账号", "对方名称"),
+        columns=10
+    )
+    
     def clean_data(self, raw_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """清洗数据"""
         transactions = []
@@ -51,26 +59,13 @@ class CEBV2Parser(CEBBaseParser):
                     break
         
         # 处理表格主体
-        row_cells = {}
-        if "body" in raw_data:
-            for cell in raw_data["body"]:
-                if isinstance(cell, dict) and "row_start" in cell and "words" in cell:
-                    row_idx = cell.get("row_start")
-                    col_idx = cell.get("col_start", 0)
-                    if row_idx not in row_cells:
-                        row_cells[row_idx] = []
-                    row_cells[row_idx].append((col_idx, cell["words"]))
+        grid = TableGrid.from_table(raw_data)
         
         # 处理每一行
-        for row_idx in sorted(row_cells.keys()):
-            cells = row_cells[row_idx]
-            cells.sort(key=lambda x: x[0])  # 按列索引排序
-            
+        for row_idx, cell_texts in grid.iter_rows():
             transaction = statement_data.copy()
             print(f"\n处理第{row_idx}行:")
             
-            # 提取所有单元格文本
-            cell_texts = {col: text.strip() for col, text in cells}
             print("  单元格文本:", cell_texts)
             
             try:
@@ -0,0 +1,249 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from app.services.keyword_tagger import KeywordTagger
+from .account import find_account_number
+from .base import LayoutSignature
+from .factory import BankParserFactory
+from .table_grid import TableGrid
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class LayoutMatch(NamedTuple):
+    """版式识别结果"""
+    bank_type: Optional[str]               # 得分最高的银行类型，没有可用解析器时为None
+    confidence: float                      # 0~1，来自账号记忆时为1.0
+    source: str                            # "memory" 账号记忆 / "detected" 版式打分
+    account_number: Optional[str]          # 表头区域识别到的账号
+    candidates: List[Tuple[str, float]]    # 全部候选 (银行类型, 得分)，按得分从高到低
+
+
+class LayoutMemory:
+    """账号与流水版式的对应关系
+
+    同一账号后续上传的流水直接使用记住的银行类型，跳过版式识别。
+    记录持久化到本地JSON文件，文件被其他进程更新后按修改时间重新读取。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("BANK_LAYOUT_MEMORY_FILE", os.path.join(".cache", "bank_layouts.json"))
+        self._layouts: Dict[str, Dict[str, Any]] = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def get(self, account_number: Optional[str]) -> Optional[str]:
+        """账号上次使用的银行类型，没有记录时返回None"""
+        if not account_number:
+            return None
+        with self._lock:
+            self._reload()
+            entry = self._layouts.get(account_number)
+        return entry.get("bank_type") if entry else None
+
+    def remember(self, account_number: Optional[str], bank_type: str):
+        """记录账号使用的银行类型"""
+        if not account_number:
+            return
+        with self._lock:
+            self._reload()
+            entry = self._layouts.get(account_number)
+            if entry and entry.get("bank_type") == bank_type:
+                return
+            self._layouts[account_number] = {"bank_type": bank_type, "updated_at": time.time()}
+            self._save()
+
+    def forget(self, account_number: Optional[str]):
+        """删除账号的记录（记住的版式解析失败时调用）"""
+        with self._lock:
+            self._reload()
+            if self._layouts.pop(account_number, None) is not None:
+                self._save()
+
+    def _reload(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("读取流水版式记录失败: %s", e)
+            return
+        if isinstance(data, dict):
+            self._layouts = data
+        self._mtime = mtime
+
+    def _save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._layouts, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            logger.warning("保存流水版式记录失败: %s", e)
+
+
+class BankLayoutDetector:
+    """根据表格识别结果自动判断银行类型和版式
+
+    对 BankParserFactory 中声明了 layout 的解析器逐一打分：
+    列标题关键词的命中情况、表格列数是否一致、标题/表头区域是否出现银行名称。
+    列标题按区分度加权（权重为 1/出现该关键词的版式数），"交易日期"这类各版式共有的列标题
+    权重很低；命中少于 MIN_HEADER_HITS 个列标题的版式不计列标题得分。
+    全部解析器的关键词编译成一个 KeywordTagger，表格文本和标题文本各只扫描一遍。
+    """
+
+    HEADER_WEIGHT = 0.5
+    COLUMN_WEIGHT = 0.2
+    BANK_WEIGHT = 0.3
+    MIN_HEADER_HITS = 3
+
+    def __init__(self, memory: Optional[LayoutMemory] = None):
+        self.memory = memory
+        self._layouts: Dict[str, LayoutSignature] = {}
+        self._tagger: Optional[KeywordTagger] = None
+        self._specificity: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _current_tagger(self) -> Tuple[Dict[str, LayoutSignature], KeywordTagger, Dict[str, float]]:
+        """当前注册的版式、关键词自动机和列标题权重，注册表变化时重新编译"""
+        layouts = BankParserFactory.layouts()
+        with self._lock:
+            if self._tagger is None or layouts != self._layouts:
+                headers = {
+                    bank_type: {keyword.upper() for keyword in layout.header_keywords}
+                    for bank_type, layout in layouts.items()
+                }
+                keywords = {
+                    keyword.upper()
+                    for layout in layouts.values()
+                    for keyword in layout.bank_keywords + layout.header_keywords
+                }
+                self._tagger = KeywordTagger({keyword: [keyword] for keyword in keywords})
+                # 关键词也会在包含它的列标题中命中（"日期"出现在"交易日期"里），按包含关系统计版式数
+                self._specificity = {
+                    keyword: 1.0 / max(1, sum(
+                        any(keyword in other for other in names) for names in headers.values()
+                    ))
+                    for names in headers.values() for keyword in names
+                }
+                self._layouts = layouts
+            return self._layouts, self._tagger, self._specificity
+
+    def detect(self, table_result: Dict[str, Any], use_memory: bool = True) -> LayoutMatch:
+        """识别表格识别结果对应的银行类型
+
+        Args:
+            table_result: 表格识别结果（含 tables_result）
+            use_memory: 是否先按账号查找记住的版式
+
+        Returns:
+            LayoutMatch
+        """
+        tables = table_result.get("tables_result") if isinstance(table_result, dict) else None
+        if not tables or not isinstance(tables[0], dict):
+            raise Exception("未识别到表格内容")
+        table = tables[0]
+        grid = TableGrid.from_table(table, collapse_spaces=True)
+
+        # 标题区域：表格上下方文字、通用文字识别结果和表格首行
+        title_texts = [
+            item["words"]
+            for items in (table.get("header"), table.get("footer"), table_result.get("words_result"))
+            if isinstance(items, list)
+            for item in items if isinstance(item, dict) and isinstance(item.get("words"), str)
+        ]
+        title_texts.extend(grid.row(int(grid.row_ids[0])).values() if len(grid) else [])
+
+        account_number = None
+        for text in title_texts:
+            account_number = find_account_number(text)
+            if account_number:
+                break
+
+        layouts, tagger, specificity = self._current_tagger()
+        if use_memory and self.memory:
+            bank_type = self.memory.get(account_number)
+            if bank_type in layouts:
+                logger.debug("账号 %s 使用记住的版式: %s", account_number, bank_type)
+                return LayoutMatch(bank_type, 1.0, "memory", account_number, [(bank_type, 1.0)])
+
+        body_hits = tagger.tag("\n".join(grid.texts).upper())
+        title_hits = tagger.tag("\n".join(title_texts).upper())
+        columns = grid.column_count
+
+        scores = []
+        for bank_type, layout in layouts.items():
+            headers = [keyword.upper() for keyword in layout.header_keywords]
+            hits = [keyword for keyword in headers if keyword in body_hits]
+            if hits and len(hits) >= min(self.MIN_HEADER_HITS, len(headers)):
+                header_score = sum(specificity[k] for k in hits) / sum(specificity[k] for k in headers)
+            else:
+                header_score = 0.0
+            if columns == layout.columns:
+                column_score = 1.0
+            elif 0 < columns - layout.columns <= 2:
+                # 多出的列可能是识别出的空白列，解析器仍能处理
+                column_score = 0.5
+            else:
+                column_score = 0.0
+            bank_score = 1.0 if any(keyword.upper() in title_hits for keyword in layout.bank_keywords) else 0.0
+            score = (
+                self.HEADER_WEIGHT * header_score
+                + self.COLUMN_WEIGHT * column_score
+                + self.BANK_WEIGHT * bank_score
+            )
+            scores.append((bank_type, round(score, 3)))
+
+        scores.sort(key=lambda item: item[1], reverse=True)
+        logger.debug("版式识别得分（列数 %s）: %s", columns, scores[:3])
+        if not scores:
+            return LayoutMatch(None, 0.0, "detected", account_number, [])
+        return LayoutMatch(scores[0][0], scores[0][1], "detected", account_number, scores)
+
+    def remember(self, account_number: Optional[str], bank_type: str):
+        if self.memory:
+            self.memory.remember(account_number, bank_type)
+
+    def forget(self, account_number: Optional[str]):
+        if self.memory:
+            self.memory.forget(account_number)
+
+
+def detection_min_confidence() -> float:
+    """自动识别结果可用的最低得分"""
+    return float(os.getenv("BANK_DETECT_MIN_CONFIDENCE", "0.6"))
+
+
+def detection_max_attempts() -> int:
+    """自动识别时最多依次尝试的候选解析器数量（共用同一份OCR结果）"""
+    return max(1, int(os.getenv("BANK_DETECT_MAX_ATTEMPTS", "2")))
+
+
+_detector: Optional[BankLayoutDetector] = None
+_detector_lock = threading.Lock()
+
+
+def get_layout_detector() -> BankLayoutDetector:
+    """获取进程内共享的版式识别器，BANK_LAYOUT_MEMORY=false 时不记录账号版式"""
+    global _detector
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                memory = LayoutMemory() if os.getenv("BANK_LAYOUT_MEMORY", "true").lower() == "true" else None
+                _detector = BankLayoutDetector(memory)
+    return _detector
@@ -1,5 +1,7 @@
-from typing import Dict, Type
-from .base import BankStatementParser
+import logging
+import threading
+from typing import Dict, List, Type
+from .base import BankStatementParser, LayoutSignature
 from .beijing_bank import BeijingBankParser
 from .ceb_v1 import CEBV1Parser
 from .ceb_v2 import CEBV2Parser
@@ -10,6 +12,8 @@ from .boc_v1 import BOCV1Parser
 from .boc_v2 import BOCV2Parser
 from .boc_v3 import BOCV3Parser
 
+logger = logging.getLogger(__name__)
+
 class BankParserFactory:
     """银行流水解析器工厂"""
     
@@ -26,6 +30,10 @@ class BankParserFactory:
         'boc_v3': BOCV3Parser       # 交通银行版式3
     }
     
+    # 解析器实例缓存：解析器不保存请求状态，同一类型在进程内共享一个实例
+    _instances: Dict[str, BankStatementParser] = {}
+    _lock = threading.Lock()
+    
     @classmethod
     def register_parser(cls, bank_type: str, parser_class: Type[BankStatementParser]):
         """注册新的解析器
@@ -34,11 +42,13 @@ class BankParserFactory:
             bank_type: 银行类型标识
             parser_class: 解析器类
         """
-        cls._parsers[bank_type] = parser_class
+        with cls._lock:
+            cls._parsers[bank_type] = parser_class
+            cls._instances.pop(bank_type, None)
     
     @classmethod
     def get_parser(cls, bank_type: str) -> BankStatementParser:
-        """获取指定银行类型的解析器实例
+        """获取指定银行类型的解析器实例（进程内缓存，线程安全）
         
         Args:
             bank_type: 银行类型标识
@@ -49,7 +59,41 @@ class BankParserFactory:
         Raises:
             ValueError: 不支持的银行类型
         """
-        parser_class = cls._parsers.get(bank_type)
-        if not parser_class:
-            raise ValueError(f"Unsupported bank type: {bank_type}")
-        return parser_class() 
\ No newline at end of file
+        parser = cls._instances.get(bank_type)
+        if parser is None:
+            parser_class = cls._parsers.get(bank_type)
+            if not parser_class:
+                raise ValueError(f"Unsupported bank type: {bank_type}")
+            with cls._lock:
+                parser = cls._instances.get(bank_type)
+                if parser is None:
+                    parser = parser_class()
+                    parser.bank_type = bank_type
+                    cls._instances[bank_type] = parser
+        return parser
+    
+    @classmethod
+    def layouts(cls) -> Dict[str, LayoutSignature]:
+        """已注册且声明了版式特征的解析器 {银行类型: 版式特征}"""
+        return {
+            bank_type: parser_class.layout
+            for bank_type, parser_class in list(cls._parsers.items())
+            if parser_class.layout is not None
+        }
+
+    @classmethod
+    def warm_up(cls) -> List[str]:
+        """启动时创建全部已注册的解析器，避免首个上传请求承担初始化开销
+        
+        Returns:
+            初始化成功的银行类型
+        """
+        warmed = []
+        for bank_type in list(cls._parsers):
+            try:
+                cls.get_parser(bank_type)
+                warmed.append(bank_type)
+            except Exception:
+                logger.exception("解析器 %s 初始化失败", bank_type)
+        return warmed
+ 
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""表格单元格金额、日期的批量转换
+
+解析器先把整列单元格文本收集起来再一次性转换：字符替换用 str.translate 表，
+非数字字符的清理在拼接后的整列文本上执行一次正则，日期的年月日校验用NumPy向量运算，
+每列返回转换结果和对应的成功掩码。
+"""
+import re
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .table_grid import TableGrid
+
+# 金额不应超过1万亿
+MAX_AMOUNT = 999999999999
+
+# 拼接整列文本时的分隔符
+_SEP = "\x1f"
+
+_FULLWIDTH_DIGITS = {ord("０") + i: str(i) for i in range(10)}
+
+# 删除货币符号、千位分隔符、空格，中文数字替换为阿拉伯数字
+_AMOUNT_TABLE = str.maketrans({
+    **{ch: None for ch in "¥￥,， "},
+    **{cn: str(num) for num, cn in enumerate("零一二三四五六七八九")},
+    **_FULLWIDTH_DIGITS,
+})
+_DATE_TABLE = str.maketrans(_FULLWIDTH_DIGITS)
+
+# 金额只保留数字、小数点和负号
+_NON_AMOUNT = re.compile(r"[^\d.\-" + _SEP + "]")
+_NON_AMOUNT_CELL = re.compile(r"[^\d.\-]")
+_NON_DATE = re.compile(r"[^0-9" + _SEP + "]")
+
+_DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+_DATE_WEIGHTS = np.array([
+    [1000, 100, 10, 1, 0, 0, 0, 0],
+    [0, 0, 0, 0, 10, 1, 0, 0],
+    [0, 0, 0, 0, 0, 0, 10, 1],
+]).T
+
+
+def _single_dot(text: str) -> str:
+    """多个小数点时只保留第一个"""
+    first_dot = text.index(".")
+    return text[:first_dot + 1] + text[first_dot + 1:].replace(".", "")
+
+
+def _clean_column(texts: Sequence[Any], table: Dict[int, Any], pattern: "re.Pattern") -> List[str]:
+    """整列文本拼接后统一做字符替换和清理，再按分隔符拆回各单元格"""
+    cells = [text if isinstance(text, str) else "" for text in texts]
+    if not cells:
+        return []
+    joined = _SEP.join(cells)
+    if joined.count(_SEP) != len(cells) - 1:
+        # 单元格中本身含有分隔符，逐个处理
+        joined = _SEP.join(cell.replace(_SEP, "") for cell in cells)
+    return pattern.sub("", joined.translate(table)).split(_SEP)
+
+
+def convert_amounts(
+    texts: Sequence[Any],
+    default: Optional[float] = None
+) -> Tuple[List[Optional[float]], np.ndarray]:
+    """批量转换一列金额文本
+
+    Args:
+        texts: 单元格文本，非字符串或空字符串视为转换失败
+        default: 转换失败时的取值（建设银行解析器用0.0，中国银行解析器用None）
+
+    Returns:
+        (金额列表, 成功掩码)
+    """
+    cleaned = _clean_column(texts, _AMOUNT_TABLE, _NON_AMOUNT)
+    cleaned = [text if text.count(".") <= 1 else _single_dot(text) for text in cleaned]
+    column = np.array(cleaned, dtype=np.str_)
+    ok = column != ""
+    try:
+        # 整列一次转换，有无法解析的单元格（如单独的"-"）时逐个转换
+        amounts = np.where(ok, column, "0").astype(np.float64)
+    except ValueError:
+        amounts = np.zeros(len(cleaned))
+        for i in np.flatnonzero(ok):
+            try:
+                amounts[i] = float(cleaned[i])
+            except ValueError as e:
+                print(f"金额转换失败: {texts[i]}, 错误: {str(e)}")
+                ok[i] = False
+
+    for i in np.flatnonzero(ok & (amounts > MAX_AMOUNT)):
+        print(f"警告：金额 {amounts[i]} 可能异常")
+        ok[i] = False
+    values = amounts.astype(object)
+    values[~ok] = default
+    return values.tolist(), ok
+
+
+def convert_amount(text: Any, default: Optional[float] = None) -> Optional[float]:
+    """转换单个金额文本，转换失败返回default"""
+    if not text or not isinstance(text, str):
+        return default
+    cleaned = _NON_AMOUNT_CELL.sub("", text.translate(_AMOUNT_TABLE))
+    if not cleaned:
+        return default
+    if cleaned.count(".") > 1:
+        cleaned = _single_dot(cleaned)
+    try:
+        amount = float(cleaned)
+    except ValueError as e:
+        print(f"金额转换失败: {text}, 错误: {str(e)}")
+        return default
+    if amount > MAX_AMOUNT:
+        print(f"警告：金额 {amount} 可能异常")
+        return default
+    return amount
+
+
+def convert_dates(texts: Sequence[Any]) -> Tuple[List[Optional[datetime]], np.ndarray]:
+    """批量转换一列日期文本
+
+    去掉非数字字符后取前8位按 YYYYMMDD 解析，年月日的合法性（含闰年）按列向量校验。
+
+    Returns:
+        (日期列表, 成功掩码)
+    """
+    digits = _clean_column(texts, _DATE_TABLE, _NON_DATE)
+    ok = np.array([len(d) >= 8 for d in digits], dtype=bool)
+    values: List[Optional[datetime]] = [None] * len(digits)
+    if not ok.any():
+        return values, ok
+
+    index = np.flatnonzero(ok)
+    buffer = "".join(digits[i][:8] for i in index).encode("ascii")
+    ymd = (np.frombuffer(buffer, dtype=np.uint8).reshape(-1, 8).astype(np.int64) - 48) @ _DATE_WEIGHTS
+    year, month, day = ymd[:, 0], ymd[:, 1], ymd[:, 2]
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_ok = (month >= 1) & (month <= 12)
+    days = _DAYS_IN_MONTH[np.where(month_ok, month, 0)] + ((month == 2) & leap)
+    valid = (year >= 1) & month_ok & (day >= 1) & (day <= days)
+
+    ok[index[~valid]] = False
+    for i, y, m, d in zip(index[valid].tolist(), *(ymd[valid].T.tolist())):
+        values[i] = datetime(y, m, d)
+    return values, ok
+
+
+def convert_date(text: Any) -> Optional[datetime]:
+    """转换单个日期文本，转换失败返回None"""
+    return convert_dates([text])[0][0]
+
+
+def _convert_columns(
+    grid: "TableGrid",
+    cols: Iterable[int],
+    convert: Callable[[List[str]], Tuple[List[Any], np.ndarray]]
+) -> Dict[int, Dict[int, Any]]:
+    result = {}
+    for col in cols:
+        rows, texts = grid.column(col)
+        values, _ = convert(texts)
+        result[col] = dict(zip(rows, values))
+    return result
+
+
+def amount_columns(
+    grid: "TableGrid",
+    cols: Iterable[int],
+    default: Optional[float] = None
+) -> Dict[int, Dict[int, Optional[float]]]:
+    """按列转换表格中的金额列，返回 {列号: {行号: 金额}}"""
+    return _convert_columns(grid, cols, lambda texts: convert_amounts(texts, default))
+
+
+def date_columns(
+    grid: "TableGrid",
+    cols: Iterable[int]
+) -> Dict[int, Dict[int, Optional[datetime]]]:
+    """按列转换表格中的日期列，返回 {列号: {行号: 日期}}"""
+    return _convert_columns(grid, cols, convert_dates)
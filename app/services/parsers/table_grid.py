@@ -0,0 +1,129 @@
+import re
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+_WHITESPACE = re.compile(r'\s+')
+# 批量合并空白时拼接单元格用的分隔符（不属于 \s）
+_SEP = "\x00"
+
+
+class TableGrid:
+    """表格识别结果的紧凑网格
+
+    每张表格只从 tables_result 的 body 构建一次：单元格按 (行, 列) 排序后，
+    行号、列号、跨行/跨列的结束位置存为 NumPy 数组，文本清理一次并驻留（sys.intern），
+    重复出现的"借""贷"、币种等文本共用同一个字符串对象。
+    同一位置出现多个单元格时保留最后一个，与原先逐个写入字典的结果一致。
+    """
+
+    def __init__(
+        self,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        row_ends: np.ndarray,
+        col_ends: np.ndarray,
+        texts: List[str]
+    ):
+        self.rows = rows
+        self.cols = cols
+        self.row_ends = row_ends
+        self.col_ends = col_ends
+        self.texts = texts
+        # 每一行在数组中的起止下标
+        self.row_ids = np.unique(rows)
+        bounds = np.searchsorted(rows, self.row_ids)
+        self._row_bounds = dict(zip(self.row_ids.tolist(), zip(bounds.tolist(), np.append(bounds[1:], len(rows)).tolist())))
+
+    @classmethod
+    def from_table(cls, table: Dict[str, Any], collapse_spaces: bool = False) -> "TableGrid":
+        """从百度表格识别结果（含 body 的表格字典）构建网格
+
+        Args:
+            table: tables_result 中的一个表格
+            collapse_spaces: 是否把单元格内连续空白合并为一个空格（默认只去掉首尾空白）
+        """
+        cells = [
+            cell for cell in table.get("body") or []
+            if isinstance(cell, dict) and "row_start" in cell and "words" in cell
+        ]
+        rows = np.fromiter((cell["row_start"] for cell in cells), dtype=np.int32, count=len(cells))
+        cols = np.fromiter((cell.get("col_start", 0) for cell in cells), dtype=np.int32, count=len(cells))
+        row_ends = np.fromiter((cell.get("row_end", cell["row_start"] + 1) for cell in cells), dtype=np.int32, count=len(cells))
+        col_ends = np.fromiter((cell.get("col_end", cell.get("col_start", 0) + 1) for cell in cells), dtype=np.int32, count=len(cells))
+
+        texts = [cell["words"].strip() for cell in cells]
+        if collapse_spaces and texts:
+            joined = _SEP.join(texts)
+            if joined.count(_SEP) == len(texts) - 1:
+                texts = _WHITESPACE.sub(" ", joined).split(_SEP)
+            else:
+                texts = [_WHITESPACE.sub(" ", text) for text in texts]
+
+        # 按 (行, 列, 原顺序) 排序，同一位置只保留最后一个单元格
+        order = np.lexsort((np.arange(len(cells)), cols, rows))
+        rows, cols = rows[order], cols[order]
+        keep = np.ones(len(order), dtype=bool)
+        if len(order) > 1:
+            keep[:-1] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+        order = order[keep]
+        return cls(
+            rows[keep], cols[keep], row_ends[order], col_ends[order],
+            [sys.intern(texts[i]) for i in order.tolist()]
+        )
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def column_count(self) -> int:
+        """表格列数（含跨列单元格覆盖到的列）"""
+        return int(self.col_ends.max()) if len(self.col_ends) else 0
+
+    def row(self, row: int) -> Dict[int, str]:
+        """某一行的 {列号: 文本}"""
+        start, end = self._row_bounds.get(row, (0, 0))
+        return dict(zip(self.cols[start:end].tolist(), self.texts[start:end]))
+
+    def iter_rows(self) -> Iterator[Tuple[int, Dict[int, str]]]:
+        """按行号顺序遍历 (行号, {列号: 文本})"""
+        for row in self.row_ids.tolist():
+            yield row, self.row(row)
+
+    def text(self, row: int, col: int, spanned: bool = False) -> Optional[str]:
+        """单元格文本
+
+        Args:
+            spanned: 为True时返回覆盖该位置的跨行/跨列单元格文本，否则只匹配起始位置
+        """
+        if spanned:
+            hits = np.flatnonzero(
+                (self.rows <= row) & (self.row_ends > row) & (self.cols <= col) & (self.col_ends > col)
+            )
+        else:
+            start, end = self._row_bounds.get(row, (0, 0))
+            hits = start + np.flatnonzero(self.cols[start:end] == col)
+        return self.texts[hits[-1]] if len(hits) else None
+
+    def column(self, col: int) -> Tuple[List[int], List[str]]:
+        """某一列的 (行号列表, 文本列表)，按行号排序"""
+        index = np.flatnonzero(self.cols == col)
+        return self.rows[index].tolist(), [self.texts[i] for i in index.tolist()]
+
+    def rows_containing(self, keywords: Iterable[str]) -> List[int]:
+        """包含任一关键词的单元格所在的行号（升序）"""
+        keywords = tuple(keywords)
+        hits = [i for i, text in enumerate(self.texts) if any(keyword in text for keyword in keywords)]
+        return np.unique(self.rows[hits]).tolist() if hits else []
+
+    def header_columns(self, header_row: int) -> Dict[str, int]:
+        """表头行的 {表头文本: 列号}"""
+        return {text: col for col, text in self.row(header_row).items() if text}
+
+    def find_column(self, header_row: int, *names: str) -> Optional[int]:
+        """按表头名称查找列号，表头文本包含任一名称即匹配"""
+        for col, text in sorted(self.row(header_row).items()):
+            if any(name in text for name in names):
+                return col
+        return None
@@ -6,6 +6,26 @@ from datetime import timedelta
 
 load_dotenv()
 
+class BufferReader(io.RawIOBase):
+    """基于memoryview的只读流，分块读取时不复制整个缓冲区"""
+
+    def __init__(self, data):
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    @property
+    def size(self) -> int:
+        return self._view.nbytes
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), len(self._view) - self._pos)
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
 class MinioStorage:
     def __init__(self):
         self.client = Minio(
@@ -34,17 +54,19 @@ class MinioStorage:
             self.client.set_bucket_policy(self.bucket_name, policy)
     
     async def upload_file(self, file_path: str, file_data: bytes):
-        """上传文件到MinIO"""
+        """上传文件到MinIO
+        
+        file_data 可以是 bytes、bytearray 或 memoryview，上传时直接读取原缓冲区
+        """
         try:
-            # 将字节数据转换为BytesIO对象
-            file_data_io = io.BytesIO(file_data)
+            file_data_io = BufferReader(file_data)
             
             # 使用put_object上传文件
             result = self.client.put_object(
                 self.bucket_name,
                 file_path,
                 file_data_io,
-                length=len(file_data),
+                length=file_data_io.size,
                 content_type='image/jpeg'  # 设置内容类型为图片
             )
             return result
@@ -0,0 +1,58 @@
+import os
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+
+class UploadTooLargeError(Exception):
+    """上传文件超过大小限制"""
+
+
+def _upload_size(file: UploadFile) -> int:
+    size = getattr(file, "size", None)
+    if size is None:
+        file.file.seek(0, os.SEEK_END)
+        size = file.file.tell()
+        file.file.seek(0)
+    return size
+
+
+def _read_into(file: UploadFile, view: memoryview) -> int:
+    """把上传文件读入预分配的缓冲区，返回实际读取的字节数"""
+    readinto = getattr(file.file, "readinto", None)
+    pos = 0
+    while pos < len(view):
+        if readinto is not None:
+            n = readinto(view[pos:])
+        else:
+            chunk = file.file.read(min(len(view) - pos, 1024 * 1024))
+            n = len(chunk)
+            view[pos:pos + n] = chunk
+        if not n:
+            break
+        pos += n
+    return pos
+
+
+async def read_upload(file: UploadFile, max_size: int) -> bytearray:
+    """一次性把上传文件读入单个缓冲区
+
+    先根据文件大小预分配缓冲区，再通过memoryview原地读入，
+    同一缓冲区可同时用于OCR识别和对象存储上传，避免多次复制。
+
+    Args:
+        file: 上传文件
+        max_size: 允许的最大字节数
+
+    Raises:
+        UploadTooLargeError: 文件超过大小限制
+    """
+    size = _upload_size(file)
+    if size > max_size:
+        raise UploadTooLargeError(f"文件大小超过限制(最大{max_size // (1024 * 1024)}MB)")
+
+    buffer = bytearray(size)
+    with memoryview(buffer) as view:
+        read = await run_in_threadpool(_read_into, file, view)
+    if read < size:
+        del buffer[read:]
+    return buffer
@@ -0,0 +1,145 @@
+"""百度OCR/NLP接口本地替身服务：回放录制的响应，用于离线压测
+
+用法:
+    # 1. 录制：正常调用百度接口时设置 BAIDU_RECORD_DIR，成功响应按请求内容的哈希保存
+    BAIDU_RECORD_DIR=./fixtures/baidu uvicorn app.main:app
+    # 2. 回放：启动替身服务，并让应用指向它
+    python -m benchmarks.baidu_stub --fixtures ./fixtures/baidu --latency-ms 300 --jitter-ms 100 --qps 2
+    BAIDU_API_BASE=http://127.0.0.1:8910 python -m benchmarks.load_bank_parsers --images ./samples/bank
+
+回放数据目录结构: <fixtures>/<接口名>/<sha256>.json，可放 default.json 作为未命中时的响应。
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from app.services.baidu_fixtures import load_fixture
+
+QPS_LIMIT_ERROR = {"error_code": 18, "error_msg": "Open api qps request limit reached"}
+NOT_FOUND_ERROR = {"error_code": 282000, "error_msg": "stub fixture not found"}
+
+
+class StubState:
+    """替身服务配置与统计"""
+
+    def __init__(self, args):
+        self.fixtures = args.fixtures
+        self.latency = args.latency_ms / 1000
+        self.jitter = args.jitter_ms / 1000
+        self.error_rate = args.error_rate
+        self.qps_error_rate = args.qps_error_rate
+        self.qps = args.qps
+        self._windows = defaultdict(deque)
+        self._lock = threading.Lock()
+        self.counters = defaultdict(int)
+
+    def over_qps(self, endpoint: str) -> bool:
+        """按接口统计最近1秒的请求数，超过配置的QPS时模拟限流"""
+        if not self.qps:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows[endpoint]
+            while window and now - window[0] >= 1:
+                window.popleft()
+            if len(window) >= self.qps:
+                return True
+            window.append(now)
+            return False
+
+    def count(self, key: str):
+        with self._lock:
+            self.counters[key] += 1
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: dict):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json;charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length).decode("utf-8") if length else ""
+
+            if path == "/oauth/2.0/token":
+                self._send(200, {"access_token": "stub-token", "expires_in": 2592000})
+                return
+
+            if path.startswith("/rest/2.0/ocr/v1/"):
+                endpoint = path.rsplit("/", 1)[-1]
+                payload = parse_qs(body).get("image", [""])[0]
+            elif path.startswith("/rpc/2.0/nlp/v1/"):
+                endpoint = path.rsplit("/", 1)[-1]
+                payload = json.loads(body or "{}").get("text", "")
+            else:
+                self._send(404, {"error_code": 3, "error_msg": "Unsupported openapi method"})
+                return
+
+            state.count(f"{endpoint}.requests")
+            if state.over_qps(endpoint) or random.random() < state.qps_error_rate:
+                state.count(f"{endpoint}.qps_limited")
+                self._send(200, QPS_LIMIT_ERROR)
+                return
+
+            time.sleep(max(0.0, state.latency + random.uniform(-state.jitter, state.jitter)))
+
+            if random.random() < state.error_rate:
+                state.count(f"{endpoint}.errors")
+                self._send(500, {"error_code": 282000, "error_msg": "internal error"})
+                return
+
+            result = load_fixture(state.fixtures, endpoint, payload)
+            if result is None:
+                state.count(f"{endpoint}.missing")
+                result = NOT_FOUND_ERROR
+            self._send(200, result)
+
+        def do_GET(self):
+            if urlparse(self.path).path == "/stats":
+                self._send(200, dict(state.counters))
+            else:
+                self._send(404, {})
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", required=True, help="录制的响应目录")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8910)
+    parser.add_argument("--latency-ms", type=float, default=300, help="模拟的接口耗时")
+    parser.add_argument("--jitter-ms", type=float, default=100, help="耗时抖动范围")
+    parser.add_argument("--qps", type=int, default=0, help="每个接口的QPS上限，超过时返回错误码18，0表示不限")
+    parser.add_argument("--qps-error-rate", type=float, default=0.0, help="随机返回QPS超限错误的比例")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="随机返回HTTP 500的比例")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(StubState(args)))
+    print(f"百度接口替身服务已启动: http://{args.host}:{args.port} (GET /stats 查看统计)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
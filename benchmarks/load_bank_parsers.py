@@ -0,0 +1,93 @@
+"""银行流水解析压测：按并发度调用全部解析器的 parse -> clean_data -> validate_data
+
+用法（先启动 benchmarks.baidu_stub，避免消耗百度付费额度）:
+    BAIDU_API_BASE=http://127.0.0.1:8910 OCR_CACHE_ENABLED=false \\
+        python -m benchmarks.load_bank_parsers --images ./samples/bank --concurrency 8 --rounds 5
+
+图片目录结构: <images>/<bank_type>/*.jpg，bank_type 为 beijing_bank、ccb_v1 等解析器类型；
+未提供图片的解析器会被跳过。OCR后端按 BANK_OCR_BACKEND / BANK_OCR_BACKENDS 选择，
+如 BANK_OCR_BACKEND=paddle 可对比本地识别的吞吐。
+"""
+import os
+import time
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from statistics import median
+
+from app.services.ocr_backend import get_ocr_backend
+from app.services.ocr_bundle import OCRBundle
+from app.services.parsers import BankParserFactory
+
+BANK_TYPES = ["beijing_bank", "ceb_v1", "ceb_v2", "ccb_v1", "ccb_v2", "ccb_v3", "boc_v1", "boc_v2", "boc_v3"]
+
+
+def load_images(images_dir: str):
+    jobs = []
+    for bank_type in BANK_TYPES:
+        bank_dir = os.path.join(images_dir, bank_type)
+        if not os.path.isdir(bank_dir):
+            print(f"跳过 {bank_type}: 没有图片目录")
+            continue
+        for name in sorted(os.listdir(bank_dir)):
+            with open(os.path.join(bank_dir, name), "rb") as f:
+                jobs.append((bank_type, name, f.read()))
+    return jobs
+
+
+def run_job(bank_type: str, image_data: bytes):
+    start = time.perf_counter()
+    parser = BankParserFactory.get_parser(bank_type)
+    raw_data = parser.parse(OCRBundle(image_data, get_ocr_backend(bank_type)))
+    transactions = parser.clean_data(raw_data)
+    valid = parser.validate_data(transactions)
+    return time.perf_counter() - start, valid
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True, help="按解析器类型分目录的流水图片")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发请求数")
+    parser.add_argument("--rounds", type=int, default=3, help="每张图片重复次数")
+    args = parser.parse_args()
+
+    jobs = load_images(args.images) * args.rounds
+    if not jobs:
+        print("没有可用的图片")
+        return
+
+    latencies = defaultdict(list)
+    failures = defaultdict(int)
+    invalid = defaultdict(int)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [(bank_type, executor.submit(run_job, bank_type, data)) for bank_type, _, data in jobs]
+        for bank_type, future in futures:
+            try:
+                elapsed, valid = future.result()
+                latencies[bank_type].append(elapsed * 1000)
+                invalid[bank_type] += not valid
+            except Exception as e:
+                failures[bank_type] += 1
+                print(f"{bank_type} 解析失败: {str(e)}")
+    total = time.perf_counter() - start
+
+    print(f"\n{'bank_type':>12} {'ok':>5} {'fail':>5} {'invalid':>8} {'p50_ms':>9} {'p95_ms':>9}")
+    for bank_type in BANK_TYPES:
+        values = latencies.get(bank_type, [])
+        if not values and not failures.get(bank_type):
+            continue
+        p50 = median(values) if values else 0.0
+        p95 = percentile(values, 0.95) if values else 0.0
+        print(f"{bank_type:>12} {len(values):>5} {failures[bank_type]:>5} {invalid[bank_type]:>8} {p50:>9.1f} {p95:>9.1f}")
+    print(f"\n共 {len(jobs)} 次，耗时 {total:.1f}s，吞吐 {len(jobs) / total:.2f} 张/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+import os
+
+# 测试不连接数据库和MinIO，只需要模块导入时能构造出连接配置
+for key, value in {
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "test",
+}.items():
+    os.environ.setdefault(key, value)
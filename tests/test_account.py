@@ -0,0 +1,132 @@
+import time
+
+from app.services.parsers.account import AccountScanner, find_account_number, is_date_like, luhn_valid
+from app.services.parsers.beijing_bank import BeijingBankParser
+from app.services.parsers.ccb_v1 import CCBV1Parser
+from app.services.parsers.ceb_v1 import CEBV1Parser
+
+# 通过Luhn校验的16位卡号
+CARD = "6217000012345678"
+while not luhn_valid(CARD):
+    CARD = str(int(CARD) + 1)
+
+
+def _statement(header_lines, date_col=1):
+    """只含表头和一条交易的表格识别结果"""
+    return {
+        "header": [{"words": line} for line in header_lines],
+        "body": [
+            {"row_start": 0, "col_start": 0, "words": "交易日期"},
+            {"row_start": 1, "col_start": date_col, "words": "2023-01-05"},
+            {"row_start": 1, "col_start": 3, "words": "100.00"},
+        ],
+    }
+
+
+def test_is_date_like():
+    assert is_date_like("20230101")
+    assert is_date_like("20240229")
+    assert not is_date_like("62170000")
+    assert not is_date_like("20231301")
+
+
+def test_date_range_is_not_an_account():
+    for text in ("查询起止日期：20230101 20230630", "查询起止日期：20230101-20230630"):
+        for bank_type in ("ceb", "beijing_bank", None):
+            assert find_account_number(text, bank_type) is None
+
+
+def test_unlabelled_account_length_requires_luhn():
+    # 光大银行16/18位账号不做Luhn校验，但不带标签时只接受通过校验的卡号
+    assert find_account_number("打印日期 2023010120230630", "ceb") is None
+    assert find_account_number("账号：2023010120230630", "ceb") == "2023010120230630"
+    assert find_account_number(f"客户 {CARD}", "ceb") == CARD
+
+
+def test_card_groups_are_joined():
+    grouped = " ".join(CARD[i:i + 4] for i in range(0, 16, 4))
+    assert find_account_number(f"卡号：{grouped}", "ceb") == CARD
+    assert find_account_number(f"卡号：{grouped.replace(' ', '-')} 20230101", "ceb") == CARD
+
+
+def test_ceb_header_date_range_does_not_override_account():
+    header = ["中国光大银行账户交易明细", f"卡号：{CARD}", "查询起止日期：20230101 20230630"]
+    transactions = CEBV1Parser().clean_data(_statement(header))
+    assert transactions[0]["account_number"] == CARD
+
+
+def test_ceb_header_with_only_date_range():
+    header = ["中国光大银行账户交易明细", "查询起止日期：20230101-20230630"]
+    transactions = CEBV1Parser().clean_data(_statement(header))
+    assert transactions[0]["account_number"] is None
+
+
+def test_beijing_header_date_range_does_not_override_account():
+    header = [f"卡/账号：{CARD}", "起止日期：20230101 20230630"]
+    transactions = BeijingBankParser().clean_data(_statement(header, date_col=0))
+    assert transactions and transactions[0]["account_number"] == CARD
+
+
+def test_scanner_does_not_join_dates():
+    scanner = AccountScanner(lengths=range(16, 20))
+    assert scanner.find("交易日期 20230101 20230102 金额 123.00") is None
+    assert scanner.find("起止日期：20230101-20230630") is None
+    assert scanner.find("卡号 6227 0012 3456 7890 123") == "6227001234567890123"
+    assert scanner.find("账号 622848 0012 3456 7890") == "622848001234567890"
+
+
+class _FakeOCR:
+    def __init__(self, result):
+        self.result = result
+
+    def recognize_table_and_text(self, image_data):
+        return self.result
+
+
+def _ccb_parse(ocr_result):
+    parser = CCBV1Parser()
+    parser.ocr_service = _FakeOCR(ocr_result)
+    return parser.parse(b"")
+
+
+def test_ccb_header_with_dates_has_no_account():
+    # 建设银行流水表头：起止日期和打印日期都在首行，没有账号
+    result = _ccb_parse({
+        "tables_result": [{
+            "header": [{"words": "中国建设银行个人活期账户交易明细"}],
+            "body": [
+                {"row_start": 0, "col_start": 0, "words": "起始日期：20230101 20230630"},
+                {"row_start": 0, "col_start": 5, "words": "打印日期 20230701 20230701"},
+                {"row_start": 1, "col_start": 0, "words": "日期"},
+            ],
+        }],
+        "words_result": [{"words": "交易日期 20230101 20230102 金额 123.00"}],
+    })
+    assert "account_number" not in result
+
+
+def test_ccb_header_with_dates_keeps_real_account():
+    result = _ccb_parse({
+        "tables_result": [{
+            "header": [{"words": "起始日期：20230101 20230630"}],
+            "body": [
+                {"row_start": 0, "col_start": 0, "words": "户名：张三 账号：6217 0000 1234 5678 901"},
+                {"row_start": 0, "col_start": 5, "words": "打印日期 20230701 20230702"},
+            ],
+        }],
+        "words_result": [],
+    })
+    assert result["account_number"] == "6217000012345678901"
+
+
+def test_long_grouped_line_is_linear():
+    # 数百个数字组的长行：合并长度受账号最大长度限制，不再枚举全部连续子串
+    line = " ".join(["1234"] * 400) + f" 卡号：{CARD}"
+    start = time.perf_counter()
+    assert find_account_number(line, "ceb") == CARD
+    assert time.perf_counter() - start < 0.2
+
+
+def test_find_account_skips_counterparty():
+    assert find_account_number(f"对方账号：{CARD}", "ceb") is None
+    assert find_account_number(f"对方账号：6222000000000000000 卡号：{CARD}", "ceb") == CARD
@@ -0,0 +1,76 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.baidu_hedge import RequestHedger
+
+
+def _backend(primary_latency, hedge_latency):
+    """每次调用生成一个请求函数：第一次执行（原请求）和第二次执行（对冲请求）耗时不同"""
+    calls = []
+    lock = threading.Lock()
+
+    def fn():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        time.sleep(primary_latency if first else hedge_latency)
+        return "ok"
+
+    return fn
+
+
+def test_hedge_delay_tracks_primary_latency():
+    # 近期耗时只有0.02s，之后原请求稳定在0.15s，对冲请求很快返回
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        hedger = RequestHedger("test", executor, budget=1.0, percentile=0.95, min_samples=5, window=10)
+        for _ in range(10):
+            hedger._record(0.02)
+
+        for _ in range(10):
+            assert hedger.call(_backend(0.15, 0.01)) == "ok"
+            # 等待被对冲的原请求完成
+            time.sleep(0.2)
+
+        # 分位数反映原请求的真实耗时，对冲不会自我强化
+        assert hedger.hedge_delay() >= 0.14
+        assert hedger.hedged < 10
+        assert hedger.hedge_wins == hedger.hedged
+        assert hedger.stats()["saved_ms"] > 0
+
+
+def test_hedge_delay_stable_under_constant_latency():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        hedger = RequestHedger("test", executor, budget=1.0, percentile=0.95, min_samples=5, window=50)
+        for _ in range(30):
+            hedger.call(_backend(0.03, 0.03))
+        time.sleep(0.1)
+        delay = hedger.hedge_delay()
+        assert 0.025 <= delay < 0.06
+        assert all(latency >= 0.025 for latency in hedger._latencies)
+
+
+def test_exhausted_budget_does_not_take_limiter_tokens():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        hedger = RequestHedger("test", executor, budget=0.0, percentile=0.95, min_samples=5, window=10)
+        for _ in range(10):
+            hedger._record(0.01)
+        acquired = []
+
+        def try_acquire():
+            acquired.append(1)
+            return True
+
+        for _ in range(3):
+            assert hedger.call(_backend(0.05, 0.01), try_acquire=try_acquire) == "ok"
+        assert not acquired
+        assert hedger.hedged == 0
+
+
+def test_budget_refunded_without_limiter_token():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        hedger = RequestHedger("test", executor, budget=1.0, percentile=0.95, min_samples=5, window=10)
+        for _ in range(10):
+            hedger._record(0.01)
+        assert hedger.call(_backend(0.05, 0.01), try_acquire=lambda: False) == "ok"
+        assert hedger.hedged == 0
@@ -0,0 +1,78 @@
+import json
+import time
+
+from app.services.baidu_service import BaiduService
+from app.services.baidu_token import BaiduTokenManager
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+def _manager(tmp_path, token="old-token"):
+    """本地文件中已有一个未过期token的管理器，刷新时返回新token"""
+    manager = BaiduTokenManager("key", "secret", token_file=str(tmp_path / "baidu_token.json"))
+    manager._token, manager._expires_at = token, time.time() + 30 * 24 * 3600
+    manager._save()
+    fetched = []
+
+    def fetch():
+        fetched.append(1)
+        return "new-token", time.time() + 30 * 24 * 3600
+
+    manager._fetch = fetch
+    return manager, fetched
+
+
+def test_invalidate_only_drops_matching_token(tmp_path):
+    manager, fetched = _manager(tmp_path)
+    manager.invalidate("other-token")
+    assert manager.get_token() == "old-token"
+    assert not fetched
+
+    manager.invalidate("old-token")
+    assert not (tmp_path / "baidu_token.json").exists()
+    assert manager.get_token() == "new-token"
+    assert fetched == [1]
+    with open(tmp_path / "baidu_token.json", encoding="utf-8") as f:
+        assert json.load(f)["access_token"] == "new-token"
+
+
+def test_call_api_refreshes_invalid_token_and_retries_once(tmp_path):
+    manager, fetched = _manager(tmp_path)
+    service = BaiduService()
+    service.token_manager = manager
+    tokens = []
+
+    def post(url, **kwargs):
+        token = kwargs["params"]["access_token"]
+        tokens.append(token)
+        if token == "old-token":
+            return _Response({"error_code": 110, "error_msg": "Access token invalid or no longer valid"})
+        return _Response({"words_result": []})
+
+    service._post = post
+    result = service._call_api("token_test", "http://ocr", params={"access_token": service.get_access_token()})
+    assert result == {"words_result": []}
+    assert tokens == ["old-token", "new-token"]
+    assert fetched == [1]
+
+
+def test_call_api_retries_invalid_token_only_once(tmp_path):
+    manager, fetched = _manager(tmp_path)
+    service = BaiduService()
+    service.token_manager = manager
+    calls = []
+
+    def post(url, **kwargs):
+        calls.append(kwargs["params"]["access_token"])
+        return _Response({"error_code": 111, "error_msg": "Access token expired"})
+
+    service._post = post
+    result = service._call_api("token_test", "http://ocr", params={"access_token": service.get_access_token()})
+    assert result["error_code"] == 111
+    assert calls == ["old-token", "new-token"]
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import app.services.bank_statement_service as bank_statement_service_module
+
+
+class _FakeStorage:
+    def upload_file(self, file_data, file_name, content_type):
+        return f"test/{file_name}"
+
+    def delete_file(self, file_path):
+        return True
+
+
+# 导入接口模块时会创建 BankStatementService，测试中不连接MinIO
+bank_statement_service_module.MinioStorage = _FakeStorage
+from app.api.endpoints import bank_statement as endpoint  # noqa: E402
+
+
+class _Upload:
+    filename = "statement.jpg"
+
+    async def read(self):
+        return b"image"
+
+
+def test_concurrent_uploads_do_not_block_event_loop(monkeypatch):
+    def create_bank_statement(db, file_data, file_name, bank_type):
+        # 模拟本地OCR识别和解析的同步耗时
+        time.sleep(0.5)
+        return [{"file_name": file_name}]
+
+    monkeypatch.setattr(endpoint.bank_statement_service, "create_bank_statement", create_bank_statement)
+
+    async def scenario():
+        gaps = []
+
+        async def ticker():
+            last = time.perf_counter()
+            for _ in range(20):
+                await asyncio.sleep(0.02)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            endpoint.upload_bank_statement(file=_Upload(), bank_type="auto", db=None),
+            endpoint.upload_bank_statement(file=_Upload(), bank_type="auto", db=None),
+            ticker()
+        )
+        return time.perf_counter() - start, max(gaps), results
+
+    elapsed, max_gap, results = asyncio.run(scenario())
+    assert results[0] == {"file_name": "statement.jpg"}
+    # 两个请求并行执行（串行需要1秒以上），期间事件循环仍能及时调度其他协程
+    assert elapsed < 0.9
+    assert max_gap < 0.2
@@ -0,0 +1,89 @@
+import pytest
+
+from app.services.parsers.detector import BankLayoutDetector, LayoutMemory, detection_min_confidence
+from app.services.parsers.factory import BankParserFactory
+
+
+def _table(headers, columns=None, title=None, rows=3):
+    """表头行 + 若干数据行的表格识别结果"""
+    columns = columns or len(headers)
+    body = [
+        {"row_start": 0, "row_end": 1, "col_start": col, "col_end": col + 1,
+         "words": headers[col] if col < len(headers) else ""}
+        for col in range(columns)
+    ]
+    for row in range(1, rows + 1):
+        body.extend(
+            {"row_start": row, "row_end": row + 1, "col_start": col, "col_end": col + 1, "words": "100.00"}
+            for col in range(columns)
+        )
+    header = [{"words": title}] if title else []
+    return {"tables_result": [{"header": header, "body": body, "footer": []}]}
+
+
+@pytest.fixture
+def detector():
+    return BankLayoutDetector(memory=None)
+
+
+@pytest.mark.parametrize("bank_type", sorted(BankParserFactory.layouts()))
+def test_every_layout_is_detected_without_bank_name(detector, bank_type):
+    layout = BankParserFactory.layouts()[bank_type]
+    match = detector.detect(_table(list(layout.header_keywords), layout.columns))
+    assert match.bank_type == bank_type
+    assert match.confidence >= detection_min_confidence()
+
+
+def test_layouts_declare_distinctive_headers():
+    for bank_type, layout in BankParserFactory.layouts().items():
+        assert len(layout.header_keywords) >= 3, bank_type
+
+
+def test_boc_versions_with_shared_headers(detector):
+    v1 = detector.detect(_table(["序号", "交易日期", "交易地点", "交易方式", "收支标志", "交易金额", "余额"]))
+    v3 = detector.detect(_table(["交易日期", "交易地点", "交易方式", "借贷标志", "交易金额", "余额"]))
+    assert v1.bank_type == "boc_v1"
+    assert v3.bank_type == "boc_v3"
+
+
+def test_ccb_versions_differ_by_column_count(detector):
+    headers = ["日期", "凭证种类", "凭证号码", "摘要", "对方户名", "借方", "贷方", "", "", "余额", "交易流水号"]
+    assert detector.detect(_table(headers, 11)).bank_type == "ccb_v1"
+    headers = ["日期", "凭证种类", "凭证号码", "对方户名", "借方", "贷方", "借贷标记", "余额", "交易流水号"]
+    assert detector.detect(_table(headers, 9)).bank_type == "ccb_v2"
+
+
+def test_common_date_header_does_not_pick_beijing(detector):
+    # 只有"交易日期"等各家共有的列标题、没有银行名称的5-7列表格
+    for columns in (5, 6, 7):
+        match = detector.detect(_table(["交易日期", "摘要", "金额", "余额", "备注"], columns))
+        scores = dict(match.candidates)
+        assert scores["beijing_bank"] < detection_min_confidence()
+        assert match.confidence < detection_min_confidence()
+
+
+def test_partial_boc_headers_beat_single_common_header(detector):
+    match = detector.detect(_table(["交易日期", "交易地点", "交易方式", "交易金额", "余额"], 6))
+    scores = dict(match.candidates)
+    assert match.bank_type == "boc_v3"
+    assert scores["beijing_bank"] < scores["boc_v3"]
+
+
+def test_bank_name_breaks_tie_between_banks(detector):
+    headers = ["交易日期", "交易金额", "余额", "摘要", "序号"]
+    with_name = detector.detect(_table(headers, 9, title="中国建设银行个人活期账户全部交易明细"))
+    assert with_name.bank_type == "ccb_v3"
+    assert with_name.confidence > detector.detect(_table(headers, 9)).confidence
+
+
+def test_remembered_layout_skips_detection(tmp_path):
+    detector = BankLayoutDetector(memory=LayoutMemory(str(tmp_path / "layouts.json")))
+    table = _table(["交易日期", "摘要", "金额"], title="账号：6217000012345678907")
+    assert detector.detect(table).source == "detected"
+
+    detector.remember("6217000012345678907", "boc_v2")
+    match = detector.detect(table)
+    assert (match.source, match.bank_type, match.confidence) == ("memory", "boc_v2", 1.0)
+
+    detector.forget("6217000012345678907")
+    assert detector.detect(table).source == "detected"
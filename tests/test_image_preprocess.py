@@ -0,0 +1,34 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from app.services.image_preprocess import PreprocessProfile, _to_gray, normalize_bytes
+
+
+def _colour_image():
+    rng = np.random.default_rng(5)
+    return rng.integers(0, 256, size=(16, 24, 3), dtype=np.uint8)
+
+
+def test_to_gray_matches_pil_luma():
+    rgb = _colour_image()
+    expected = np.asarray(Image.fromarray(rgb).convert("L"), dtype=np.int16)
+    assert np.abs(_to_gray(rgb).astype(np.int16) - expected).max() <= 1
+    # OpenCV解码得到的BGR数组，灰度结果应与对应的RGB图片一致
+    bgr = np.ascontiguousarray(rgb[..., ::-1])
+    assert np.array_equal(_to_gray(bgr, bgr=True), _to_gray(rgb))
+    assert not np.array_equal(_to_gray(bgr), _to_gray(rgb))
+
+
+def test_normalize_bytes_applies_exif_orientation():
+    # 手机横拍：像素宽60高40，EXIF方向6表示需要顺时针旋转90度显示
+    image = Image.fromarray(np.full((40, 60, 3), 200, dtype=np.uint8))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    output = io.BytesIO()
+    image.save(output, format="JPEG", exif=exif)
+
+    profile = PreprocessProfile(max_side=0, grayscale=True, deskew=False)
+    with Image.open(io.BytesIO(normalize_bytes(output.getvalue(), profile))) as result:
+        assert result.size == (40, 60)
@@ -0,0 +1,94 @@
+import random
+import re
+from datetime import datetime
+
+from app.services.parsers.normalize import convert_amount, convert_amounts, convert_dates
+
+
+def _scalar_amount(amount_str, default):
+    """重构前解析器中逐个单元格的金额转换（建设银行默认0.0，中国银行默认None）"""
+    try:
+        if not amount_str or not isinstance(amount_str, str):
+            return default
+        amount_str = amount_str.strip()
+        for ch in ("¥", "￥", ",", "，", " "):
+            amount_str = amount_str.replace(ch, "")
+        cn_nums = {"零": 0, "一": 1, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9}
+        for cn, num in cn_nums.items():
+            amount_str = amount_str.replace(cn, str(num))
+        amount_str = "".join(c for c in amount_str if c.isdigit() or c in ".-")
+        if not amount_str:
+            return default
+        if amount_str.count(".") > 1:
+            first_dot = amount_str.index(".")
+            amount_str = amount_str[:first_dot + 1] + amount_str[first_dot + 1:].replace(".", "")
+        amount = float(amount_str)
+        if amount > 999999999999:
+            return default
+        return amount
+    except Exception:
+        return default
+
+
+FULLWIDTH = str.maketrans("０１２３４５６７８９", "0123456789")
+
+
+def _scalar_date(date_str):
+    """重构前解析器中逐个单元格的日期转换
+
+    全角数字先转成半角：strptime 只在部分位置接受全角数字，新实现统一转换后再解析
+    """
+    try:
+        date_str = date_str.translate(FULLWIDTH)
+        date_str = re.sub(r"[^\d]", "", date_str)
+        if len(date_str) >= 8:
+            return datetime.strptime(date_str[:8], "%Y%m%d")
+    except Exception:
+        pass
+    return None
+
+
+AMOUNT_PIECES = [
+    "1", "2", "0", "9", "12", "345", "1,234", "，", ".", "..", "-", "¥", "￥", " ", "(", ")",
+    "（", "）", "元", "三", "零", "０", "５", "CR", "DR", "\x1f", "1000000000000",
+]
+DATE_PIECES = [
+    "2023", "2024", "1900", "2000", "0000", "01", "02", "12", "13", "29", "30", "31", "00",
+    "-", "/", ".", "年", "月", "日", " ", "10:30:00", "abc", "２０２３", "\x1f",
+]
+
+
+def _mixed(pieces, rng):
+    return "".join(rng.choice(pieces) for _ in range(rng.randint(0, 6)))
+
+
+def test_amounts_match_scalar_conversion():
+    rng = random.Random(20231017)
+    fixed = [
+        "1,234.56", "¥1,000.00", "￥ 2，500", "(100.00)", "-35.20", "", "   ", None, 12.5,
+        "-", "1.2.3", "一二三.五", "１２３.００", "2000000000000", "--5", "余额：88.8元",
+    ]
+    columns = [fixed] + [[_mixed(AMOUNT_PIECES, rng) for _ in range(rng.randint(1, 30))] for _ in range(300)]
+    for texts in columns:
+        for default in (0.0, None):
+            values, ok = convert_amounts(texts, default)
+            expected = [_scalar_amount(text, default) for text in texts]
+            assert values == expected, texts
+            assert [convert_amount(text, default) for text in texts] == expected
+            assert list(ok) == [
+                isinstance(t, str) and bool(t) and _scalar_amount(t, None) is not None for t in texts
+            ]
+
+
+def test_dates_match_scalar_conversion():
+    rng = random.Random(20231018)
+    fixed = [
+        "2023-01-05", "2023/01/05 10:30:00", "2023年1月5日", "20240229", "20230229", "20231301",
+        "20230100", "0000-01-01", "", None, "2023-01", "交易日期20230105", "２０２３0105",
+    ]
+    columns = [fixed] + [[_mixed(DATE_PIECES, rng) for _ in range(rng.randint(1, 30))] for _ in range(300)]
+    for texts in columns:
+        values, ok = convert_dates(texts)
+        expected = [_scalar_date(text) for text in texts]
+        assert values == expected, texts
+        assert list(ok) == [value is not None for value in expected]
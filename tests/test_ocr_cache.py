@@ -0,0 +1,40 @@
+import os
+import time
+
+from app.services.ocr_cache import OCRResultCache
+
+
+def _dir_size(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path) for name in files if name.endswith(".json")
+    )
+
+
+def test_shared_directory_bound_is_enforced(tmp_path):
+    # 两个实例模拟共用缓存目录的两个worker进程
+    first = OCRResultCache(str(tmp_path), max_bytes=1000, scan_interval=0)
+    second = OCRResultCache(str(tmp_path), max_bytes=1000, scan_interval=0)
+    value = {"words": "x" * 80}
+    for i in range(8):
+        first.set(first.make_key(str(i).encode(), "v1"), value)
+        second.set(second.make_key(str(i).encode(), "v2"), value)
+        assert _dir_size(tmp_path) <= 1000
+    assert second.get(second.make_key(b"7", "v2")) == value
+    assert first.get(first.make_key(b"0", "v1")) is None
+
+
+def test_least_recently_read_entry_is_evicted_across_instances(tmp_path):
+    first = OCRResultCache(str(tmp_path), max_bytes=350, scan_interval=0)
+    second = OCRResultCache(str(tmp_path), max_bytes=350, scan_interval=0)
+    value = {"words": "x" * 80}
+    keys = [first.make_key(str(i).encode(), "v1") for i in range(4)]
+    for key in keys[:3]:
+        first.set(key, value)
+        time.sleep(0.01)
+    # 另一个实例读取最早的条目，更新其访问时间
+    assert second.get(keys[0]) == value
+    time.sleep(0.01)
+    first.set(keys[3], value)
+    assert first.get(keys[0]) == value
+    assert first.get(keys[1]) is None
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.ocr_pool import OCRPoolBusyError, OCRTimeoutError, OCRWorkerPool
+
+release = threading.Event()
+
+
+def hang():
+    release.wait(10)
+    return "done"
+
+
+def quick():
+    return "quick"
+
+
+def test_timed_out_job_keeps_its_slot_until_it_finishes():
+    # workers=0 时在后台线程中执行，容量为1
+    pool = OCRWorkerPool(workers=0, queue_size=0, job_timeout=0.1)
+    release.clear()
+
+    async def scenario():
+        with pytest.raises(OCRTimeoutError):
+            await pool.submit(hang)
+        # 任务仍在执行，名额没有释放，新任务被拒绝
+        assert pool.pending == 1
+        with pytest.raises(OCRPoolBusyError):
+            await pool.submit(quick)
+
+        release.set()
+        deadline = time.monotonic() + 5
+        while pool.pending and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        assert pool.pending == 0
+        assert await pool.submit(quick) == "quick"
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_cancelled_queued_job_releases_its_slot():
+    pool = OCRWorkerPool(workers=0, queue_size=1, job_timeout=0.1)
+    release.clear()
+
+    async def scenario():
+        # 第一个任务占用唯一的执行线程，第二个任务排队等待时超时，被取消后立即释放名额
+        results = await asyncio.gather(pool.submit(hang), pool.submit(quick), return_exceptions=True)
+        assert all(isinstance(r, OCRTimeoutError) for r in results)
+        assert pool.pending == 1
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.shutdown()
+    assert pool.pending == 0
@@ -0,0 +1,42 @@
+import asyncio
+
+from app.services.ocr_service import OCRService
+
+ITEM = {"name": "办公用品", "amount": "100.00"}
+HEADER = {
+    "invoice_number": "12345678", "invoice_date": "2023年01月05日", "total_amount": "113.00",
+    "tax_amount": "13.00", "seller": "某某科技有限公司", "buyer": "某某贸易有限公司",
+}
+
+
+def _service(region_items):
+    service = OCRService(pool=object())
+    service.fast_mode = True
+    calls = []
+
+    async def recognize(image_bytes, regions_only=False):
+        calls.append("regions" if regions_only else "full")
+        mode = "regions" if regions_only else "full"
+        return [[[[[0, 0], [1, 0], [1, 1], [0, 1]], (mode, 0.99)]]]
+
+    def extract(result):
+        items = region_items if result[0][0][1][0] == "regions" else [ITEM]
+        return dict(HEADER, items=list(items))
+
+    service._recognize = recognize
+    service._extract_invoice_info = extract
+    return service, calls
+
+
+def test_fast_mode_keeps_region_items():
+    service, calls = _service([ITEM])
+    result = asyncio.run(service.process_invoice(b"img"))
+    assert result["data"]["items"] == [ITEM]
+    assert calls == ["regions"]
+
+
+def test_fast_mode_falls_back_when_items_missing():
+    service, calls = _service([])
+    result = asyncio.run(service.process_invoice(b"img"))
+    assert result["data"]["items"] == [ITEM]
+    assert calls == ["regions", "full"]
@@ -0,0 +1,38 @@
+from app.services.paddle_backend import PaddleOCRBackend, run_general_ocr, run_table_structure
+
+
+class _FakePool:
+    """记录提交的任务并返回预设结果，代替OCR工作池"""
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    def run(self, fn, *args, timeout=None):
+        self.calls.append(fn)
+        return self.results[fn]
+
+
+def test_recognition_runs_in_worker_pool():
+    regions = [
+        {"type": "text", "bbox": [0, 0, 200, 20], "res": [
+            {"text": "账号：6217000012345678901", "text_region": [[0, 0], [200, 0], [200, 20], [0, 20]]}
+        ]},
+        {"type": "table", "bbox": [0, 30, 200, 100], "res": {
+            "html": "<table><tr><td>交易日期</td><td>金额</td></tr><tr><td>20230105</td><td>100.00</td></tr></table>"
+        }},
+    ]
+    lines = [[[[0, 0], [100, 0], [100, 20], [0, 20]], ("交易明细", 0.99)]]
+    pool = _FakePool({run_table_structure: regions, run_general_ocr: lines})
+    backend = PaddleOCRBackend(pool=pool)
+    backend.cache = None
+    encoded = (object(), 1.0)
+
+    table = backend.recognize_table(b"image", lambda: encoded)
+    general = backend.recognize_general(b"image", lambda: encoded)
+
+    assert pool.calls == [run_table_structure, run_general_ocr]
+    result = table["tables_result"][0]
+    assert result["header"][0]["words"] == "账号：6217000012345678901"
+    assert [cell["words"] for cell in result["body"]] == ["交易日期", "金额", "20230105", "100.00"]
+    assert general["words_result"][0]["words"] == "交易明细"
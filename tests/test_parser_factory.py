@@ -0,0 +1,24 @@
+from app.services.ocr_backend import get_ocr_backend
+from app.services.parsers import BankParserFactory
+
+
+def test_parsers_share_the_process_ocr_backend(monkeypatch):
+    monkeypatch.setenv("BANK_OCR_BACKEND", "baidu")
+    monkeypatch.delenv("BANK_OCR_BACKENDS", raising=False)
+    backend = get_ocr_backend("ccb_v1")
+    for bank_type in ("ccb_v1", "boc_v2", "ceb_v1", "beijing_bank"):
+        parser = BankParserFactory.get_parser(bank_type)
+        assert parser.bank_type == bank_type
+        assert parser.ocr_service is backend
+        assert not hasattr(parser, "nlp_service")
+
+
+def test_parser_ocr_service_can_be_replaced():
+    parser = BankParserFactory.get_parser("ccb_v2")
+    fake = object()
+    parser.ocr_service = fake
+    try:
+        assert parser.ocr_service is fake
+        assert type(parser)().ocr_service is not fake
+    finally:
+        parser.ocr_service = None
@@ -0,0 +1,83 @@
+from app.services.parsers.table_grid import TableGrid
+
+
+def _cell(row, col, words, row_end=None, col_end=None):
+    cell = {"row_start": row, "col_start": col, "words": words}
+    if row_end is not None:
+        cell["row_end"] = row_end
+    if col_end is not None:
+        cell["col_end"] = col_end
+    return cell
+
+
+TABLE = {
+    "body": [
+        # 故意打乱顺序：网格按 (行, 列) 排序
+        _cell(1, 1, " 存入 "),
+        _cell(0, 0, "交易日期"),
+        _cell(0, 1, "收入金额"),
+        _cell(0, 2, "支出  金额"),
+        _cell(0, 3, "账户余额"),
+        _cell(1, 0, "2023-01-05", row_end=3),   # 跨两行
+        _cell(1, 2, "100.00"),
+        _cell(1, 3, "旧值"),
+        _cell(1, 3, "1,100.00"),                 # 同一位置保留最后一个
+        _cell(2, 1, "合计", col_end=3),           # 跨两列
+        _cell(2, 3, "200.00"),
+        {"row_start": 4, "col_start": 0},         # 缺少 words 的单元格被忽略
+        "无效单元格",
+    ]
+}
+
+
+def test_from_table_sorts_and_deduplicates():
+    grid = TableGrid.from_table(TABLE)
+    assert len(grid) == 10
+    assert grid.row_ids.tolist() == [0, 1, 2]
+    assert grid.row(1) == {0: "2023-01-05", 1: "存入", 2: "100.00", 3: "1,100.00"}
+    assert [row for row, _ in grid.iter_rows()] == [0, 1, 2]
+    assert grid.row(9) == {}
+
+
+def test_collapse_spaces():
+    assert TableGrid.from_table(TABLE).text(0, 2) == "支出  金额"
+    assert TableGrid.from_table(TABLE, collapse_spaces=True).text(0, 2) == "支出 金额"
+
+
+def test_text_with_spans():
+    grid = TableGrid.from_table(TABLE)
+    assert grid.text(1, 0) == "2023-01-05"
+    # 只匹配起始位置时，被跨行/跨列覆盖的位置没有文本
+    assert grid.text(2, 0) is None
+    assert grid.text(2, 0, spanned=True) == "2023-01-05"
+    assert grid.text(2, 2) is None
+    assert grid.text(2, 2, spanned=True) == "合计"
+    assert grid.text(2, 3, spanned=True) == "200.00"
+    assert grid.text(3, 0, spanned=True) is None
+
+
+def test_column():
+    grid = TableGrid.from_table(TABLE)
+    assert grid.column(3) == ([0, 1, 2], ["账户余额", "1,100.00", "200.00"])
+    assert grid.column(2) == ([0, 1], ["支出  金额", "100.00"])
+    assert grid.column(7) == ([], [])
+
+
+def test_rows_containing_and_find_column():
+    grid = TableGrid.from_table(TABLE)
+    assert grid.rows_containing(["金额"]) == [0]
+    assert grid.rows_containing(["合计", "存入"]) == [1, 2]
+    assert grid.rows_containing(["不存在"]) == []
+    assert grid.find_column(0, "支出") == 2
+    assert grid.find_column(0, "收入", "支出") == 1
+    assert grid.find_column(0, "对方户名") is None
+    assert grid.header_columns(0)["账户余额"] == 3
+
+
+def test_column_count():
+    assert TableGrid.from_table(TABLE).column_count == 4
+    spanning = TableGrid.from_table({"body": [_cell(0, 0, "标题", col_end=6), _cell(1, 0, "a")]})
+    assert spanning.column_count == 6
+    empty = TableGrid.from_table({"body": []})
+    assert empty.column_count == 0 and len(empty) == 0
+    assert TableGrid.from_table({}).rows_containing(["a"]) == []